@@ -0,0 +1,208 @@
+import csv
+import sys
+from Interpreter import (
+    BINARY_OPERATIONS,
+    LOAD,
+    LOADI,
+    NUM_VARIABLES,
+    READ,
+    STORE,
+    VARIABLE_NAMES,
+    WRITE,
+    DecodedProgram,
+    load_program,
+)
+
+try:
+    import numpy
+except ImportError:  # optional, execute_batch falls back to plain lists
+    numpy = None
+
+
+def _list_operation(operation):
+    """
+    Lifts a binary operation on ints to columns stored as lists, where a plain int
+    stands for a column holding the same value in every row.
+    """
+
+    def apply(left, right):
+        if isinstance(left, int):
+            if isinstance(right, int):
+                return operation(left, right)
+            return [operation(left, y) for y in right]
+        if isinstance(right, int):
+            return [operation(x, right) for x in left]
+        return list(map(operation, left, right))
+
+    return apply
+
+
+def wrap_int64(value: int) -> int:
+    """Wraps an int around to the range of a 64 bit signed integer, like int64 arithmetic"""
+    return (value + (1 << 63)) % (1 << 64) - (1 << 63)
+
+
+def _int64_operation(operation):
+    """
+    Lifts a binary operation to int64 NumPy columns. Constants are plain ints, kept
+    within int64 so NumPy accepts them, so a result of two constants is wrapped
+    around the way the columns' arithmetic wraps.
+    """
+
+    def apply(left, right):
+        result = operation(left, right)
+        return wrap_int64(result) if isinstance(result, int) else result
+
+    return apply
+
+
+def count_reads(program: DecodedProgram) -> int:
+    return sum(1 for opcode in program.opcodes if opcode == READ)
+
+
+def execute_batch(program: DecodedProgram, rows, use_numpy: bool = None) -> list:
+    """
+    Runs a decoded program once over many input vectors.
+
+    rows is a sequence of input rows (or a 2D NumPy array), each with one value per
+    READ instruction in program order. Every register and variable holds a whole
+    column of values across the rows, so each instruction is executed once for the
+    entire batch. Constants stay plain ints until they have to be written out.
+
+    With NumPy (used when installed, unless use_numpy is False) columns are int64
+    arrays and arithmetic, constants included, wraps around at 64 bits; without it
+    columns are lists of Python ints, like the scalar interpreter.
+
+    Raises:
+    - ValueError: If a row does not have one value per READ instruction.
+    - OverflowError: If NumPy is used and an input value does not fit in 64 bits.
+
+    Returns:
+        list of (variable name, column) pairs, one per executed WRITE, where column
+        holds the written value for every row
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ValueError("NumPy is not installed")
+
+    num_reads = count_reads(program)
+    if use_numpy:
+        table = numpy.asarray(rows, dtype=numpy.int64)
+        if table.size == 0:
+            table = table.reshape(len(table), num_reads)
+        if table.ndim != 2 or table.shape[1] != num_reads:
+            raise ValueError(f"Expected {num_reads} input values per row")
+        num_rows = table.shape[0]
+        columns = [table[:, i] for i in range(num_reads)]
+        operations = {
+            opcode: _int64_operation(operation)
+            for opcode, operation in BINARY_OPERATIONS.items()
+        }
+        constant = wrap_int64
+    else:
+        rows = [list(map(int, row)) for row in rows]
+        if any(len(row) != num_reads for row in rows):
+            raise ValueError(f"Expected {num_reads} input values per row")
+        num_rows = len(rows)
+        columns = [list(column) for column in zip(*rows)] or [[]] * num_reads
+        operations = {
+            opcode: _list_operation(operation)
+            for opcode, operation in BINARY_OPERATIONS.items()
+        }
+        constant = int
+
+    def full_column(value):
+        if not isinstance(value, int):
+            return value
+        if use_numpy:
+            return numpy.full(num_rows, value, dtype=numpy.int64)
+        return [value] * num_rows
+
+    Memory = [0] * NUM_VARIABLES
+    RegisterFile = [0] * (program.max_reg + 1)
+    inputs = iter(columns)
+    outputs = []
+
+    # Columns are never modified in place, so copies just share them
+    for opcode, f1, f2, f3 in zip(
+        program.opcodes, program.field1, program.field2, program.field3
+    ):
+        if opcode == LOAD:
+            RegisterFile[f1] = Memory[f2]
+        elif opcode == LOADI:
+            RegisterFile[f1] = constant(f2)
+        elif opcode == STORE:
+            Memory[f1] = RegisterFile[f2]
+        elif opcode == READ:
+            Memory[f1] = next(inputs)
+        elif opcode == WRITE:
+            outputs.append((VARIABLE_NAMES[f1], full_column(Memory[f1])))
+        else:
+            RegisterFile[f1] = operations[opcode](RegisterFile[f2], RegisterFile[f3])
+
+    return outputs
+
+
+def read_rows(infile) -> list:
+    """
+    Reads input rows from a CSV stream, one row of integers per line.
+
+    Blank lines are skipped, and so is a first line that is not all integers (a
+    header naming the columns).
+    """
+    rows = []
+    first = True
+    for line_number, row in enumerate(csv.reader(infile), 1):
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        try:
+            rows.append([int(cell) for cell in cells])
+        except ValueError:
+            if not first:
+                raise ValueError(f"Line {line_number}: expected integers, got {row}")
+        first = False
+    return rows
+
+
+def write_columns(outfile, outputs: list):
+    """Writes execute_batch outputs as CSV: a header of variable names, then one line per row"""
+    writer = csv.writer(outfile, lineterminator="\n")
+    writer.writerow([name for name, _ in outputs])
+    writer.writerows(zip(*(column for _, column in outputs)))
+
+
+# =============
+# Main function
+# =============
+def main():
+    if len(sys.argv) not in [4, 5] or sys.argv[1] != "run":
+        sys.stderr.write(
+            "Use of command:\n  run <RISC code file> <input CSV file> [output CSV file]\n"
+        )
+        sys.exit(1)
+
+    try:
+        program = load_program(sys.argv[2])
+    except ValueError as e:
+        sys.stderr.write(f'Cannot load input file "{sys.argv[2]}": {e}\n')
+        sys.exit(1)
+
+    try:
+        with open(sys.argv[3], "r", newline="") as infile:
+            rows = read_rows(infile)
+        outputs = execute_batch(program, rows)
+    except (IOError, ValueError, OverflowError) as e:
+        sys.stderr.write(f'Cannot run on inputs "{sys.argv[3]}": {e}\n')
+        sys.exit(1)
+
+    if len(sys.argv) == 5:
+        with open(sys.argv[4], "w", newline="") as outfile:
+            write_columns(outfile, outputs)
+    else:
+        write_columns(sys.stdout, outputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import io
+import random
+import unittest
+import BatchInterpreter
+import Interpreter
+from Compiler import compile_source
+
+
+class BatchInterpreterTests(unittest.TestCase):
+    def check_against_scalar(self, program, rows, use_numpy):
+        outputs = BatchInterpreter.execute_batch(program, rows, use_numpy)
+        for i, row in enumerate(rows):
+            self.assertEqual(
+                [(name, int(column[i])) for name, column in outputs],
+                Interpreter.collect_outputs(program, row),
+            )
+
+    def test_matches_scalar_interpreter(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        rows = [[value] for value in range(-20, 20)]
+        self.check_against_scalar(program, rows, use_numpy=False)
+
+    def test_compiled_program(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            program = Interpreter.decode_program(compile_source(f.read())[0])
+        rng = random.Random(0)
+        rows = [[rng.randint(-100, 100) for _ in range(3)] for _ in range(50)]
+        self.check_against_scalar(program, rows, use_numpy=False)
+
+    @unittest.skipUnless(BatchInterpreter.numpy, "NumPy is not installed")
+    def test_numpy(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        rows = [[value] for value in range(-20, 20)]
+        self.check_against_scalar(program, rows, use_numpy=True)
+        outputs = BatchInterpreter.execute_batch(
+            program, BatchInterpreter.numpy.array(rows), use_numpy=True
+        )
+        self.assertEqual(len(outputs[0][1]), 40)
+
+    def test_constant_outputs(self):
+        program = Interpreter.decode_program(compile_source("a=+12;%a;?b;%b!")[0])
+        outputs = BatchInterpreter.execute_batch(program, [[4], [5]], use_numpy=False)
+        self.assertEqual(outputs, [("a", [3, 3]), ("b", [4, 5])])
+        self.assertEqual(
+            BatchInterpreter.execute_batch(program, [], use_numpy=False),
+            [("a", []), ("b", [])],
+        )
+
+    def test_int64_wrapping(self):
+        wrap = BatchInterpreter.wrap_int64
+        self.assertEqual(wrap(5), 5)
+        self.assertEqual(wrap(-(1 << 63)), -(1 << 63))
+        self.assertEqual(wrap(1 << 63), -(1 << 63))
+        self.assertEqual(wrap((1 << 64) + 7), 7)
+        self.assertEqual(wrap(-(1 << 63) - 1), (1 << 63) - 1)
+
+        # Constants combined on the NumPy path stay within int64
+        multiply = BatchInterpreter._int64_operation(
+            Interpreter.BINARY_OPERATIONS[Interpreter.MUL]
+        )
+        self.assertEqual(multiply(1 << 62, 4), 0)
+        self.assertEqual(multiply(3, -(1 << 62)), 1 << 62)
+
+    def test_wrong_row_width(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        with self.assertRaises(ValueError):
+            BatchInterpreter.execute_batch(program, [[1], [2, 3]], use_numpy=False)
+
+    def test_csv(self):
+        rows = BatchInterpreter.read_rows(io.StringIO("b\n1\n\n 2 \n"))
+        self.assertEqual(rows, [[1], [2]])
+        with self.assertRaises(ValueError):
+            BatchInterpreter.read_rows(io.StringIO("1\nx\n"))
+
+        program = Interpreter.decode_program(compile_source("?a;b=*a2;%b;%a!")[0])
+        outfile = io.StringIO()
+        BatchInterpreter.write_columns(
+            outfile, BatchInterpreter.execute_batch(program, rows, use_numpy=False)
+        )
+        self.assertEqual(outfile.getvalue(), "b,a\n2,1\n4,2\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
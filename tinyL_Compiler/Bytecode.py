@@ -0,0 +1,274 @@
+import mmap
+import struct
+import sys
+from array import array
+from itertools import compress
+from Instruction import Instruction, OpCode, read_instruction_list
+from Interpreter import (
+    ADD,
+    AND,
+    LOAD,
+    LOADI,
+    MUL,
+    NUM_VARIABLES,
+    OR,
+    READ,
+    STORE,
+    SUB,
+    VARIABLE_NAMES,
+    WRITE,
+    DecodedProgram,
+    decode_program,
+    execute,
+)
+
+# ===============
+# Bytecode format
+# ===============
+#
+# A bytecode file is a 16 byte header followed by one 16 byte record per
+# instruction, all little endian 32-bit integers:
+#
+#   header: b"TLBC", version, instruction count, highest register number
+#   record: opcode, field1, field2, field3
+#
+# Record fields are encoded like a DecodedProgram: opcodes are the OpCode values,
+# variables are Memory indices (0 for a through 5 for f) and unused fields are 0.
+# The opcode gets a full 32-bit slot so that every column stays aligned and can be
+# read straight out of the mapped file.
+
+MAGIC = b"TLBC"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+RECORD = struct.Struct("<iiii")
+FIELDS_PER_RECORD = 4
+
+# Memoryviews of the mapped file are only usable as-is on little endian machines
+NATIVE_LAYOUT = sys.byteorder == "little" and array("i").itemsize == 4
+
+OPCODES = bytes(opcode.value for opcode in OpCode)
+ARITHMETIC = [ADD, SUB, MUL, OR, AND]
+
+
+def _opcode_selector(opcodes: list) -> bytes:
+    """bytes.translate table mapping the given opcodes to 1 and any other byte to 0"""
+    return bytes(opcode in opcodes for opcode in range(256))
+
+
+# Opcodes whose field1, field2 and field3 hold a register number...
+REGISTER_FIELDS = (
+    _opcode_selector(ARITHMETIC + [LOAD, LOADI]),
+    _opcode_selector(ARITHMETIC + [STORE]),
+    _opcode_selector(ARITHMETIC),
+)
+# ... and a Memory index
+VARIABLE_FIELDS = tuple(map(_opcode_selector, [[STORE, READ, WRITE], [LOAD], []]))
+
+
+def encode_program(program: DecodedProgram) -> bytes:
+    """
+    Serializes a decoded program into the bytecode format.
+
+    Raises:
+    - ValueError: If an operand does not fit in 32 bits.
+    """
+    count = len(program)
+    records = array("i", bytes(RECORD.size * count))
+    try:
+        records[0::FIELDS_PER_RECORD] = array("i", program.opcodes)
+        records[1::FIELDS_PER_RECORD] = array("i", program.field1)
+        records[2::FIELDS_PER_RECORD] = array("i", program.field2)
+        records[3::FIELDS_PER_RECORD] = array("i", program.field3)
+        header = HEADER.pack(MAGIC, VERSION, count, program.max_reg)
+    except (OverflowError, struct.error):
+        raise ValueError("Operand does not fit in a bytecode record")
+    if sys.byteorder != "little":
+        records.byteswap()
+    return header + records.tobytes()
+
+
+def write_bytecode(outfile, instr: Instruction) -> int:
+    """
+    Writes the linked list of instructions starting at instr as bytecode.
+
+    Parameters:
+    - outfile: A path to the file to (over)write, or an open binary stream.
+    - instr: The first Instruction object in the linked list.
+
+    Raises:
+    - ValueError: If outfile is None or empty, an instruction uses a variable
+                  outside a-f, or an operand does not fit in 32 bits.
+
+    Returns:
+    - The number of instructions written.
+    """
+    if not outfile:
+        raise ValueError("File error")
+    program = decode_program(instr)
+    data = encode_program(program)
+    if isinstance(outfile, str):
+        with open(outfile, "wb") as f:
+            f.write(data)
+    else:
+        outfile.write(data)
+    return len(program)
+
+
+def decode_bytecode(buffer) -> DecodedProgram:
+    """
+    Builds a DecodedProgram over a bytecode buffer (bytes, bytearray or mmap).
+
+    On little endian machines the program's columns are strided memoryviews of the
+    buffer itself, so the fields are never copied or parsed; they keep the buffer
+    alive for as long as the program is in use. The operands are range checked
+    (see check_operands).
+
+    Raises:
+    - ValueError: If the buffer is not a complete bytecode file, or has an unknown
+                  opcode or an operand out of range ("File error").
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError("Invalid bytecode file")
+    magic, version, count, max_reg = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Invalid bytecode file")
+    if len(buffer) != HEADER.size + RECORD.size * count:
+        raise ValueError("Truncated bytecode file")
+
+    if NATIVE_LAYOUT:
+        fields = memoryview(buffer)[HEADER.size :].cast("i")
+    else:
+        fields = array("i")
+        fields.frombytes(memoryview(buffer)[HEADER.size :])
+        if sys.byteorder != "little":
+            fields.byteswap()
+    program = DecodedProgram(
+        fields[0::FIELDS_PER_RECORD],
+        fields[1::FIELDS_PER_RECORD],
+        fields[2::FIELDS_PER_RECORD],
+        fields[3::FIELDS_PER_RECORD],
+        max_reg,
+    )
+    check_operands(program)
+    return program
+
+
+def check_operands(program: DecodedProgram):
+    """
+    Checks that every opcode of a decoded program is known, that its variable
+    operands are within Memory and that max_reg is exactly its highest register
+    operand (0 if it uses none), so a corrupt file can neither make the interpreter
+    index out of range nor make it allocate a huge register file.
+
+    The opcodes are copied into bytes once; the fields of each kind are then picked
+    out with bytes.translate and itertools.compress and checked with min and max,
+    so the columns are never walked in Python code.
+
+    Raises:
+    - ValueError: If an opcode or operand is out of range, or max_reg is not the
+                  highest register operand.
+    """
+    try:
+        opcodes = array("B", program.opcodes).tobytes()
+    except OverflowError:
+        raise ValueError("File error")
+    if opcodes.translate(None, OPCODES):
+        raise ValueError("File error")
+    highest_register = 0
+    columns = (program.field1, program.field2, program.field3)
+    for column, registers, variables in zip(columns, REGISTER_FIELDS, VARIABLE_FIELDS):
+        values = list(compress(column, opcodes.translate(registers)))
+        if values:
+            if min(values) < 0:
+                raise ValueError("File error")
+            highest_register = max(highest_register, max(values))
+        if any(variables):
+            values = list(compress(column, opcodes.translate(variables)))
+            if values and (min(values) < 0 or max(values) >= NUM_VARIABLES):
+                raise ValueError("File error")
+    if program.max_reg != highest_register:
+        raise ValueError("File error")
+
+
+def load_bytecode(infile_path: str) -> DecodedProgram:
+    """
+    Memory-maps the bytecode file at infile_path and returns it as a DecodedProgram,
+    ready for Interpreter.execute.
+
+    Raises:
+    - ValueError: If the file cannot be opened or is not a bytecode file.
+    """
+    try:
+        with open(infile_path, "rb") as infile:
+            if infile.seek(0, 2) == 0:
+                raise ValueError("Invalid bytecode file")
+            mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except IOError:
+        raise ValueError("File error")
+    return decode_bytecode(mapped)
+
+
+def read_bytecode_list(infile_path: str) -> Instruction:
+    """Reads a bytecode file back into a linked list of instructions, returns the head"""
+    program = load_bytecode(infile_path)
+    head = tail = None
+
+    for opcode, f1, f2, f3 in zip(
+        program.opcodes, program.field1, program.field2, program.field3
+    ):
+        if opcode == LOAD:
+            instr = Instruction(opcode, f1, VARIABLE_NAMES[f2])
+        elif opcode == LOADI:
+            instr = Instruction(opcode, f1, f2)
+        elif opcode == STORE:
+            instr = Instruction(opcode, VARIABLE_NAMES[f1], f2)
+        elif opcode == READ or opcode == WRITE:
+            instr = Instruction(opcode, VARIABLE_NAMES[f1])
+        else:
+            instr = Instruction(opcode, f1, f2, f3)
+
+        if not head:
+            head = tail = instr
+        else:
+            tail.next = instr
+            instr.prev = tail
+            tail = instr
+
+    return head
+
+
+# =============
+# Main function
+# =============
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "assemble":
+        try:
+            head = read_instruction_list(sys.argv[2])
+        except ValueError:
+            sys.stderr.write(f'Cannot open input file "{sys.argv[2]}"\n')
+            sys.exit(1)
+        if not head:
+            sys.stderr.write(f'No instructions in "{sys.argv[2]}"\n')
+            sys.exit(1)
+        count = write_bytecode(sys.argv[3], head)
+        print(f'Wrote {count} instructions to "{sys.argv[3]}".')
+        return
+
+    if len(sys.argv) != 3 or sys.argv[1] != "run":
+        sys.stderr.write(
+            "Use of command:\n  assemble <RISC code file> <bytecode file>\n"
+            "  run <bytecode file>\n"
+        )
+        sys.exit(1)
+
+    try:
+        program = load_bytecode(sys.argv[2])
+    except ValueError:
+        sys.stderr.write(f'Cannot open bytecode file "{sys.argv[2]}"\n')
+        sys.exit(1)
+
+    execute(program)
+
+
+if __name__ == "__main__":
+    main()
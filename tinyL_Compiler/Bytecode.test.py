@@ -0,0 +1,142 @@
+import os
+import tempfile
+import unittest
+import Bytecode
+import Interpreter
+from Compiler import compile_source
+from Instruction import Instruction, OpCode, format_instruction, read_instruction_list
+
+
+class BytecodeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "program.bc")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def listing(self, head):
+        lines = []
+        while head:
+            lines.append(format_instruction(head))
+            head = head.next
+        return lines
+
+    def test_round_trip(self):
+        head = read_instruction_list("Interpreter.test.s")
+        self.assertEqual(Bytecode.write_bytecode(self.path, head), 18)
+        self.assertEqual(
+            os.path.getsize(self.path),
+            Bytecode.HEADER.size + 18 * Bytecode.RECORD.size,
+        )
+        self.assertEqual(
+            self.listing(Bytecode.read_bytecode_list(self.path)), self.listing(head)
+        )
+
+    def test_load_matches_decode_program(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            head = compile_source(f.read())[0]
+        Bytecode.write_bytecode(self.path, head)
+        expected = Interpreter.decode_program(head)
+        program = Bytecode.load_bytecode(self.path)
+        self.assertEqual(len(program), len(expected))
+        self.assertEqual(program.max_reg, expected.max_reg)
+        for column in ["opcodes", "field1", "field2", "field3"]:
+            self.assertEqual(
+                list(getattr(program, column)), list(getattr(expected, column))
+            )
+
+    def test_execute_loaded_program(self):
+        head = read_instruction_list("Interpreter.test.s")
+        Bytecode.write_bytecode(self.path, head)
+        outputs = []
+        count = Interpreter.execute(
+            Bytecode.load_bytecode(self.path),
+            read_value=lambda name: 12,
+            write_value=lambda name, value: outputs.append((name, value)),
+        )
+        self.assertEqual(
+            outputs, [("a", 15), ("b", 9), ("c", 36), ("d", 12 & 3), ("f", 12 | 3)]
+        )
+        self.assertEqual(count, 18)
+
+    def test_operand_too_large(self):
+        with self.assertRaises(ValueError):
+            Bytecode.write_bytecode(self.path, Instruction(OpCode.LOADI, 1, 2**40))
+
+    def test_invalid_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"LOAD r1 a\n")
+        with self.assertRaises(ValueError):
+            Bytecode.load_bytecode(self.path)
+
+        Bytecode.write_bytecode(self.path, Instruction(OpCode.READ, "a"))
+        with open(self.path, "ab") as f:
+            f.write(b"\0" * 4)
+        with self.assertRaises(ValueError):
+            Bytecode.load_bytecode(self.path)
+
+        with self.assertRaises(ValueError):
+            Bytecode.load_bytecode(os.path.join(self.tmp.name, "missing.bc"))
+
+    def test_out_of_range_operands(self):
+        head = read_instruction_list("Interpreter.test.s")
+        valid = bytearray(Bytecode.encode_program(Interpreter.decode_program(head)))
+        program = Bytecode.decode_bytecode(valid)
+        opcodes = list(program.opcodes)
+        header, record_size = Bytecode.HEADER.size, Bytecode.RECORD.size
+        record = header + opcodes.index(Interpreter.ADD) * record_size
+        for offset, value in [
+            (0, 0),  # opcode
+            (0, 11),
+            (4, program.max_reg + 1),  # result register
+            (8, -1),  # operand register
+        ]:
+            corrupt = bytearray(valid)
+            corrupt[record + offset : record + offset + 4] = value.to_bytes(
+                4, "little", signed=True
+            )
+            with self.assertRaisesRegex(ValueError, "File error"):
+                Bytecode.decode_bytecode(corrupt)
+
+        record = header + opcodes.index(Interpreter.READ) * record_size
+        corrupt = bytearray(valid)
+        corrupt[record + 4 : record + 8] = (6).to_bytes(4, "little")  # no variable g
+        with self.assertRaisesRegex(ValueError, "File error"):
+            Bytecode.decode_bytecode(corrupt)
+
+    def test_header_register_count(self):
+        # One READ a record, but a header asking for a 2**31 entry register file
+        record = Bytecode.RECORD.pack(Interpreter.READ, 0, 0, 0)
+        header = Bytecode.HEADER.pack(Bytecode.MAGIC, Bytecode.VERSION, 1, 2**31)
+        with self.assertRaisesRegex(ValueError, "File error"):
+            Bytecode.decode_bytecode(header + record)
+
+        program = Interpreter.decode_program(read_instruction_list("Interpreter.test.s"))
+        valid = Bytecode.encode_program(program)
+        self.assertEqual(Bytecode.decode_bytecode(valid).max_reg, program.max_reg)
+        header = Bytecode.HEADER.pack(
+            Bytecode.MAGIC, Bytecode.VERSION, len(program), program.max_reg + 1
+        )
+        with self.assertRaisesRegex(ValueError, "File error"):
+            Bytecode.decode_bytecode(header + valid[Bytecode.HEADER.size :])
+
+    def test_copied_layout(self):
+        # The decoding used where the file cannot be viewed in place
+        head = read_instruction_list("Interpreter.test.s")
+        expected = Interpreter.decode_program(head)
+        buffer = Bytecode.encode_program(expected)
+        native_layout = Bytecode.NATIVE_LAYOUT
+        Bytecode.NATIVE_LAYOUT = False
+        try:
+            program = Bytecode.decode_bytecode(buffer)
+        finally:
+            Bytecode.NATIVE_LAYOUT = native_layout
+        self.assertEqual(list(program.opcodes), list(expected.opcodes))
+        self.assertEqual(list(program.field1), list(expected.field1))
+        self.assertEqual(list(program.field2), list(expected.field2))
+        self.assertEqual(list(program.field3), list(expected.field3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+from Compiler import compile_source
+from Instruction import InstructionWriter
+from Optimizer import optimize
+
+# Bump whenever the compiler or optimizer output for the same source changes, so
+# entries written by older versions are never served
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = ".tinyL_cache"
+DEFAULT_MAX_BYTES = 64 << 20
+ENTRY_SUFFIX = ".out"
+STATS_FILE = "stats.json"
+
+
+def normalize_source(source: str) -> str:
+    """Every tinyL token is one character, so whitespace never changes the compiled code"""
+    return "".join(source.split())
+
+
+class CompileCache:
+    """
+    Content-addressed on-disk cache of compiled tinyL programs.
+
+    Entries are keyed by a hash of the normalized source and the compile options, and
+    hold the RISC code as text (exactly what the compiler writes to tinyL.out). A hit
+    is served from the file without running the parser. The directory is kept under
+    max_bytes by evicting the least recently used entries, using each entry's
+    modification time, which is refreshed on every hit.
+
+    hits, misses and evictions count this instance's lookups; save_stats adds them
+    to the totals kept in the cache directory.
+    """
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, source: str, optimized: bool = False) -> str:
+        options = f"v{CACHE_VERSION};optimize={int(optimized)};"
+        return hashlib.sha256((options + normalize_source(source)).encode()).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def get(self, source: str, optimized: bool = False) -> str:
+        """
+        Returns the RISC code for source, compiling (and optionally optimizing) it
+        only if it is not cached yet. Sources that fail to compile raise as usual and
+        are not cached.
+        """
+        path = self.entry_path(self.key(source, optimized))
+        try:
+            with open(path, "r") as f:
+                code = f.read()
+            os.utime(path)
+            self.hits += 1
+            return code
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        head = compile_source(source)[0]
+        if optimized:
+            head = optimize(head)
+        stream = io.StringIO()
+        with InstructionWriter(stream) as writer:
+            writer.write_list(head)
+        code = stream.getvalue()
+        self.store(path, code)
+        return code
+
+    def store(self, path: str, code: str):
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(code)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self) -> list:
+        """Returns (modification time, size, path) of every entry, oldest first"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # evicted by another process
+            total -= size
+            self.evictions += 1
+
+    def compile_file(
+        self, infile_path: str, outfile_path: str, optimized: bool = False
+    ) -> int:
+        """Like Compiler.compile_file, but through the cache. Returns the instruction count"""
+        with open(infile_path, "r") as infile:
+            code = self.get(infile.read(), optimized)
+        with open(outfile_path, "w") as outfile:
+            outfile.write(code)
+        return code.count("\n")
+
+    def stats(self) -> dict:
+        """Totals saved in the cache directory plus this instance's counters"""
+        totals = {"hits": 0, "misses": 0, "evictions": 0}
+        try:
+            with open(os.path.join(self.cache_dir, STATS_FILE), "r") as f:
+                totals.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            pass
+        totals["hits"] += self.hits
+        totals["misses"] += self.misses
+        totals["evictions"] += self.evictions
+        return totals
+
+    def save_stats(self):
+        """Adds this instance's counters to the totals in the cache directory and resets them"""
+        totals = self.stats()
+        with open(os.path.join(self.cache_dir, STATS_FILE), "w") as f:
+            json.dump(totals, f)
+        self.hits = self.misses = self.evictions = 0
+
+
+def format_stats(cache: CompileCache) -> str:
+    stats = cache.stats()
+    entries = cache.entries()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = 100 * stats["hits"] / lookups if lookups else 0
+    return (
+        f"cache {cache.cache_dir}: {len(entries)} entries, "
+        f"{sum(size for _, size, _ in entries)} of {cache.max_bytes} bytes\n"
+        f"hits {stats['hits']}, misses {stats['misses']} ({hit_rate:.1f}% hits), "
+        f"evictions {stats['evictions']}\n"
+    )
+
+
+# =============
+# Main function
+# =============
+def main() -> int:
+    cache = CompileCache(os.environ.get("TINYL_CACHE_DIR", DEFAULT_CACHE_DIR))
+    args = sys.argv[1:]
+
+    if args == ["stats"]:
+        sys.stdout.write(format_stats(cache))
+        return 0
+
+    flags = {arg for arg in args if arg.startswith("--")}
+    args = [arg for arg in args if not arg.startswith("--")]
+    if len(args) != 2 or args[0] != "compile" or not flags <= {"--optimize", "--stats"}:
+        sys.stderr.write(
+            "Use of command:\n  compile <tinyL file> [--optimize] [--stats]\n  stats\n"
+            "The cache directory is $TINYL_CACHE_DIR, or .tinyL_cache by default.\n"
+        )
+        return 1
+
+    outfile_path = "tinyL.out"
+    try:
+        cache.compile_file(args[1], outfile_path, "--optimize" in flags)
+    except Exception as e:
+        sys.stderr.write(f'Failed to compile "{args[1]}": {e}\n')
+        return 1
+    finally:
+        cache.save_stats()
+
+    print(f'Code written to file "{outfile_path}".')
+    if "--stats" in flags:
+        sys.stdout.write(format_stats(cache))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import CompileCache
+from Compiler import compile_source
+from Instruction import format_instruction
+
+
+class CompileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = CompileCache.CompileCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self, source):
+        return "".join(format_instruction(i) for i in compile_source(source))
+
+    def test_miss_then_hit(self):
+        source = "?a;b=+a1;%b!"
+        self.assertEqual(self.cache.get(source), self.expected(source))
+        with mock.patch.object(CompileCache, "compile_source") as compile_mock:
+            self.assertEqual(self.cache.get(source), self.expected(source))
+            compile_mock.assert_not_called()
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_normalizes_whitespace(self):
+        self.cache.get("?a;\n%a!\n")
+        self.cache.get(" ? a ; % a !")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_options_are_part_of_key(self):
+        source = "a=+12;%a!"
+        plain = self.cache.get(source)
+        optimized = self.cache.get(source, optimized=True)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(optimized, "LOADI r1 #3\nSTORE a r1\nWRITE a\n")
+        self.assertEqual(plain, self.expected(source))
+
+    def test_errors_are_not_cached(self):
+        with self.assertRaises(Exception):
+            self.cache.get("?a;x!")
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_lru_eviction(self):
+        sources = [f"a={digit};%a!" for digit in range(4)]
+        entry_size = len(self.cache.get(sources[0]))
+        self.cache.max_bytes = 3 * entry_size
+        for i, source in enumerate(sources[1:3], 1):
+            self.cache.get(source)
+            path = self.cache.entry_path(self.cache.key(source))
+            os.utime(path, (i, i))
+        os.utime(self.cache.entry_path(self.cache.key(sources[0])), (3, 3))
+        # Entry 1 is now the least recently used and makes room for entry 3
+        self.cache.get(sources[3])
+        self.assertEqual(self.cache.evictions, 1)
+        cached = {path for _, _, path in self.cache.entries()}
+        self.assertNotIn(self.cache.entry_path(self.cache.key(sources[1])), cached)
+        self.assertEqual(len(cached), 3)
+
+    def test_compile_file_and_stats(self):
+        out_path = os.path.join(self.tmp.name, "tinyL.out")
+        for _ in range(3):
+            count = self.cache.compile_file("./tinyL_tests/comp01.tinyL", out_path)
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            expected = self.expected(f.read())
+        with open(out_path) as f:
+            self.assertEqual(f.read(), expected)
+        self.assertEqual(count, expected.count("\n"))
+
+        self.cache.save_stats()
+        reopened = CompileCache.CompileCache(self.tmp.name)
+        reopened.compile_file("./tinyL_tests/comp01.tinyL", out_path)
+        self.assertEqual(reopened.stats(), {"hits": 3, "misses": 1, "evictions": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import operator
+import os
+import re
 import sys
-from Instruction import Instruction, OpCode, print_instruction
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, count
+from Instruction import Instruction, InstructionWriter, OpCode
 
 
 def current_func_name(n: int = 0):
@@ -13,18 +18,6 @@ def current_func_name(n: int = 0):
     sys._getframe(n + 1).f_code.co_name
 
 
-# ========
-# Globals
-# ========
-
-# Note: I know global variables are bad practice in
-# general, but I'm doing this to mirror the scaffolding
-# given for the project in the C implementation
-regnum = 0
-content = None
-token, token_idx = None, None
-outfile = None
-
 # =========
 # Utilities
 # =========
@@ -34,16 +27,30 @@ def error(msg: str):
     raise Exception(msg)
 
 
-def next_register():
-    # this declares that regnum should reference global
-    # regnum identifier
-    global regnum
-    regnum += 1
-    return regnum
+# Binary operators of <expr> and the instruction each one generates
+OPERATORS = {
+    "+": OpCode.ADD,
+    "-": OpCode.SUB,
+    "*": OpCode.MUL,
+    "&": OpCode.AND,
+    "|": OpCode.OR,
+}
+
+# Character classes of the tokens; "=", "?", "%", ";" and "!" are classes of their own
+DIGIT, VARIABLE, OPERATOR, INVALID = "d", "v", "o", "x"
+TOKEN_CLASSES = {
+    **dict.fromkeys("0123456789", DIGIT),
+    **dict.fromkeys("abcdef", VARIABLE),
+    **dict.fromkeys(OPERATORS, OPERATOR),
+    **{c: c for c in "=?%;!"},
+}
+# Class of every character code below 256, for str.translate (see classify)
+CLASS_TABLE = "".join(TOKEN_CLASSES.get(chr(i), INVALID) for i in range(256))
+STATEMENT_START = (VARIABLE, "?", "%")
 
 
 def is_digit(c: str):
-    return c in ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+    return TOKEN_CLASSES.get(c) == DIGIT
 
 
 def to_digit(c: str) -> int:
@@ -53,203 +60,495 @@ def to_digit(c: str) -> int:
 
 
 def is_identifier(c: str):
-    return c in ["a", "b", "c", "d", "e", "f"]
-
-
-def read_input(filepath):
-    global token, token_idx, content
-    file = open(filepath, "r")
-    content = file.read()
-    token = content[0]
-    token_idx = 0
-    file.close()
-    return content.strip()
+    return TOKEN_CLASSES.get(c) == VARIABLE
 
 
-def next_token():
-    global token, token_idx, content
-    if content is None or token is None or token_idx is None:
-        error("No content to parse, content is None")
-    token_idx += 1
-    token = content[token_idx]
-
-
-def code_gen(opcode: OpCode, field1, field2=None, field3=None):
-    instr = Instruction(opcode, field1, field2, field3)
+def token_chunks(source, chunk_size: int = 1 << 16):
+    """
+    Yields the tokens of a tinyL program as strings, a chunk at a time.
 
-    if outfile is None:
-        error("File Error: Outfile is None")
-        sys.exit(1)
+    Every tinyL token is a single character, so tokens are the non-whitespace
+    characters of the source. source can be a string (yielded as one chunk), or
+    anything with a read(size) method returning str or ASCII bytes (a text or binary
+    file, an mmap), which is consumed chunk_size characters at a time so the whole
+    program never has to be in memory.
+    """
+    if isinstance(source, str):
+        yield "".join(source.split())
+        return
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = chunk.decode("ascii")
+        yield "".join(chunk.split())
 
-    print_instruction(outfile, instr)
 
+def tokenize(source, chunk_size: int = 1 << 16):
+    """Yields the tokens of a tinyL program one at a time, see token_chunks"""
+    for chunk in token_chunks(source, chunk_size):
+        yield from chunk
 
-# ======================================================
-# Mutually Recursive Helpers for LL(1) Recursive Descent
-# ======================================================
-def digit():
-    global token
-    reg = next_register()
-    code_gen(OpCode.LOADI, reg, token)
-    next_token()
-    return reg
 
+def classify(tokens: str) -> str:
+    """Returns the class of every token (DIGIT, VARIABLE, ...) as a string of the same length"""
+    return tokens.translate(CLASS_TABLE)
 
-def variable():
-    global token
-    reg = next_register()
-    code_gen(OpCode.LOAD, reg, token)
-    next_token()
-    return reg
 
+def scan(content: str):
+    """
+    Splits a whole tinyL program into tokens, everything after the first "!" dropped.
 
-def expr():
-    global token
-    reg, left_reg, right_reg = None, None, None
+    Returns:
+        (tokens, classes): the tokens as a string and their classes, see classify
+    """
+    tokens = "".join(content.split())
+    end = tokens.find("!")
+    if end >= 0:
+        tokens = tokens[: end + 1]
+    return tokens, classify(tokens)
+
+
+# <stmt> over token classes; expressions are only checked for their symbols here.
+# Expression symbols and separators are disjoint classes, so a failed match never
+# backtracks more than one statement.
+_STATEMENT = r"(?:v=[dvo]+|[?%]v)"
+_VALID_PROGRAM = re.compile(rf"(?:{_STATEMENT};)*{_STATEMENT}!")
+# Longest start of a program whose statements are well formed
+_VALID_PREFIX = re.compile(rf"(?:{_STATEMENT};)*(?:v(?:=[dvo]*)?|[?%]v?)?")
+# Change of the number of operands still missing at each class, plus one so it fits
+# in a byte: "=" opens two (the assigned variable is counted as an operand), "?",
+# "%" and operators one, variables and digits fill one, separators change nothing
+_MISSING_OPERANDS = bytes.maketrans(b"=?%ovd;!", bytes([3, 2, 2, 2, 0, 0, 1, 1]))
+_SEPARATORS = bytes(c in b";!" for c in range(256))
+
+
+def validate(tokens: str, classes: str):
+    """
+    Checks in one pass over the token classes that tokens form a tinyL program.
 
-    if token == "+":
-        next_token()
-        left_reg = expr()
-        right_reg = expr()
-        reg = next_register()
-        code_gen(OpCode.ADD, reg, left_reg, right_reg)
-        return reg
-    elif token == "-":
-        next_token()
-        left_reg = expr()
-        right_reg = expr()
-        reg = next_register()
-        code_gen(OpCode.SUB, reg, left_reg, right_reg)
-        return reg
-    elif token == "*":
-        next_token()
-        left_reg = expr()
-        right_reg = expr()
-        reg = next_register()
-        code_gen(OpCode.MUL, reg, left_reg, right_reg)
-        return reg
-    elif token == "&":
-        next_token()
-        left_reg = expr()
-        right_reg = expr()
-        reg = next_register()
-        code_gen(OpCode.AND, reg, left_reg, right_reg)
-        return reg
-    elif token == "|":
-        next_token()
-        left_reg = expr()
-        right_reg = expr()
-        reg = next_register()
-        code_gen(OpCode.OR, reg, left_reg, right_reg)
-        return reg
-    elif is_digit(token):
-        return digit()
-    elif is_identifier(token):
-        return variable()
-    else:
-        error(f"Symbol {token} unknown")
-        sys.exit(1)
+    A regular expression checks the statements and separators. An <expr> is
+    complete once it has one operand more than it has operators, so counting the
+    operands still missing (see _MISSING_OPERANDS) over the whole program, the
+    count must drop to 0 exactly at the last token of every statement. Both checks
+    run in C (re, bytes.translate, itertools) rather than token by token.
 
+    Raises:
+    - Exception: If the program is not valid, naming the first token that is wrong.
+    """
+    valid = _VALID_PROGRAM.fullmatch(classes) is not None
+    end = len(classes) if valid else _VALID_PREFIX.match(classes).end()
+    # Anything after the well formed part is treated as the end of the program
+    checked = classes[:end].encode("ascii") + (b"" if valid else b"!")
+    steps = checked.translate(_MISSING_OPERANDS)
+    complete = bytes(map(operator.eq, accumulate(steps), count(1)))
+    separators = checked.translate(_SEPARATORS)
+    expected = bytes(map(operator.or_, separators, separators[1:] + b"\1"))
+    if valid and complete == expected:
+        return
+
+    position = end
+    if complete != expected:
+        mismatch = next(i for i, pair in enumerate(zip(complete, expected)) if pair[0] != pair[1])
+        position = min(position, mismatch + 1)
+    token = tokens[position] if position < len(tokens) else None
+    error(f"Program error.  Current input symbol is {describe_token(token)}")
+
+
+def describe_token(token) -> str:
+    """Names the current token for error messages"""
+    return "end of input" if token is None else token
 
-def assign():
-    global token
-    identifier = token
 
-    next_token()  # skip identifier
+# ========
+# Compiler
+# ========
 
-    if token != "=":
-        error(f"Symbol {token} unknown")
-        sys.exit(1)
 
-    next_token()  # skip =
+class Compiler:
+    """
+    LL(1) recursive descent compiler for a single tinyL program.
 
-    expr_result_reg = expr()
-    code_gen(OpCode.STORE, identifier, expr_result_reg)
+    The C scaffolding keeps the parser state (regnum, buffer, outfile) in globals,
+    here every Compiler instance carries its own copy so that any number of programs
+    can be compiled in the same process, or in different threads, at the same time.
 
+    Emitted instructions go to outfile (anything with a write(instr) method, usually
+    an InstructionWriter), or are collected in self.instructions if no outfile is given.
 
-def read():
-    global token
-    next_token()  # skip ?
-    identifier = token
-    code_gen(OpCode.READ, identifier)
-    next_token()  # skip identifier
+    The parser works on a pre-classified token array: tokens holds the current
+    chunk of tokens as a string, classes their classes (see classify), and the
+    current token and its class are tokens[position] and classes[position].
+    """
 
+    def __init__(self, outfile=None):
+        self.regnum = 1  # next free virtual register number
+        self.tokens = self.classes = None  # current chunk of tokens, see token_chunks
+        self.chunks = iter(())  # the remaining chunks
+        self.position = 0
+        self.token, self.token_class, self.token_idx = None, None, None
+        self.outfile = outfile
+        self.instructions = []
+        self.emit = outfile.write if outfile is not None else self.instructions.append
+
+    # =========
+    # Utilities
+    # =========
+
+    def next_register(self):
+        reg = self.regnum
+        self.regnum += 1
+        return reg
 
-def tinyL_print():
-    global token
-    next_token()  # skip %
-    identifier = token
-    code_gen(OpCode.WRITE, identifier)
-    next_token()  # skip identifier
+    def set_tokens(self, tokens: str, classes: str):
+        self.tokens, self.classes, self.position = tokens, classes, 0
+        if tokens:
+            self.token, self.token_class = tokens[0], classes[0]
+        else:
+            self.next_chunk()
+
+    def next_chunk(self):
+        for tokens in self.chunks:
+            if tokens:
+                self.set_tokens(tokens, classify(tokens))
+                return
+        # token becomes None past the end of the input, e.g. after a final "!"
+        self.token = self.token_class = None
+
+    def set_stream(self, source):
+        """
+        Parses tokens lazily from source (a string, file object or mmap), a chunk at
+        a time. Syntax errors are only found when the parser gets to them.
+        """
+        self.chunks = token_chunks(source)
+        self.token_idx = 0
+        self.set_tokens("", "")
+
+    def set_input(self, content: str):
+        """
+        Parses the whole program content, which is validated up front: a syntax
+        error anywhere raises here, before any code is emitted.
+        """
+        tokens, classes = scan(content)
+        validate(tokens, classes)
+        self.chunks = iter(())
+        self.token_idx = 0
+        self.set_tokens(tokens, classes)
+        return content.strip()
+
+    def read_input(self, filepath):
+        with open(filepath, "r") as file:
+            return self.set_input(file.read())
+
+    def next_token(self):
+        if self.tokens is None:
+            error("No content to parse, content is None")
+        if self.token is None:
+            error("End of program input")
+        self.token_idx += 1
+        self.position += 1
+        if self.position < len(self.tokens):
+            self.token = self.tokens[self.position]
+            self.token_class = self.classes[self.position]
+        else:
+            self.next_chunk()
+
+    def code_gen(self, opcode: OpCode, field1, field2=None, field3=None):
+        self.emit(Instruction(opcode, field1, field2, field3))
+
+    # ===================================
+    # Helpers for LL(1) Recursive Descent
+    # ===================================
+    def digit(self):
+        reg = self.next_register()
+        self.code_gen(OpCode.LOADI, reg, self.token)
+        self.next_token()
+        return reg
 
+    def variable(self):
+        reg = self.next_register()
+        self.code_gen(OpCode.LOAD, reg, self.token)
+        self.next_token()
+        return reg
 
-def stmt():
-    global token
-    if is_identifier(token):
-        assign()
-    elif token == "?":
-        read()
-    elif token == "%":
-        tinyL_print()
+    def expr(self):
+        # <expr> ::= op <expr> <expr> nests once per operator, so rather than
+        # recursing, pending operators are kept on an explicit stack as
+        # [opcode, left_reg] with left_reg None until the left operand is done.
+        # Registers and instructions come out in the same order as recursive descent.
+        stack = []
+        while True:
+            token_class = self.token_class
+            if token_class == OPERATOR:
+                stack.append([OPERATORS[self.token], None])
+                self.next_token()
+                continue
+
+            if token_class == DIGIT:
+                reg = self.digit()
+            elif token_class == VARIABLE:
+                reg = self.variable()
+            else:
+                error(
+                    f"Program error.  Current input symbol is {describe_token(self.token)}"
+                )
+                sys.exit(1)
+
+            # Pop every operator whose right operand just completed
+            while stack:
+                pending = stack[-1]
+                if pending[1] is None:
+                    pending[1] = reg
+                    break
+                stack.pop()
+                result_reg = self.next_register()
+                self.code_gen(pending[0], result_reg, pending[1], reg)
+                reg = result_reg
+
+            if not stack:
+                return reg
+
+    def assign(self):
+        identifier = self.token
+
+        self.next_token()  # skip identifier
+
+        if self.token != "=":
+            error(
+                f"Program error.  Current input symbol is {describe_token(self.token)}"
+            )
+            sys.exit(1)
+
+        self.next_token()  # skip =
+
+        expr_result_reg = self.expr()
+        self.code_gen(OpCode.STORE, identifier, expr_result_reg)
+
+    def identifier(self) -> str:
+        if self.token_class != VARIABLE:
+            error(
+                f"Program error.  Current input symbol is {describe_token(self.token)}"
+            )
+            sys.exit(1)
+        identifier = self.token
+        self.next_token()
+        return identifier
+
+    def read(self):
+        self.next_token()  # skip ?
+        self.code_gen(OpCode.READ, self.identifier())
+
+    def tinyL_print(self):
+        self.next_token()  # skip %
+        self.code_gen(OpCode.WRITE, self.identifier())
+
+    def stmt(self):
+        if self.token_class == VARIABLE:
+            self.assign()
+        elif self.token == "?":
+            self.read()
+        elif self.token == "%":
+            self.tinyL_print()
+
+    def morestmts(self) -> bool:
+        """Consumes the statement separator, returns True if another statement follows"""
+        if self.token == ";":
+            self.next_token()
+            return True
+        elif self.token == "!":
+            self.next_token()
+            return False
+        else:
+            error(
+                f"Program error.  Current input symbol is {describe_token(self.token)}"
+            )
+            sys.exit(1)
+
+    def statements(self):
+        """Parses <stmtlist> one statement at a time, yielding after each statement"""
+        # <morestmts> ::= ; <stmtlist> is tail recursive, so loop over the
+        # statements instead of recursing once per statement
+        while True:
+            if self.token_class in STATEMENT_START:
+                self.stmt()
+            else:
+                error(
+                    f"Program error.  Current input symbol is {describe_token(self.token)}"
+                )
+                sys.exit(1)
+            yield
+            if not self.morestmts():
+                break
+
+    def stmtlist(self):
+        for _ in self.statements():
+            pass
+
+    def program(self):
+        if self.token_class in STATEMENT_START:
+            self.stmtlist()
+        else:
+            error(
+                f"Program error.  Current input symbol is {describe_token(self.token)}"
+            )
+            sys.exit(1)
+
+
+# ===============
+# Entry points
+# ===============
+
+
+def link_instructions(instrs: list) -> Instruction:
+    """Links a list of instructions through prev/next, returns the head (or None)"""
+    prev = None
+    for instr in instrs:
+        instr.prev = prev
+        if prev:
+            prev.next = instr
+        prev = instr
+    return instrs[0] if instrs else None
+
+
+def compile_source(content: str) -> list:
+    """
+    Compiles tinyL source text, returns the emitted instructions in order.
 
+    The instructions are also linked through prev/next, so the first element can be
+    handed to anything that expects the head of an instruction list.
+    """
+    compiler = Compiler()
+    compiler.set_input(content)
+    compiler.program()
+    link_instructions(compiler.instructions)
+    return compiler.instructions
 
-def morestmts():
-    global token
-    if token == ";":
-        next_token()
-        stmtlist()
-    elif token == "!":
-        next_token()
-    else:
-        error(f"Program error.  Current input symbol is {token}")
-        sys.exit(1)
 
+def iter_statements(source, outfile=None):
+    """
+    Compiles a tinyL program lazily, statement by statement.
 
-def stmtlist():
-    global token
-    if is_identifier(token) or token in ["?", "%"]:
-        stmt()
-        morestmts()
-    else:
-        error(f"Program error.  Current input symbol is {token}")
-        sys.exit(1)
+    source is anything tokenize accepts (a string, an open file, an mmap). Yields
+    the list of instructions of each statement as soon as the statement has been
+    parsed, so a consumer can run it before the rest of the program is read. If
+    outfile (e.g. an InstructionWriter) is given, every instruction is also written
+    to it.
+    """
+    compiler = Compiler()
+    compiler.set_stream(source)
+    for _ in compiler.statements():
+        instrs = list(compiler.instructions)
+        compiler.instructions.clear()
+        if outfile is not None:
+            for instr in instrs:
+                outfile.write(instr)
+        yield instrs
+
+
+def compile_file(infile_path: str, outfile_path: str) -> int:
+    """
+    Compiles the tinyL file at infile_path into outfile_path, returns the instruction
+    count.
+
+    The source is parsed lazily a chunk at a time (see Compiler.set_stream), so
+    memory use does not grow with the program. The code is written to
+    outfile_path + ".tmp", which replaces outfile_path once the whole program has
+    compiled: an invalid program leaves no partial output behind. Outputs that are
+    not regular files, such as os.devnull, are written directly.
+    """
+    if os.path.exists(outfile_path) and not os.path.isfile(outfile_path):
+        return _compile_stream(infile_path, outfile_path)
+
+    tmp_path = outfile_path + ".tmp"
+    try:
+        count = _compile_stream(infile_path, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, outfile_path)
+    return count
+
+
+def _compile_stream(infile_path: str, outfile_path: str) -> int:
+    with open(infile_path, "r") as infile, InstructionWriter(outfile_path) as writer:
+        compiler = Compiler(writer)
+        compiler.set_stream(infile)
+        compiler.program()
+    return writer.count
+
+
+def _compile_job(paths):
+    # Module level so ProcessPoolExecutor can pickle it
+    infile_path, outfile_path = paths
+    try:
+        return infile_path, compile_file(infile_path, outfile_path), None
+    except Exception as e:
+        return infile_path, 0, str(e)
+
+
+def compile_directory(src_dir: str, out_dir: str, max_workers: int = None) -> list:
+    """
+    Compiles every .tinyL file in src_dir to <name>.out in out_dir, in parallel.
 
+    Files are spread across a ProcessPoolExecutor with max_workers processes
+    (default: one per CPU), so large batches pay the interpreter startup cost once per
+    worker rather than once per file. A file that fails to compile does not stop the
+    batch.
 
-def program():
-    global token
-    if is_identifier(token) or token in ["?", "%"]:
-        stmtlist()
-    else:
-        error(f"Program error.  Current input symbol is {token}")
-        sys.exit(1)
+    Returns:
+        list of (source path, instruction count, error message or None), sorted by path
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [
+        (
+            os.path.join(src_dir, name),
+            os.path.join(out_dir, os.path.splitext(name)[0] + ".out"),
+        )
+        for name in sorted(os.listdir(src_dir))
+        if name.endswith(".tinyL")
+    ]
+    if not jobs:
+        return []
+
+    chunksize = max(1, len(jobs) // (4 * (max_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_compile_job, jobs, chunksize=chunksize))
 
 
 # =============
 # Main function
 # =============
 def main() -> int:
-    # Populate global outfile path
-    global outfile
-    outfile = "tinyL.out"
-
-    # Clear the file content before each test
-    open(outfile, "w").close()
+    outfile_path = "tinyL.out"
 
     print("------------------------------------------------")
     print("CS314 compiler for tinyL")
     print("------------------------------------------------")
 
+    if len(sys.argv) in [4, 5] and sys.argv[1] == "batch":
+        workers = int(sys.argv[4]) if len(sys.argv) == 5 else None
+        results = compile_directory(sys.argv[2], sys.argv[3], workers)
+        failures = [(path, err) for path, _, err in results if err]
+        for path, err in failures:
+            sys.stderr.write(f'Failed to compile "{path}": {err}\n')
+        print(
+            f"\nCompiled {len(results) - len(failures)} of {len(results)} "
+            f'files into "{sys.argv[3]}".\n'
+        )
+        return 1 if failures else 0
+
     if len(sys.argv) != 3:
-        sys.stderr.write("Use of command:\n  compile <tinyL file>\n")
+        sys.stderr.write(
+            "Use of command:\n  compile <tinyL file>\n"
+            "  batch <tinyL directory> <output directory> [workers]\n"
+        )
         sys.exit(1)
 
-    # Populate globals content and token
-    infile = sys.argv[2]
-    read_input(infile)
-
-    program()
+    compile_file(sys.argv[2], outfile_path)
 
-    print(f'\nCode written to file "{outfile}".\n')
+    print(f'\nCode written to file "{outfile_path}".\n')
 
     return 0
 
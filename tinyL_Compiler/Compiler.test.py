@@ -1,5 +1,10 @@
+import io
+import mmap
+import os
+import tempfile
 import Compiler
 import unittest
+from Instruction import format_instruction
 
 
 class RunCompilerUnitTests(unittest.TestCase):
@@ -56,33 +61,208 @@ class RunCompilerUnitTests(unittest.TestCase):
                 Compiler.to_digit(str(i))
 
     def test_next_register(self):
-        self.assertEqual(Compiler.regnum, 1, msg=f"regnum should begin at 1")
+        compiler = Compiler.Compiler()
+        self.assertEqual(compiler.regnum, 1, msg=f"regnum should begin at 1")
         for i in range(1, 100):
-            Compiler.next_register()
+            compiler.next_register()
             self.assertEqual(
-                Compiler.regnum,
+                compiler.regnum,
                 i + 1,
-                msg=f"regnum should be {i+1} but was {Compiler.regnum}",
+                msg=f"regnum should be {i+1} but was {compiler.regnum}",
             )
 
     def test_read_input(self):
         expected = "?f;?a;?c;c=*ac;b=*a4;a=*3+ab;%f;%a!"
-        actual = Compiler.read_input("./tinyL_tests/comp01.tinyL")
+        actual = Compiler.Compiler().read_input("./tinyL_tests/comp01.tinyL")
         self.assertEqual(actual, expected)
 
     def test_next_token(self):
         expected = "?f;?a;?c;c=*ac;b=*a4;a=*3+ab;%f;%a!"
-        Compiler.read_input("./tinyL_tests/comp01.tinyL")
+        compiler = Compiler.Compiler()
+        compiler.read_input("./tinyL_tests/comp01.tinyL")
         for i, c in enumerate(expected):
             self.assertEqual(
-                Compiler.token, c, msg=f"token should be {c} but was {Compiler.token}"
+                compiler.token, c, msg=f"token should be {c} but was {compiler.token}"
             )
             self.assertEqual(
-                Compiler.token_idx,
+                compiler.token_idx,
                 i,
-                msg=f"token_idx should be {i} but was {Compiler.token_idx}",
+                msg=f"token_idx should be {i} but was {compiler.token_idx}",
             )
-            Compiler.next_token()
+            compiler.next_token()
+
+    def test_tokenize(self):
+        source = "?a;\n b = + a\t2 ;\r\n%b!\n"
+        expected = list("?a;b=+a2;%b!")
+        self.assertEqual(list(Compiler.tokenize(source)), expected)
+        self.assertEqual(list(Compiler.tokenize(io.StringIO(source), chunk_size=3)), expected)
+        self.assertEqual(
+            list(Compiler.tokenize(io.BytesIO(source.encode()), chunk_size=2)), expected
+        )
+
+    def test_tokenize_mmap(self):
+        with open("./tinyL_tests/comp01.tinyL", "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                tokens = "".join(Compiler.tokenize(mapped, chunk_size=4))
+        self.assertEqual(tokens, "?f;?a;?c;c=*ac;b=*a4;a=*3+ab;%f;%a!")
+
+    def test_end_of_input(self):
+        for source in ["a=+1", "?a;%a", "?"]:
+            with self.assertRaises(Exception, msg=source) as context:
+                Compiler.compile_source(source)
+            self.assertRegex(str(context.exception).lower(), "end of (program )?input")
+
+    def test_classify(self):
+        tokens, classes = Compiler.scan("?a;\n b = + a\t2 ;%b!x")
+        self.assertEqual(tokens, "?a;b=+a2;%b!")
+        self.assertEqual(classes, "?v;v=ovd;%v!")
+        self.assertEqual(Compiler.classify("g9\u00e9\u0100"), "xdx\u0100")
+
+    def test_validate(self):
+        for source in ["?a;b=+a2;%b!", "a=1!", "a=" + "+" * 50 + "1" * 51 + "!"]:
+            Compiler.validate(*Compiler.scan(source))
+
+        invalid = {
+            "": "end of input",
+            "!": "!",
+            "?1!": "1",
+            "%;!": ";",
+            "a=!": "!",
+            "a+1!": "+",
+            "a=+1;%a!": ";",
+            "a=1b!": "b",
+            "a=+b1c;%a!": "c",
+            "a=g!": "g",
+            "?a?b!": "?",
+            "?a;;%a!": ";",
+            "a=1;%g!": "g",
+        }
+        for source, token in invalid.items():
+            with self.assertRaises(Exception, msg=source) as context:
+                Compiler.validate(*Compiler.scan(source))
+            message = f"Program error.  Current input symbol is {token}"
+            self.assertEqual(str(context.exception), message, msg=source)
+
+            # The lazy parser (compile_file) reports the same error
+            compiler = Compiler.Compiler()
+            compiler.set_stream(source)
+            with self.assertRaises(Exception, msg=source) as context:
+                compiler.program()
+            self.assertEqual(str(context.exception), message, msg=source)
+
+    def test_invalid_program_emits_nothing(self):
+        compiler = Compiler.Compiler()
+        with self.assertRaises(Exception):
+            compiler.set_input("?a;%a;b=+1;%b!")
+        self.assertEqual(compiler.instructions, [])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            src_path = os.path.join(tmp, "bad.tinyL")
+            out_path = os.path.join(tmp, "tinyL.out")
+            with open(src_path, "w") as f:
+                f.write("?a;%a;b=+1;%b!")
+            with self.assertRaises(Exception):
+                Compiler.compile_file(src_path, out_path)
+            self.assertEqual(os.listdir(tmp), ["bad.tinyL"])
+
+            # An earlier output is only replaced by a complete one
+            with open(out_path, "w") as f:
+                f.write("previous\n")
+            with self.assertRaises(Exception):
+                Compiler.compile_file(src_path, out_path)
+            with open(out_path) as f:
+                self.assertEqual(f.read(), "previous\n")
+
+    def test_compile_source(self):
+        instrs = Compiler.compile_source("?a;b=+a2;%b!")
+        expected = [
+            "READ a",
+            "LOAD r1 a",
+            "LOADI r2 #2",
+            "ADD r3 r1 r2",
+            "STORE b r3",
+            "WRITE b",
+        ]
+        self.assertEqual([format_instruction(i).strip() for i in instrs], expected)
+        self.assertIs(instrs[0].next, instrs[1])
+        self.assertIs(instrs[-1].prev, instrs[-2])
+
+    def test_nested_expr(self):
+        instrs = Compiler.compile_source("a=-*1b+c|2&d3!")
+        expected = [
+            "LOADI r1 #1",
+            "LOAD r2 b",
+            "MUL r3 r1 r2",
+            "LOAD r4 c",
+            "LOADI r5 #2",
+            "LOAD r6 d",
+            "LOADI r7 #3",
+            "AND r8 r6 r7",
+            "OR r9 r5 r8",
+            "ADD r10 r4 r9",
+            "SUB r11 r3 r10",
+            "STORE a r11",
+        ]
+        self.assertEqual([format_instruction(i).strip() for i in instrs], expected)
+
+    def test_deeply_nested_expr(self):
+        # Far deeper than the Python recursion limit
+        depth = 20000
+        instrs = Compiler.compile_source("a=" + "+" * depth + "1" * (depth + 1) + "!")
+        self.assertEqual(len(instrs), 2 * depth + 2)
+        self.assertEqual(format_instruction(instrs[2]), "ADD r3 r1 r2\n")
+        self.assertEqual(
+            format_instruction(instrs[-2]),
+            f"ADD r{2 * depth + 1} r{2 * depth - 1} r{2 * depth}\n",
+        )
+        self.assertEqual(format_instruction(instrs[-1]), f"STORE a r{2 * depth + 1}\n")
+
+    def test_compilers_are_independent(self):
+        first, second = Compiler.Compiler(), Compiler.Compiler()
+        first.set_input("a=+12;%a!")
+        second.set_input("b=3;%b!")
+        first.next_token()
+        first.next_token()
+        second.program()
+        first.set_input("a=+12;%a!")
+        first.program()
+        self.assertEqual(first.regnum, 4)
+        self.assertEqual(second.regnum, 2)
+        self.assertEqual(len(first.instructions), 5)
+        self.assertEqual(len(second.instructions), 3)
+
+    def test_iter_statements(self):
+        statements = Compiler.iter_statements("?a;b=+a1;%b!")
+        first = next(statements)
+        self.assertEqual([format_instruction(i) for i in first], ["READ a\n"])
+        self.assertEqual(len(next(statements)), 4)
+        self.assertEqual(len(next(statements)), 1)
+        self.assertEqual(list(statements), [])
+
+    def test_iter_statements_is_lazy(self):
+        # The first statement comes out before the syntax error further on is seen
+        statements = Compiler.iter_statements("?a;%a;x!")
+        self.assertEqual(len(next(statements)), 1)
+        self.assertEqual(len(next(statements)), 1)
+        with self.assertRaises(Exception):
+            next(statements)
+
+    def test_compile_directory(self):
+        with tempfile.TemporaryDirectory() as out_dir:
+            results = Compiler.compile_directory("./tinyL_tests", out_dir, 2)
+            self.assertEqual(len(results), 15)
+            for path, count, err in results:
+                self.assertIsNone(err, msg=f"{path} failed to compile: {err}")
+                self.assertGreater(count, 0)
+                with open(path) as f:
+                    expected = Compiler.compile_source(f.read())
+                out_path = os.path.join(
+                    out_dir, os.path.basename(path).replace(".tinyL", ".out")
+                )
+                with open(out_path) as f:
+                    self.assertEqual(
+                        f.read(), "".join(format_instruction(i) for i in expected)
+                    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+import sys
+from itertools import islice
+from Compiler import compile_source, error
+from Instruction import OPCODE_FORMATS, OpCode
+
+# Fields of each opcode that hold a register number
+REGISTER_FIELDS = {
+    OpCode.LOAD: (0,),
+    OpCode.LOADI: (0,),
+    OpCode.STORE: (1,),
+    OpCode.ADD: (0, 1, 2),
+    OpCode.SUB: (0, 1, 2),
+    OpCode.MUL: (0, 1, 2),
+    OpCode.AND: (0, 1, 2),
+    OpCode.OR: (0, 1, 2),
+    OpCode.READ: (),
+    OpCode.WRITE: (),
+}
+# Blocks of statements no longer in the program that stay cached, e.g. for undo
+DEFAULT_MAX_BLOCKS = 4096
+
+
+def split_statements(source: str) -> list:
+    """
+    Splits a tinyL program into the text of its statements, whitespace removed.
+
+    Like the compiler, everything after the first "!" is ignored.
+    """
+    tokens = "".join(source.split())
+    end = tokens.find("!")
+    if end < 0:
+        error("Program error.  Current input symbol is end of input")
+    return tokens[:end].split(";")
+
+
+def compile_block(statement: str):
+    """
+    Compiles a single statement into a relocatable block of RISC code.
+
+    Returns (template, num_registers): template is the statement's code as text,
+    with register number n written as a format field {n - 1}, so that
+    template.format(*range(base + 1, base + num_registers + 1)) is the code the
+    compiler emits when the statement's first register is base + 1.
+    """
+    instrs = compile_source(statement + "!")
+    lines = []
+    num_registers = 0
+    for instr in instrs:
+        fields = [instr.field1, instr.field2, instr.field3]
+        for i in REGISTER_FIELDS[instr.opcode]:
+            num_registers = max(num_registers, fields[i])
+            fields[i] = f"{{{fields[i] - 1}}}"
+        lines.append(OPCODE_FORMATS[instr.opcode].format(*fields))
+    return "".join(lines), num_registers
+
+
+class IncrementalCompiler:
+    """
+    Recompiles edited versions of a program, parsing only the statements that changed.
+
+    The compiler numbers registers sequentially across the whole program, but no
+    register is used by more than one statement, so each statement compiles to a
+    block that only depends on its text and on the number of registers used before
+    it. Blocks are cached by statement text as relocatable templates (see
+    compile_block); the output is spliced together from the previous output where
+    a statement and its first register are unchanged, and from the templates
+    elsewhere.
+
+    After each compile, parsed counts the statements that had to be compiled and
+    reused the ones whose code was taken from the previous output as is; all others
+    were relocated from a cached template.
+
+    The template cache is kept in least recently used order. After each compile,
+    the oldest templates are evicted beyond max_blocks, or beyond the number of
+    statements in the program if that is larger, so the templates of the current
+    program are always kept.
+    """
+
+    def __init__(self, max_blocks: int = DEFAULT_MAX_BLOCKS):
+        self.max_blocks = max_blocks
+        self.blocks = {}  # statement text -> (template, num_registers), oldest first
+        self.statements = []  # statements of the previous program
+        self.bases = []  # registers used before each previous statement
+        self.code = []  # previous code of each statement
+        self.parsed = self.reused = 0
+
+    def compile(self, source: str) -> str:
+        """Returns the RISC code for source, identical to what the compiler writes"""
+        statements = split_statements(source)
+        bases, code = [], []
+        self.parsed = self.reused = 0
+
+        base = 0
+        for i, statement in enumerate(statements):
+            block = self.blocks.pop(statement, None)
+            if block is None:
+                block = compile_block(statement)
+                self.parsed += 1
+            self.blocks[statement] = block  # now the most recently used
+            template, num_registers = block
+
+            if (
+                i < len(self.statements)
+                and self.statements[i] == statement
+                and self.bases[i] == base
+            ):
+                code.append(self.code[i])
+                self.reused += 1
+            else:
+                code.append(template.format(*range(base + 1, base + num_registers + 1)))
+            bases.append(base)
+            base += num_registers
+
+        self.statements, self.bases, self.code = statements, bases, code
+        self.evict(max(self.max_blocks, len(statements)))
+        return "".join(code)
+
+    def evict(self, max_blocks: int):
+        """Removes least recently used templates until at most max_blocks are left"""
+        excess = max(0, len(self.blocks) - max_blocks)
+        for statement in list(islice(self.blocks, excess)):
+            del self.blocks[statement]
+
+    def compile_file(self, infile_path: str, outfile_path: str) -> int:
+        """Compiles infile_path into outfile_path, returns the instruction count"""
+        with open(infile_path, "r") as infile:
+            code = self.compile(infile.read())
+        with open(outfile_path, "w") as outfile:
+            outfile.write(code)
+        return code.count("\n")
+
+
+# =============
+# Main function
+# =============
+def main() -> int:
+    if len(sys.argv) < 3 or sys.argv[1] != "compile":
+        sys.stderr.write(
+            "Use of command:\n  compile <tinyL file> [<edited tinyL file> ...]\n"
+            "Each file is compiled into <file>.out, reusing the code of the previous ones.\n"
+        )
+        return 1
+
+    compiler = IncrementalCompiler()
+    for path in sys.argv[2:]:
+        outfile_path = path + ".out"
+        compiler.compile_file(path, outfile_path)
+        print(
+            f'Code written to file "{outfile_path}" '
+            f"({compiler.parsed} statements compiled, {compiler.reused} reused)."
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import unittest
+import IncrementalCompiler
+from Compiler import compile_source
+from Instruction import format_instruction
+
+
+class IncrementalCompilerTests(unittest.TestCase):
+    def expected(self, source):
+        return "".join(format_instruction(i) for i in compile_source(source))
+
+    def test_compile_block(self):
+        template, num_registers = IncrementalCompiler.compile_block("a=+b3")
+        self.assertEqual(num_registers, 3)
+        self.assertEqual(
+            template.format(11, 12, 13),
+            "LOAD r11 b\nLOADI r12 #3\nADD r13 r11 r12\nSTORE a r13\n",
+        )
+        self.assertEqual(IncrementalCompiler.compile_block("?a"), ("READ a\n", 0))
+
+    def test_matches_full_compile(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            source = f.read()
+        compiler = IncrementalCompiler.IncrementalCompiler()
+        self.assertEqual(compiler.compile(source), self.expected(source))
+
+    def test_edits(self):
+        compiler = IncrementalCompiler.IncrementalCompiler()
+        versions = [
+            "?a;b=+a1;c=*b2;%c!",
+            "?a;b=+a1;c=*b3;%c!",  # same shape, last block changes
+            "?a;b=a;c=*b3;%c!",  # fewer registers, later blocks shift
+            "?a;?d;b=a;c=*b3;%c!",  # inserted statement
+            "?a;c=*b3;%c!",  # deleted statements
+        ]
+        for source in versions:
+            self.assertEqual(compiler.compile(source), self.expected(source))
+
+    def test_only_changed_statements_are_parsed(self):
+        compiler = IncrementalCompiler.IncrementalCompiler()
+        compiler.compile("?a;b=+a1;c=*b2;%c!")
+        self.assertEqual((compiler.parsed, compiler.reused), (4, 0))
+        compiler.compile("?a;b=+a1;c=*b3;%c!")
+        self.assertEqual((compiler.parsed, compiler.reused), (1, 3))
+        compiler.compile("?a;b=a;c=*b2;%c!")
+        self.assertEqual((compiler.parsed, compiler.reused), (1, 1))
+
+    def test_cache_is_bounded(self):
+        compiler = IncrementalCompiler.IncrementalCompiler(max_blocks=4)
+        for value in range(10):
+            compiler.compile(f"?a;b=+a{value};%b!")
+        # The current program's three statements and the most recent dropped one
+        self.assertEqual(list(compiler.blocks), ["b=+a8", "?a", "b=+a9", "%b"])
+        compiler.compile("?a;b=+a8;%b!")
+        self.assertEqual((compiler.parsed, compiler.reused), (0, 2))
+        compiler.compile("?a;b=+a0;%b!")
+        self.assertEqual(compiler.parsed, 1)
+
+        # The whole current program is kept even when it is larger than max_blocks
+        source = ";".join(f"%{name}" for name in "abcdef") + "!"
+        compiler.compile(source)
+        compiler.compile(source)
+        self.assertEqual(compiler.parsed, 0)
+
+    def test_errors(self):
+        compiler = IncrementalCompiler.IncrementalCompiler()
+        with self.assertRaises(Exception):
+            compiler.compile("?a;%a")
+        with self.assertRaises(Exception):
+            compiler.compile("?a;x=1!")
+
+
+if __name__ == "__main__":
+    unittest.main()
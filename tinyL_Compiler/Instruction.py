@@ -1,3 +1,4 @@
+import sys
 from enum import Enum, auto
 
 
@@ -17,6 +18,9 @@ class OpCode(Enum):
 
 # Equivalent to the struct declaration in C
 class Instruction:
+    # No per-instance __dict__, which roughly halves the size of an instruction
+    __slots__ = ("opcode", "field1", "field2", "field3", "prev", "next", "critical")
+
     def __init__(
         self,
         opcode,
@@ -63,18 +67,190 @@ class Instruction:
         self.critical = critical
 
 
-def print_instruction(outfile_path: str, instr: Instruction):
+class InstructionList:
+    """
+    Indexable sequence of instructions that keeps their prev/next links up to date.
+
+    Instructions can be reached by position (list[i]) as well as through the usual
+    linked list starting at head, and insert/append/del relink the neighbours of the
+    changed position, so passes written against either view see the same program.
+
+    Usage:
+        program = InstructionList.from_head(read_instruction_list("tinyL.out"))
+        del program[3]
+        program.insert(0, Instruction(OpCode.READ, "a"))
+        print_instruction_list("opt.out", program.head)
+    """
+
+    def __init__(self, instrs=()):
+        self.items = list(instrs)
+        for index in range(len(self.items)):
+            self._link(index)
+        if self.items:
+            self.items[0].prev = None
+            self.items[-1].next = None
+
+    @classmethod
+    def from_head(cls, head: Instruction):
+        """Collects the linked list starting at head"""
+        instrs = []
+        while head:
+            instrs.append(head)
+            head = head.next
+        return cls(instrs)
+
+    @property
+    def head(self) -> Instruction:
+        return self.items[0] if self.items else None
+
+    def _link(self, index: int):
+        """Links items[index] to its current neighbours (both directions)"""
+        instr = self.items[index]
+        instr.prev = self.items[index - 1] if index > 0 else None
+        instr.next = self.items[index + 1] if index + 1 < len(self.items) else None
+        if instr.prev:
+            instr.prev.next = instr
+        if instr.next:
+            instr.next.prev = instr
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def insert(self, index: int, instr: Instruction):
+        """Inserts instr before position index, like list.insert"""
+        items = self.items
+        # Where list.insert puts instr: negative indices count from the end, and
+        # out of range ones are clamped
+        position = max(0, min(len(items), index + len(items) if index < 0 else index))
+        items.insert(position, instr)
+        self._link(position)
+
+    def append(self, instr: Instruction):
+        self.items.append(instr)
+        self._link(len(self.items) - 1)
+
+    def __delitem__(self, index: int):
+        instr = self.items.pop(index)
+        if instr.prev:
+            instr.prev.next = instr.next
+        if instr.next:
+            instr.next.prev = instr.prev
+        instr.prev = instr.next = None
+
+    def pop(self, index: int = -1) -> Instruction:
+        instr = self.items[index]
+        del self[index]
+        return instr
+
+
+# Output format for each opcode, equivalent to the fprintf calls in PrintInstruction.
+# Every format accepts all three fields; str.format ignores the unused ones.
+OPCODE_FORMATS = {
+    OpCode.LOAD: "LOAD r{} {}\n",
+    OpCode.LOADI: "LOADI r{} #{}\n",
+    OpCode.STORE: "STORE {} r{}\n",
+    OpCode.ADD: "ADD r{} r{} r{}\n",
+    OpCode.SUB: "SUB r{} r{} r{}\n",
+    OpCode.MUL: "MUL r{} r{} r{}\n",
+    OpCode.READ: "READ {}\n",
+    OpCode.WRITE: "WRITE {}\n",
+    OpCode.AND: "AND r{} r{} r{}\n",
+    OpCode.OR: "OR r{} r{} r{}\n",
+}
+
+
+def format_instruction(instr: Instruction) -> str:
+    """
+    Formats a single instruction as one line of RISC assembly (including the newline).
+
+    Raises:
+    - ValueError: If the instruction has an unsupported opcode.
+    """
+    format_string = OPCODE_FORMATS.get(instr.opcode)
+    if not format_string:
+        raise ValueError("Illegal instruction")
+    return format_string.format(instr.field1, instr.field2, instr.field3)
+
+
+class InstructionWriter:
+    """
+    Buffered sink for emitted instructions.
+
+    The writer opens its output once and accumulates formatted instructions in memory,
+    writing them out in large blocks instead of reopening the file for every instruction.
+    It can wrap either a path (opened in the given mode and closed by close()) or an
+    already open text stream such as sys.stdout or io.StringIO (left open by close()).
+
+    Usage:
+        with InstructionWriter("tinyL.out") as writer:
+            writer.write(instr)
+    """
+
+    def __init__(self, outfile, mode: str = "w", flush_every: int = 8192):
+        if not outfile:
+            raise ValueError("File error")
+        if isinstance(outfile, str):
+            self.stream = open(outfile, mode)
+            self.owns_stream = True
+        else:
+            self.stream = outfile
+            self.owns_stream = False
+        self.flush_every = flush_every
+        self.pending = []
+        self.count = 0  # number of instructions written so far
+
+    def write(self, instr: Instruction):
+        self.pending.append(format_instruction(instr))
+        self.count += 1
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def write_list(self, instr: Instruction):
+        while instr:
+            self.write(instr)
+            instr = instr.next
+
+    def flush(self):
+        if self.pending:
+            self.stream.write("".join(self.pending))
+            self.pending.clear()
+
+    def close(self):
+        if self.stream is None:
+            return
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+        self.stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def print_instruction(outfile, instr: Instruction):
     """
     Prints a formatted instruction to a specified output file.
 
-    This function takes an instruction object and an output file object, formatting the instruction
-    based on its opcode and fields. It supports different formatting for various instruction types,
-    ensuring that the output matches the expected syntax for each instruction. The function handles
-    instructions with varying numbers of fields, specifically accommodating instructions that require
-    one, two, or three fields.
+    This function takes an instruction object and an output file, formatting the instruction
+    based on its opcode and fields with format_instruction. The output matches the expected
+    syntax for each instruction, accommodating instructions that require one, two, or three fields.
 
     Parameters:
-    - outfile_path: A path to the file to write to, where the instruction will be printed.
+    - outfile: A path to the file to append the instruction to, or an open InstructionWriter.
+               Passing a path opens the file for this single instruction, so code emitting many
+               instructions should create one InstructionWriter and pass that instead.
     - instr: An Instruction object containing the opcode and fields necessary for formatting
              the instruction. The Instruction object must have an 'opcode' attribute that corresponds
              to an OpCode enum value, and 'field1', 'field2', and 'field3' attributes for the instruction's fields.
@@ -84,77 +260,40 @@ def print_instruction(outfile_path: str, instr: Instruction):
     Raises:
     - ValueError: If `outfile` is None (indicating a file error) or if an illegal instruction (an unsupported
                   opcode) is encountered.
-
-    Note:
-    This implementation assumes the Instruction class and OpCode enum are defined according to the
-    provided specifications, with appropriate attributes and enum members.
     """
-    with open(outfile_path, mode="a") as outfile:
-        if not outfile:
-            raise ValueError("File error")
-        if instr:
-            # Define the instruction format strings with placeholders as needed
-            opcode_formats = {
-                OpCode.LOAD: "LOAD r{} {}\n",
-                OpCode.LOADI: "LOADI r{} #{}\n",
-                OpCode.STORE: "STORE {} r{}\n",
-                OpCode.ADD: "ADD r{} r{} r{}\n",
-                OpCode.SUB: "SUB r{} r{} r{}\n",
-                OpCode.MUL: "MUL r{} r{} r{}\n",
-                OpCode.READ: "READ {}\n",
-                OpCode.WRITE: "WRITE {}\n",
-                OpCode.AND: "AND r{} r{} r{}\n",
-                OpCode.OR: "OR r{} r{} r{}\n",
-            }
-
-            format_string = opcode_formats.get(instr.opcode)
-            if not format_string:
-                raise ValueError("Illegal instruction")
-
-            # Depending on the instruction, format with the correct number of fields
-            if instr.opcode in [OpCode.READ, OpCode.WRITE]:
-                # For instructions with a single field
-                print(format_string.format(instr.field1), file=outfile, end="")
-            elif instr.opcode in [OpCode.LOAD, OpCode.LOADI, OpCode.STORE]:
-                # For instructions with two fields
-                print(
-                    format_string.format(instr.field1, instr.field2),
-                    file=outfile,
-                    end="",
-                )
-            else:
-                # For instructions with three fields
-                print(
-                    format_string.format(instr.field1, instr.field2, instr.field3),
-                    file=outfile,
-                    end="",
-                )
-
-
-def print_instruction_list(file_path, instr):
+    if not instr:
+        return
+    if isinstance(outfile, InstructionWriter):
+        outfile.write(instr)
+        return
+    with InstructionWriter(outfile, mode="a") as writer:
+        writer.write(instr)
+
+
+def print_instruction_list(outfile, instr):
     """
     Prints a list of instructions to a specified file.
 
-    This function iterates over a linked list of Instruction objects, printing each
-    instruction to the file specified by file_path using the print_instruction function.
+    This function iterates over a linked list of Instruction objects, writing each
+    instruction through a single InstructionWriter so the file is opened only once.
 
     Parameters:
-    - file_path: The path to the file where the instructions will be printed.
+    - outfile: The path to the file where the instructions will be appended, or an open InstructionWriter.
     - instr: The first Instruction object in the linked list of instructions to be printed.
 
     Raises:
     - ValueError: If the file path is None or empty, or if the instr argument is None (indicating no instructions).
     """
-    if not file_path:
+    if not outfile:
         raise ValueError("File error")
     if not instr:
         raise ValueError("No instructions")
 
-    while instr:
-        print_instruction(
-            file_path, instr
-        )  # Assuming print_instruction now accepts a file object again
-        instr = instr.next
+    if isinstance(outfile, InstructionWriter):
+        outfile.write_list(instr)
+        return
+    with InstructionWriter(outfile, mode="a") as writer:
+        writer.write_list(instr)
 
 
 def parse_instruction_string(line: str) -> Instruction:
@@ -203,8 +342,8 @@ def parse_instruction_string(line: str) -> Instruction:
         else:  # Unreachable
             return None
     else:
-        # Unknown instruction
-        print(f"Unknown Instruction: {opcode_str}")
+        # Unknown instruction, reported on stderr so it never mixes with code on stdout
+        sys.stderr.write(f"Unknown Instruction: {opcode_str}\n")
         return None
 
     return instr
@@ -235,30 +374,31 @@ def read_instruction(infile_path):
         raise ValueError("File error")
 
 
-def read_instruction_list(infile_path):
+def read_instruction_stream(infile):
+    """Reads instructions from an open text stream (or any iterable of lines), returns the list head"""
     head = tail = None
 
+    for line in infile:  # Iterate over each line in the file
+        line = line.strip()
+        if not line:  # Skip empty lines
+            continue
+        instr = parse_instruction_string(line)  # Parse the instruction from the line
+        if not instr:
+            continue  # Skip lines that don't parse into instructions
+
+        if not head:
+            head = tail = instr  # Initialize the list with the first instruction
+        else:
+            tail.next = instr  # Link the new instruction at the end of the list
+            instr.prev = tail  # Set the previous instruction link
+            tail = instr  # Update the tail to the new last instruction
+
+    return head
+
+
+def read_instruction_list(infile_path):
     try:
         with open(infile_path, "r") as infile:
-            for line in infile:  # Iterate over each line in the file
-                line = line.strip()
-                if not line:  # Skip empty lines
-                    continue
-                instr = parse_instruction_string(
-                    line
-                )  # Parse the instruction from the line
-                if not instr:
-                    continue  # Skip lines that don't parse into instructions
-
-                if not head:
-                    head = tail = (
-                        instr  # Initialize the list with the first instruction
-                    )
-                else:
-                    tail.next = instr  # Link the new instruction at the end of the list
-                    instr.prev = tail  # Set the previous instruction link
-                    tail = instr  # Update the tail to the new last instruction
+            return read_instruction_stream(infile)
     except IOError:
         raise ValueError("File error")
-
-    return head
@@ -0,0 +1,84 @@
+import unittest
+from Instruction import Instruction, InstructionList, OpCode, format_instruction
+
+
+class InstructionListTests(unittest.TestCase):
+    def create_list(self):
+        return InstructionList(
+            [
+                Instruction(OpCode.READ, "a"),
+                Instruction(OpCode.LOAD, 1, "a"),
+                Instruction(OpCode.STORE, "b", 1),
+                Instruction(OpCode.WRITE, "b"),
+            ]
+        )
+
+    def assertLinked(self, program):
+        # Walking the links forwards and backwards visits exactly the indexed items
+        forward, instr = [], program.head
+        while instr:
+            forward.append(instr)
+            instr = instr.next
+        self.assertEqual(forward, list(program))
+        backward, instr = [], program[-1] if len(program) else None
+        while instr:
+            backward.append(instr)
+            instr = instr.prev
+        self.assertEqual(backward, list(reversed(list(program))))
+
+    def test_indexing(self):
+        program = self.create_list()
+        self.assertEqual(len(program), 4)
+        self.assertEqual(format_instruction(program[2]), "STORE b r1\n")
+        self.assertEqual(program[-1].opcode, OpCode.WRITE)
+        self.assertLinked(program)
+
+    def test_from_head(self):
+        program = InstructionList.from_head(self.create_list().head)
+        self.assertEqual(len(program), 4)
+        self.assertLinked(program)
+        self.assertIsNone(InstructionList.from_head(None).head)
+
+    def test_insert(self):
+        program = self.create_list()
+        program.insert(0, Instruction(OpCode.READ, "c"))
+        program.insert(3, Instruction(OpCode.LOADI, 2, 7))
+        program.insert(100, Instruction(OpCode.WRITE, "c"))
+        program.insert(-1, Instruction(OpCode.WRITE, "a"))
+        self.assertEqual(
+            [format_instruction(instr).split()[0] for instr in program],
+            ["READ", "READ", "LOAD", "LOADI", "STORE", "WRITE", "WRITE", "WRITE"],
+        )
+        self.assertEqual(program[-2].field1, "a")
+        self.assertLinked(program)
+        program.insert(-100, Instruction(OpCode.READ, "d"))
+        self.assertEqual(program.head.field1, "d")
+        self.assertLinked(program)
+
+    def test_delete(self):
+        program = self.create_list()
+        removed = program[1]
+        del program[1]
+        self.assertIsNone(removed.prev)
+        self.assertIsNone(removed.next)
+        self.assertEqual(program.pop(0).opcode, OpCode.READ)
+        self.assertEqual(program.pop().opcode, OpCode.WRITE)
+        self.assertEqual(len(program), 1)
+        self.assertLinked(program)
+        del program[0]
+        self.assertIsNone(program.head)
+
+    def test_append(self):
+        program = InstructionList()
+        program.append(Instruction(OpCode.READ, "a"))
+        program.append(Instruction(OpCode.WRITE, "a"))
+        self.assertLinked(program)
+
+    def test_slots(self):
+        instr = Instruction(OpCode.READ, "a")
+        with self.assertRaises(AttributeError):
+            instr.comment = "not an instruction field"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import io
+import os
+import unittest
+from Instruction import Instruction, InstructionWriter, OpCode, print_instruction
+
+
+class InstructionWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.test_file_path = "test_instruction_writer.txt"
+
+    def tearDown(self):
+        if os.path.exists(self.test_file_path):
+            os.remove(self.test_file_path)
+
+    def test_write_to_path(self):
+        with InstructionWriter(self.test_file_path) as writer:
+            writer.write(Instruction(OpCode.LOADI, 1, 5))
+            writer.write(Instruction(OpCode.STORE, "a", 1))
+            writer.write(Instruction(OpCode.WRITE, "a"))
+        with open(self.test_file_path, "r") as f:
+            content = f.read().split("\n")
+        self.assertEqual(content, ["LOADI r1 #5", "STORE a r1", "WRITE a", ""])
+        self.assertEqual(writer.count, 3)
+
+    def test_write_to_stream(self):
+        stream = io.StringIO()
+        with InstructionWriter(stream) as writer:
+            writer.write(Instruction(OpCode.ADD, 3, 1, 2))
+        self.assertEqual(stream.getvalue(), "ADD r3 r1 r2\n")
+        self.assertFalse(stream.closed)
+
+    def test_flushes_in_blocks(self):
+        stream = io.StringIO()
+        writer = InstructionWriter(stream, flush_every=2)
+        writer.write(Instruction(OpCode.READ, "a"))
+        self.assertEqual(stream.getvalue(), "")
+        writer.write(Instruction(OpCode.READ, "b"))
+        self.assertEqual(stream.getvalue(), "READ a\nREAD b\n")
+        writer.write(Instruction(OpCode.READ, "c"))
+        writer.close()
+        self.assertEqual(stream.getvalue(), "READ a\nREAD b\nREAD c\n")
+
+    def test_print_instruction_to_writer(self):
+        stream = io.StringIO()
+        with InstructionWriter(stream) as writer:
+            print_instruction(writer, Instruction(OpCode.MUL, 3, 1, 2))
+        self.assertEqual(stream.getvalue(), "MUL r3 r1 r2\n")
+
+    def test_missing_outfile(self):
+        with self.assertRaises(ValueError):
+            InstructionWriter(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
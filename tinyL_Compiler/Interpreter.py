@@ -1,66 +1,683 @@
+import json
+import operator
+import re
 import sys
+import time
+from array import array
+from collections import defaultdict
+from contextlib import ExitStack
+from Compiler import iter_statements, link_instructions
 from Instruction import (
     Instruction,
+    InstructionWriter,
     OpCode,
-    read_instruction_list,
+    parse_instruction_string,
 )
 
-MAX_REG_NUM = 1000
+NUM_VARIABLES = 6  # tinyL supports variables a-f
+VARIABLE_NAMES = "abcdef"
 
+# Integer opcodes used by decoded programs, OpCode values as plain ints
+LOAD = OpCode.LOAD.value
+LOADI = OpCode.LOADI.value
+STORE = OpCode.STORE.value
+ADD = OpCode.ADD.value
+SUB = OpCode.SUB.value
+MUL = OpCode.MUL.value
+OR = OpCode.OR.value
+AND = OpCode.AND.value
+READ = OpCode.READ.value
+WRITE = OpCode.WRITE.value
 
-def main():
-    if len(sys.argv) != 3:
-        sys.stderr.write("Use of command:\n  run <RISC code file>\n")
-        print(sys.argv)
-        sys.exit(1)
 
-    # Variables stored here, tinyL supports variables a-e
-    Memory = [0] * 6
-    RegisterFile = [0] * MAX_REG_NUM
-    instrCounter = 0  # counts number of executed instructions
+# Initial value of Memory, all variables start at 0
+ZERO_MEMORY = (0,) * NUM_VARIABLES
+
+# Memory slot of each variable name
+VARIABLE_INDEX = {name: index for index, name in enumerate(VARIABLE_NAMES)}
 
+
+def variable_index(name: str) -> int:
+    """Maps a variable name a-f to its Memory slot"""
+    index = VARIABLE_INDEX.get(name)
+    if index is None:
+        raise ValueError(f"Illegal variable {name}")
+    return index
+
+
+def _column(values: list):
+    """Packs operands into a compact int64 array, falling back to a list for huge immediates"""
     try:
-        head = read_instruction_list(sys.argv[2])
-    except IOError as e:
-        sys.stderr.write(f'Cannot open input file "{sys.argv[2]}"\n')
-        sys.exit(1)
+        return array("q", values)
+    except OverflowError:
+        return values
 
-    instr = head
+
+class DecodedProgram:
+    """
+    An instruction list lowered to parallel arrays, decoded once before execution.
+
+    Instruction i is (opcodes[i], field1[i], field2[i], field3[i]). Opcodes are the
+    integer OpCode values, register fields are register numbers, variable fields are
+    already resolved to Memory indices (0 for a through 5 for f) and unused fields are 0.
+    max_reg is the highest register number the program uses.
+    """
+
+    def __init__(self, opcodes, field1, field2, field3, max_reg: int):
+        self.opcodes = opcodes
+        self.field1 = field1
+        self.field2 = field2
+        self.field3 = field3
+        self.max_reg = max_reg
+
+    def __len__(self):
+        return len(self.opcodes)
+
+
+def iterate_list(instr: Instruction):
+    """Yields the instructions of the linked list starting at instr"""
     while instr:
-        if instr.opcode == OpCode.LOAD:
-            RegisterFile[instr.field1] = Memory[ord(instr.field2) - ord("a")]
-        elif instr.opcode == OpCode.LOADI:
-            RegisterFile[instr.field1] = instr.field2
-        elif instr.opcode == OpCode.STORE:
-            Memory[ord(instr.field1) - ord("a")] = RegisterFile[instr.field2]
-        elif instr.opcode in [
-            OpCode.ADD,
-            OpCode.SUB,
-            OpCode.MUL,
-            OpCode.AND,
-            OpCode.OR,
-        ]:
-            operation = {
-                OpCode.ADD: lambda x, y: x + y,
-                OpCode.SUB: lambda x, y: x - y,
-                OpCode.MUL: lambda x, y: x * y,
-                OpCode.AND: lambda x, y: x & y,
-                OpCode.OR: lambda x, y: x | y,
-            }[instr.opcode]
-            RegisterFile[instr.field1] = operation(
-                RegisterFile[instr.field2], RegisterFile[instr.field3]
-            )
-        elif instr.opcode == OpCode.READ:
-            input_value = int(input(f'tinyL>> enter value for "{instr.field1}": '))
-            Memory[ord(instr.field1) - ord("a")] = input_value
-        elif instr.opcode == OpCode.WRITE:
-            print(f"tinyL>> {instr.field1} = {Memory[ord(instr.field1) - ord('a')]}")
+        yield instr
+        instr = instr.next
+
+
+def decode_program(instr: Instruction) -> DecodedProgram:
+    """
+    Decodes a linked list of instructions (starting at instr) into a DecodedProgram.
+
+    Raises:
+    - ValueError: If an instruction uses a variable outside a-f.
+    """
+    return decode_instructions(iterate_list(instr))
+
+
+def decode_instructions(instrs) -> DecodedProgram:
+    """Decodes an iterable of instructions into a DecodedProgram, see decode_program"""
+    opcodes, field1, field2, field3 = [], [], [], []
+    max_reg = 0
+
+    for instr in instrs:
+        opcode = instr.opcode.value
+        if opcode == LOAD:
+            f1, f2, f3 = instr.field1, variable_index(instr.field2), 0
+            reg = f1
+        elif opcode == LOADI:
+            f1, f2, f3 = instr.field1, instr.field2, 0
+            reg = f1
+        elif opcode == STORE:
+            f1, f2, f3 = variable_index(instr.field1), instr.field2, 0
+            reg = f2
+        elif opcode == READ or opcode == WRITE:
+            f1, f2, f3 = variable_index(instr.field1), 0, 0
+            reg = 0
+        else:
+            f1, f2, f3 = instr.field1, instr.field2, instr.field3
+            reg = max(f1, f2, f3)
+        if reg > max_reg:
+            max_reg = reg
+
+        opcodes.append(opcode)
+        field1.append(f1)
+        field2.append(f2)
+        field3.append(f3)
+
+    return DecodedProgram(
+        array("b", opcodes), _column(field1), _column(field2), _column(field3), max_reg
+    )
+
+
+# One line of RISC text exactly as format_instruction writes it
+_INSTRUCTION_LINE = (
+    r"LOADI r\d+ #-?\d+|LOAD r\d+ [a-f]|STORE [a-f] r\d+"
+    r"|(?:ADD|SUB|MUL|AND|OR) r\d+ r\d+ r\d+|(?:READ|WRITE) [a-f]"
+)
+_PROGRAM_TEXT = re.compile(rf"(?:(?:{_INSTRUCTION_LINE})?\r?\n)*(?:{_INSTRUCTION_LINE})?\r?")
+_LINE = re.compile(rf"(?:{_INSTRUCTION_LINE})?\r?")
+# Drops the r/# operand prefixes and turns variables into their Memory index, so
+# every operand of a valid program becomes a decimal integer
+_OPERAND_TABLE = str.maketrans(
+    {"r": None, "#": None, **{name: str(index) for name, index in VARIABLE_INDEX.items()}}
+)
+_OPCODE_VALUES = {opcode.name: opcode.value for opcode in OpCode}
+# Opcodes whose field1 / field2 name a register (rather than a variable or immediate)
+_REGISTER_FIELD1 = {LOAD, LOADI, ADD, SUB, MUL, OR, AND}
+_REGISTER_FIELD2 = {STORE, ADD, SUB, MUL, OR, AND}
+
+
+def parse_instruction_text(buffer) -> DecodedProgram:
+    """
+    Parses a whole RISC program (str or ASCII bytes) straight into a DecodedProgram.
+
+    Unlike read_instruction_list, no Instruction objects are created. The text is
+    validated by one precompiled regular expression, operand prefixes are stripped
+    and variables resolved by a single str.translate, and the resulting words are
+    dealt into columns by opcode. Lines must be in the format format_instruction
+    writes (one instruction per line, single spaces); blank lines are skipped.
+
+    Raises:
+    - ValueError: Naming the line number of the first line that is not a valid
+                  instruction.
+    """
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        buffer = bytes(buffer).decode("ascii")
+
+    if not _PROGRAM_TEXT.fullmatch(buffer):
+        for line_number, line in enumerate(buffer.split("\n"), 1):
+            if not _LINE.fullmatch(line):
+                raise ValueError(
+                    f"Line {line_number}: cannot parse instruction {line!r}"
+                )
+
+    opcodes, field1, field2, field3 = [], [], [], []
+    words = iter(buffer.translate(_OPERAND_TABLE).split())
+    for word in words:
+        opcode = _OPCODE_VALUES[word]
+        opcodes.append(opcode)
+        field1.append(next(words))
+        if opcode >= ADD and opcode <= AND:
+            field2.append(next(words))
+            field3.append(next(words))
+        elif opcode < ADD:
+            field2.append(next(words))
+            field3.append("0")
+        else:
+            field2.append("0")
+            field3.append("0")
+
+    field1 = list(map(int, field1))
+    field2 = list(map(int, field2))
+    field3 = list(map(int, field3))
+    max_reg = max(
+        max((f1 for op, f1 in zip(opcodes, field1) if op in _REGISTER_FIELD1), default=0),
+        max((f2 for op, f2 in zip(opcodes, field2) if op in _REGISTER_FIELD2), default=0),
+        max(field3, default=0),
+    )
+
+    return DecodedProgram(
+        array("b", opcodes), _column(field1), _column(field2), _column(field3), max_reg
+    )
+
+
+def load_program(infile_path: str) -> DecodedProgram:
+    """
+    Reads and parses the RISC file at infile_path with parse_instruction_text.
+
+    Listings formatted by hand (other spacing, tabs, lowercase opcodes) do not match
+    its strict format; if every line is still an instruction, they are read line by
+    line with parse_instruction_string instead, like read_instruction_list does.
+
+    Raises:
+    - ValueError: If the file cannot be read or contains an invalid line.
+    """
+    try:
+        with open(infile_path, "r") as infile:
+            content = infile.read()
+    except IOError:
+        raise ValueError("File error")
+
+    try:
+        return parse_instruction_text(content)
+    except ValueError as strict_error:
+        program = _parse_listing(content)
+        if program is None:
+            raise strict_error
+        return program
+
+
+def _parse_listing(content: str) -> DecodedProgram:
+    """decode_program over the lines of content, or None if a line is not an instruction"""
+    instrs = []
+    for line in content.splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if words[0].upper() not in _OPCODE_VALUES:
+            return None
+        try:
+            instrs.append(parse_instruction_string(line))
+        except (ValueError, IndexError):
+            return None
+    try:
+        return decode_program(link_instructions(instrs))
+    except ValueError:
+        return None
+
+
+# Python equivalent of each arithmetic instruction, by integer opcode. Also used by
+# the batch interpreter and the optimizer's constant folding
+BINARY_OPERATIONS = {
+    ADD: operator.add,
+    SUB: operator.sub,
+    MUL: operator.mul,
+    AND: operator.and_,
+    OR: operator.or_,
+}
+
+
+def prompt_read(name: str) -> int:
+    return int(input(f'tinyL>> enter value for "{name}": '))
+
+
+def print_write(name: str, value: int):
+    print(f"tinyL>> {name} = {value}")
+
+
+# ============
+# Headless I/O
+# ============
+
+
+def read_values(infile, chunk_size: int = 1 << 16):
+    """
+    Yields the integers of a text stream of whitespace separated input values,
+    reading it chunk_size characters at a time.
+    """
+    rest = ""
+    while True:
+        chunk = infile.read(chunk_size)
+        if not chunk:
+            break
+        words = (rest + chunk).split()
+        # The last word may continue in the next chunk
+        rest = words.pop() if words and not chunk[-1].isspace() else ""
+        yield from map(int, words)
+    if rest:
+        yield int(rest)
+
+
+def input_reader(values):
+    """Returns a read_value callback for execute that takes the next of values"""
+    values = iter(values)
+
+    def read_value(name: str) -> int:
+        value = next(values, None)
+        if value is None:
+            raise ValueError(f'No input value left for "{name}"')
+        return value
+
+    return read_value
+
+
+class OutputWriter:
+    """
+    write_value callback for execute that writes each WRITE as a "variable value"
+    line, buffered like InstructionWriter so large outputs are written in blocks.
+    """
+
+    def __init__(self, stream, flush_every: int = 8192):
+        self.stream = stream
+        self.flush_every = flush_every
+        self.pending = []
+
+    def __call__(self, name: str, value: int):
+        self.pending.append(f"{name} {value}\n")
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.stream.write("".join(self.pending))
+            self.pending.clear()
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+
+def collect_outputs(program: DecodedProgram, inputs=()) -> list:
+    """Runs program on the given input values, returns its outputs as (variable, value) pairs"""
+    return Machine(program.max_reg + 1).run(program, inputs)
+
+
+def execute(
+    program: DecodedProgram,
+    Memory: list = None,
+    RegisterFile: list = None,
+    read_value=prompt_read,
+    write_value=print_write,
+) -> int:
+    """
+    Runs a decoded program, returns the number of executed instructions.
+
+    Memory and RegisterFile are allocated fresh unless given, the register file with
+    exactly the program.max_reg + 1 registers the program needs. READ instructions call
+    read_value(variable name) for the value to store, WRITE instructions call
+    write_value(variable name, value).
+    """
+    if Memory is None:
+        Memory = [0] * NUM_VARIABLES
+    if RegisterFile is None:
+        RegisterFile = [0] * (program.max_reg + 1)
+
+    # Branches are ordered roughly by how often the compiler emits each opcode
+    for opcode, f1, f2, f3 in zip(
+        program.opcodes, program.field1, program.field2, program.field3
+    ):
+        if opcode == LOAD:
+            RegisterFile[f1] = Memory[f2]
+        elif opcode == LOADI:
+            RegisterFile[f1] = f2
+        elif opcode == ADD:
+            RegisterFile[f1] = RegisterFile[f2] + RegisterFile[f3]
+        elif opcode == STORE:
+            Memory[f1] = RegisterFile[f2]
+        elif opcode == MUL:
+            RegisterFile[f1] = RegisterFile[f2] * RegisterFile[f3]
+        elif opcode == SUB:
+            RegisterFile[f1] = RegisterFile[f2] - RegisterFile[f3]
+        elif opcode == AND:
+            RegisterFile[f1] = RegisterFile[f2] & RegisterFile[f3]
+        elif opcode == OR:
+            RegisterFile[f1] = RegisterFile[f2] | RegisterFile[f3]
+        elif opcode == READ:
+            Memory[f1] = read_value(VARIABLE_NAMES[f1])
+        elif opcode == WRITE:
+            write_value(VARIABLE_NAMES[f1], Memory[f1])
         else:
             sys.stderr.write("Illegal instructions\n")
             sys.exit(1)
 
-        instrCounter += 1
-        instr = instr.next
+    return len(program)
+
+
+# =========
+# Profiling
+# =========
+
+
+class ExecutionProfile:
+    """
+    What a profiled run executed: instruction counts and time per opcode, the
+    highest register index touched, how often each variable was loaded, stored,
+    read and written, and the wall clock time of the whole run.
+    """
+
+    def __init__(self):
+        self.instructions = 0
+        self.opcode_counts = {}  # opcode name -> executed instructions
+        self.opcode_times = {}  # opcode name -> seconds spent in them
+        self.peak_register = 0
+        self.variables = {
+            name: {"loads": 0, "stores": 0, "reads": 0, "writes": 0}
+            for name in VARIABLE_NAMES
+        }
+        self.wall_time = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Executed instructions per second"""
+        return self.instructions / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "instructions": self.instructions,
+            "wall_time": self.wall_time,
+            "throughput": self.throughput,
+            "peak_register": self.peak_register,
+            "opcodes": {
+                name: {"count": count, "time": self.opcode_times[name]}
+                for name, count in self.opcode_counts.items()
+            },
+            "variables": self.variables,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def report(self) -> str:
+        lines = [
+            f"{self.instructions} instructions in {self.wall_time:.6f}s "
+            f"({self.throughput:,.0f} instructions/s), "
+            f"peak register r{self.peak_register}",
+            f"{'opcode':<8} {'count':>10} {'time s':>10}",
+        ]
+        by_count = sorted(self.opcode_counts.items(), key=lambda item: -item[1])
+        for name, count in by_count:
+            lines.append(f"{name:<8} {count:>10} {self.opcode_times[name]:>10.6f}")
+        lines.append(
+            f"{'variable':<8} {'loads':>7} {'stores':>7} {'reads':>7} {'writes':>7}"
+        )
+        for name, counts in self.variables.items():
+            if any(counts.values()):
+                lines.append(
+                    f"{name:<8} {counts['loads']:>7} {counts['stores']:>7} "
+                    f"{counts['reads']:>7} {counts['writes']:>7}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def execute_profiled(
+    program: DecodedProgram,
+    Memory: list = None,
+    RegisterFile: list = None,
+    read_value=prompt_read,
+    write_value=print_write,
+) -> ExecutionProfile:
+    """
+    Runs a decoded program like execute, but records an ExecutionProfile.
+
+    The instrumented loop is separate from execute, so unprofiled runs pay nothing
+    for it. The clock is read once per instruction; its cost is included in the
+    times, and READ/WRITE times include the read_value/write_value callbacks.
+    """
+    if Memory is None:
+        Memory = [0] * NUM_VARIABLES
+    if RegisterFile is None:
+        RegisterFile = [0] * (program.max_reg + 1)
+
+    counts = [0] * (WRITE + 1)
+    times = [0] * (WRITE + 1)
+    # loads, stores, reads, writes per Memory slot
+    loads, stores = [0] * NUM_VARIABLES, [0] * NUM_VARIABLES
+    reads, writes = [0] * NUM_VARIABLES, [0] * NUM_VARIABLES
+    peak = 0
+    clock = time.perf_counter_ns
+
+    start = last = clock()
+    for opcode, f1, f2, f3 in zip(
+        program.opcodes, program.field1, program.field2, program.field3
+    ):
+        if opcode == LOAD:
+            RegisterFile[f1] = Memory[f2]
+            loads[f2] += 1
+            reg = f1
+        elif opcode == LOADI:
+            RegisterFile[f1] = f2
+            reg = f1
+        elif opcode == STORE:
+            Memory[f1] = RegisterFile[f2]
+            stores[f1] += 1
+            reg = f2
+        elif opcode == READ:
+            Memory[f1] = read_value(VARIABLE_NAMES[f1])
+            reads[f1] += 1
+            reg = 0
+        elif opcode == WRITE:
+            write_value(VARIABLE_NAMES[f1], Memory[f1])
+            writes[f1] += 1
+            reg = 0
+        elif opcode in BINARY_OPERATIONS:
+            operation = BINARY_OPERATIONS[opcode]
+            RegisterFile[f1] = operation(RegisterFile[f2], RegisterFile[f3])
+            reg = max(f1, f2, f3)
+        else:
+            sys.stderr.write("Illegal instructions\n")
+            sys.exit(1)
+
+        if reg > peak:
+            peak = reg
+        now = clock()
+        times[opcode] += now - last
+        counts[opcode] += 1
+        last = now
+
+    profile = ExecutionProfile()
+    profile.wall_time = (last - start) / 1e9
+    profile.instructions = sum(counts)
+    profile.peak_register = peak
+    for opcode in OpCode:
+        if counts[opcode.value]:
+            profile.opcode_counts[opcode.name] = counts[opcode.value]
+            profile.opcode_times[opcode.name] = times[opcode.value] / 1e9
+    for index, name in enumerate(VARIABLE_NAMES):
+        profile.variables[name] = {
+            "loads": loads[index],
+            "stores": stores[index],
+            "reads": reads[index],
+            "writes": writes[index],
+        }
+    return profile
+
+
+def execute_statements(
+    statements,
+    Memory: list = None,
+    read_value=prompt_read,
+    write_value=print_write,
+) -> int:
+    """
+    Runs a program given as an iterable of per-statement instruction lists, such as
+    Compiler.iter_statements, executing each statement as soon as it arrives.
+
+    Registers live in a fresh zero-default mapping per statement, which relies on
+    statements not sharing registers (true of compiler output, but not necessarily of
+    optimized code). Returns the number of executed instructions.
+    """
+    if Memory is None:
+        Memory = [0] * NUM_VARIABLES
+
+    count = 0
+    for instrs in statements:
+        count += execute(
+            decode_instructions(instrs),
+            Memory,
+            defaultdict(int),
+            read_value,
+            write_value,
+        )
+    return count
+
+
+class Machine:
+    """
+    Reusable tinyL machine for running many programs in-process.
+
+    The Memory and RegisterFile lists are allocated once and reset between runs
+    (Memory to zeros, and the registers the next program uses to zeros), growing
+    the register file only when a program needs more registers than any before.
+
+    Usage:
+        machine = Machine()
+        outputs = machine.run(decode_program(head), [1, 2])  # [("a", 3), ...]
+    """
+
+    def __init__(self, num_registers: int = 1024):
+        self.Memory = [0] * NUM_VARIABLES
+        self.RegisterFile = [0] * num_registers
+        self.zeros = [0] * num_registers
+
+    def reset(self, num_registers: int = 0):
+        """Zeroes Memory and the first num_registers registers, growing the file if needed"""
+        self.Memory[:] = ZERO_MEMORY
+        if num_registers > len(self.RegisterFile):
+            self.RegisterFile = [0] * num_registers
+            self.zeros = [0] * num_registers
+        else:
+            self.RegisterFile[:num_registers] = self.zeros[:num_registers]
+
+    def run(self, program, inputs=()) -> list:
+        """
+        Runs program (a DecodedProgram, or the head of an instruction list) with the
+        given input values for its READs, returns its outputs as (variable, value)
+        pairs. Memory keeps the final variable values until the next run.
+
+        Raises:
+        - ValueError: If the program reads more values than inputs holds.
+        """
+        if isinstance(program, Instruction):
+            program = decode_program(program)
+        self.reset(program.max_reg + 1)
+        outputs = []
+        execute(
+            program,
+            self.Memory,
+            self.RegisterFile,
+            input_reader(inputs),
+            lambda name, value: outputs.append((name, value)),
+        )
+        return outputs
+
+
+def run_source(infile_path: str, outfile_path: str = None) -> int:
+    """
+    Compiles and runs the tinyL file at infile_path in one pass, without an
+    intermediate RISC file. Each statement runs as soon as it is compiled; if
+    outfile_path is given the RISC code is also written there as a side output.
+    Returns the number of executed instructions.
+    """
+    with open(infile_path, "r") as infile, ExitStack() as stack:
+        writer = None
+        if outfile_path is not None:
+            writer = stack.enter_context(InstructionWriter(outfile_path))
+        return execute_statements(iter_statements(infile, writer))
+
+
+def main():
+    # --profile prints an execution profile to stderr, --profile=<file> saves it as JSON
+    profile_flags = [arg for arg in sys.argv if arg.startswith("--profile")]
+    argv = [arg for arg in sys.argv if not arg.startswith("--profile")]
+
+    if len(argv) in [3, 4] and argv[1] == "exec" and not profile_flags:
+        try:
+            run_source(argv[2], argv[3] if len(argv) == 4 else None)
+        except IOError:
+            sys.stderr.write(f'Cannot open input file "{argv[2]}"\n')
+            sys.exit(1)
+        return
+
+    # exec runs each statement as it is compiled, there is no program to profile
+    if len(argv) not in [3, 4] or argv[1] == "exec" or len(profile_flags) > 1:
+        sys.stderr.write(
+            "Use of command:\n"
+            "  run <RISC code file> [input file or - for stdin] [--profile[=<JSON file>]]\n"
+            "  exec <tinyL file> [RISC output file]\n"
+        )
+        print(sys.argv)
+        sys.exit(1)
+
+    try:
+        program = load_program(argv[2])
+    except ValueError as e:
+        sys.stderr.write(f'Cannot load input file "{argv[2]}": {e}\n')
+        sys.exit(1)
+
+    run = execute_profiled if profile_flags else execute
+    if len(argv) == 3:
+        result = run(program)
+    else:
+        # Headless: input values from a file or stdin, "variable value" lines to stdout
+        try:
+            with ExitStack() as stack:
+                infile = sys.stdin
+                if argv[3] != "-":
+                    infile = stack.enter_context(open(argv[3], "r"))
+                with OutputWriter(sys.stdout) as writer:
+                    read_value = input_reader(read_values(infile))
+                    result = run(program, read_value=read_value, write_value=writer)
+        except (IOError, ValueError) as e:
+            sys.stderr.write(f"Cannot run program: {e}\n")
+            sys.exit(1)
+
+    if profile_flags:
+        _, _, json_path = profile_flags[0].partition("=")
+        if json_path:
+            with open(json_path, "w") as f:
+                f.write(result.to_json())
+        sys.stderr.write(result.report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import Interpreter
+from Compiler import compile_source, iter_statements
+from Instruction import (
+    Instruction,
+    InstructionWriter,
+    OpCode,
+    format_instruction,
+    read_instruction_list,
+)
+
+
+class InterpreterTests(unittest.TestCase):
+    def run_program(self, head, inputs=()):
+        return Interpreter.collect_outputs(Interpreter.decode_program(head), inputs)
+
+    def test_decode_program(self):
+        head = read_instruction_list("Interpreter.test.s")
+        program = Interpreter.decode_program(head)
+        self.assertEqual(len(program), 18)
+        self.assertEqual(program.max_reg, 6)
+        # READ b
+        self.assertEqual(program.opcodes[0], OpCode.READ.value)
+        self.assertEqual(program.field1[0], 1)
+        # LOADI r1 #3
+        self.assertEqual(program.opcodes[2], OpCode.LOADI.value)
+        self.assertEqual((program.field1[2], program.field2[2]), (1, 3))
+        # STORE f r6
+        self.assertEqual(program.opcodes[12], OpCode.STORE.value)
+        self.assertEqual((program.field1[12], program.field2[12]), (5, 6))
+
+    def test_execute_test_program(self):
+        program = Interpreter.decode_program(read_instruction_list("Interpreter.test.s"))
+        outputs = []
+        # execute itself, for the instruction count run_program leaves out
+        count = Interpreter.execute(
+            program,
+            read_value=lambda name: 12,
+            write_value=lambda name, value: outputs.append((name, value)),
+        )
+        self.assertEqual(
+            outputs, [("a", 15), ("b", 9), ("c", 36), ("d", 12 & 3), ("f", 12 | 3)]
+        )
+        self.assertEqual(count, 18)
+
+    def test_execute_compiled_program(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            head = compile_source(f.read())[0]
+        outputs = self.run_program(head, [7, 2, 5])
+        # c=*ac; b=*a4; a=*3+ab
+        self.assertEqual(outputs, [("f", 7), ("a", 3 * (2 + 2 * 4))])
+
+    def test_huge_immediate(self):
+        head = Instruction(OpCode.LOADI, 1, 2**80)
+        head.next = Instruction(OpCode.STORE, "a", 1)
+        head.next.next = Instruction(OpCode.WRITE, "a")
+        outputs = self.run_program(head)
+        self.assertEqual(outputs, [("a", 2**80)])
+
+    def test_register_file_sized_from_program(self):
+        head = Instruction(OpCode.LOADI, 5000, 4)
+        head.next = Instruction(OpCode.STORE, "a", 5000)
+        head.next.next = Instruction(OpCode.WRITE, "a")
+        program = Interpreter.decode_program(head)
+        self.assertEqual(program.max_reg, 5000)
+        outputs = self.run_program(head)
+        self.assertEqual(outputs, [("a", 4)])
+
+    def test_execute_statements(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            source = f.read()
+        inputs, outputs = [7, 2, 5], []
+        count = Interpreter.execute_statements(
+            iter_statements(source),
+            read_value=lambda name: inputs.pop(0),
+            write_value=lambda name, value: outputs.append((name, value)),
+        )
+        self.assertEqual(outputs, [("f", 7), ("a", 3 * (2 + 2 * 4))])
+        self.assertEqual(count, len(compile_source(source)))
+
+    def test_execute_statements_side_output(self):
+        with open("./tinyL_tests/comp01.tinyL") as f:
+            source = f.read()
+        stream = io.StringIO()
+        with InstructionWriter(stream) as writer:
+            Interpreter.execute_statements(
+                iter_statements(source, writer),
+                read_value=lambda name: 1,
+                write_value=lambda name, value: None,
+            )
+        self.assertEqual(
+            stream.getvalue(),
+            "".join(format_instruction(i) for i in compile_source(source)),
+        )
+
+    def test_statement_runs_before_rest_is_compiled(self):
+        outputs = []
+        with self.assertRaises(Exception):
+            Interpreter.execute_statements(
+                iter_statements("a=3;%a;x!"),
+                write_value=lambda name, value: outputs.append((name, value)),
+            )
+        self.assertEqual(outputs, [("a", 3)])
+
+    def test_parse_instruction_text(self):
+        with open("Interpreter.test.s") as f:
+            program = Interpreter.parse_instruction_text(f.read())
+        expected = Interpreter.decode_program(read_instruction_list("Interpreter.test.s"))
+        self.assertEqual(len(program), len(expected))
+        self.assertEqual(program.max_reg, expected.max_reg)
+        for column in ["opcodes", "field1", "field2", "field3"]:
+            self.assertEqual(
+                list(getattr(program, column)), list(getattr(expected, column))
+            )
+
+    def test_parse_instruction_text_operands(self):
+        program = Interpreter.parse_instruction_text(
+            b"\nLOADI r7 #-12\r\nLOADI r2 #900\nSTORE c r7\n\nMUL r3 r2 r7"
+        )
+        self.assertEqual(list(program.opcodes), [OpCode.LOADI.value] * 2 + [3, 6])
+        self.assertEqual(list(program.field1), [7, 2, 2, 3])
+        self.assertEqual(list(program.field2), [-12, 900, 7, 2])
+        self.assertEqual(list(program.field3), [0, 0, 0, 7])
+        # Immediates are not registers
+        self.assertEqual(program.max_reg, 7)
+        self.assertEqual(len(Interpreter.parse_instruction_text("\n\n")), 0)
+
+    def test_parse_instruction_text_errors(self):
+        for line in ["LOAD r1 z", "ADD r1 r2", "JUMP r1", "STORE r1 a", "load r1 a"]:
+            with self.assertRaisesRegex(ValueError, "^Line 3: .*" + line):
+                Interpreter.parse_instruction_text(f"READ a\n\n{line}\nWRITE a\n")
+
+    def test_load_hand_formatted_program(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "program.s")
+            with open(path, "w") as f:
+                f.write("LOADI r1 #1 \n\tstore a r1\nWRITE  a\n")
+            program = Interpreter.load_program(path)
+            self.assertEqual(Interpreter.collect_outputs(program), [("a", 1)])
+
+            with open(path, "w") as f:
+                f.write("LOADI r1 #1\nSTORE a r1 \nJUMP a\n")
+            with self.assertRaisesRegex(ValueError, r"^Line 2: .*'STORE a r1 '"):
+                Interpreter.load_program(path)
+
+    def test_read_values(self):
+        stream = io.StringIO("12 -3\n 456\n\n7")
+        self.assertEqual(
+            list(Interpreter.read_values(stream, chunk_size=2)), [12, -3, 456, 7]
+        )
+        with self.assertRaises(ValueError):
+            list(Interpreter.read_values(io.StringIO("1 x")))
+
+    def test_collect_outputs(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        self.assertEqual(
+            Interpreter.collect_outputs(program, [12]),
+            [("a", 15), ("b", 9), ("c", 36), ("d", 12 & 3), ("f", 12 | 3)],
+        )
+        with self.assertRaisesRegex(ValueError, "No input value left"):
+            Interpreter.collect_outputs(program, [])
+
+    def test_output_writer(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        stream = io.StringIO()
+        with Interpreter.OutputWriter(stream, flush_every=2) as writer:
+            Interpreter.execute(
+                program,
+                read_value=Interpreter.input_reader(
+                    Interpreter.read_values(io.StringIO("2\n"))
+                ),
+                write_value=writer,
+            )
+        self.assertEqual(stream.getvalue(), "a 5\nb -1\nc 6\nd 2\nf 3\n")
+
+    def test_machine_reuses_state(self):
+        machine = Interpreter.Machine(num_registers=4)
+        memory, registers = machine.Memory, machine.RegisterFile
+        program = Interpreter.load_program("Interpreter.test.s")
+        self.assertEqual(machine.run(program, [12])[0], ("a", 15))
+        self.assertEqual(machine.Memory, [15, 9, 36, 0, 0, 15])
+
+        # A smaller program reuses the lists and starts from zeroed state
+        head = compile_source("c=+c1;%c;%a!")[0]
+        self.assertEqual(machine.run(head), [("c", 1), ("a", 0)])
+        self.assertIs(machine.Memory, memory)
+        self.assertEqual(machine.Memory, [0, 0, 1, 0, 0, 0])
+        self.assertEqual(len(machine.RegisterFile), 7)
+        self.assertIsNot(machine.RegisterFile, registers)
+
+    def test_machine_resets_registers(self):
+        # Reads r1 before writing it, so leftovers from a previous run would show
+        head = Instruction(OpCode.STORE, "a", 1)
+        head.next = Instruction(OpCode.LOADI, 1, 9)
+        head.next.next = Instruction(OpCode.WRITE, "a")
+        machine = Interpreter.Machine()
+        self.assertEqual(machine.run(head), [("a", 0)])
+        self.assertEqual(machine.run(head), [("a", 0)])
+
+    def test_execute_profiled(self):
+        program = Interpreter.load_program("Interpreter.test.s")
+        outputs = []
+        profile = Interpreter.execute_profiled(
+            program,
+            read_value=lambda name: 12,
+            write_value=lambda name, value: outputs.append((name, value)),
+        )
+        expected = self.run_program(read_instruction_list("Interpreter.test.s"), [12])
+        self.assertEqual(outputs, expected)
+        self.assertEqual(profile.instructions, 18)
+        self.assertEqual(profile.opcode_counts["STORE"], 5)
+        self.assertEqual(profile.opcode_counts["ADD"], 1)
+        self.assertEqual(sum(profile.opcode_counts.values()), 18)
+        self.assertEqual(set(profile.opcode_times), set(profile.opcode_counts))
+        self.assertEqual(profile.peak_register, 6)
+        self.assertEqual(
+            profile.variables["b"], {"loads": 1, "stores": 1, "reads": 1, "writes": 1}
+        )
+        self.assertEqual(profile.variables["e"]["stores"], 0)
+        self.assertGreater(profile.throughput, 0)
+
+        exported = json.loads(profile.to_json())
+        self.assertEqual(exported["instructions"], 18)
+        self.assertEqual(exported["opcodes"]["WRITE"]["count"], 5)
+        self.assertIn("peak register r6", profile.report())
+
+    def test_illegal_variable(self):
+        with self.assertRaises(ValueError):
+            Interpreter.decode_program(Instruction(OpCode.READ, "z"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,572 @@
+import heapq
+import itertools
+import sys
+from Instruction import (
+    Instruction,
+    InstructionWriter,
+    OpCode,
+    read_instruction_stream,
+)
+from Interpreter import BINARY_OPERATIONS
+
+# Arithmetic instructions, field1 = field2 <op> field3
+ARITHMETIC_OPCODES = [OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.AND, OpCode.OR]
+
+
+# =========
+# Utilities
+# =========
+
+
+def last_instruction(instr: Instruction) -> Instruction:
+    """Returns the last instruction of the list containing instr"""
+    if not instr:
+        raise ValueError("No instructions")
+    while instr.next:
+        instr = instr.next
+    return instr
+
+
+def count_instructions(instr: Instruction) -> int:
+    count = 0
+    while instr:
+        count += 1
+        instr = instr.next
+    return count
+
+
+def count_memory_operations(head: Instruction) -> dict:
+    """Returns the number of LOAD and STORE instructions, as {"LOAD": n, "STORE": m}"""
+    counts = {"LOAD": 0, "STORE": 0}
+    instr = head
+    while instr:
+        if instr.opcode in [OpCode.LOAD, OpCode.STORE]:
+            counts[instr.opcode.name] += 1
+        instr = instr.next
+    return counts
+
+
+def remove_instruction(instr: Instruction):
+    """Unlinks instr from its list, the caller keeps track of a removed head"""
+    if instr.prev:
+        instr.prev.next = instr.next
+    if instr.next:
+        instr.next.prev = instr.prev
+    instr.prev = instr.next = None
+
+
+# =====================
+# Dead code elimination
+# =====================
+
+
+def mark_critical(head: Instruction) -> int:
+    """
+    Marks the instructions that contribute to the program's output as critical.
+
+    Walks the list backwards from its end keeping the sets of variables and registers
+    whose current value is still needed (live). WRITE and READ are always critical,
+    since they are the program's I/O and a dropped READ would shift the input stream.
+    Any other instruction is critical only if it defines a live register or variable,
+    in which case its operands become live.
+
+    Returns:
+        int: the number of critical instructions
+    """
+    if not head:
+        return 0
+
+    live_vars, live_regs = set(), set()
+    count = 0
+    instr = last_instruction(head)
+    while instr:
+        opcode = instr.opcode
+        if opcode == OpCode.WRITE:
+            instr.critical = True
+            live_vars.add(instr.field1)
+        elif opcode == OpCode.READ:
+            instr.critical = True
+            live_vars.discard(instr.field1)
+        elif opcode == OpCode.STORE:
+            instr.critical = instr.field1 in live_vars
+            if instr.critical:
+                live_vars.discard(instr.field1)
+                live_regs.add(instr.field2)
+        elif opcode == OpCode.LOAD:
+            instr.critical = instr.field1 in live_regs
+            if instr.critical:
+                live_regs.discard(instr.field1)
+                live_vars.add(instr.field2)
+        elif opcode == OpCode.LOADI:
+            instr.critical = instr.field1 in live_regs
+            live_regs.discard(instr.field1)
+        else:
+            instr.critical = instr.field1 in live_regs
+            if instr.critical:
+                live_regs.discard(instr.field1)
+                live_regs.add(instr.field2)
+                live_regs.add(instr.field3)
+
+        count += instr.critical
+        instr = instr.prev
+
+    return count
+
+
+def eliminate_dead_code(head: Instruction) -> Instruction:
+    """Removes every instruction mark_critical does not mark, returns the new list head"""
+    mark_critical(head)
+
+    instr = head
+    while instr:
+        next_instr = instr.next
+        if not instr.critical:
+            if instr is head:
+                head = next_instr
+            remove_instruction(instr)
+        instr = next_instr
+
+    return head
+
+
+# ===================================
+# Constant folding and simplification
+# ===================================
+
+def defined_register(instr: Instruction):
+    """Returns the register instr writes, or None if it does not write one"""
+    if instr.opcode in [OpCode.STORE, OpCode.READ, OpCode.WRITE]:
+        return None
+    return instr.field1
+
+
+def is_single_assignment(head: Instruction) -> bool:
+    """True if every register is written by at most one instruction, as the compiler emits"""
+    defined = set()
+    instr = head
+    while instr:
+        reg = defined_register(instr)
+        if reg is not None:
+            if reg in defined:
+                return False
+            defined.add(reg)
+        instr = instr.next
+    return True
+
+
+def make_loadi(instr: Instruction, value: int):
+    """Turns instr into LOADI of value into the register it already defines"""
+    instr.opcode = OpCode.LOADI
+    instr.field2 = value
+    instr.field3 = None
+
+
+def simplify(opcode: OpCode, left: int, right: int, left_value, right_value):
+    """
+    Applies algebraic identities to left <op> right, where *_value is the operand's
+    known constant or None.
+
+    Returns:
+        ("const", value) if the result is a known constant,
+        ("reg", register) if the result equals one of the operand registers,
+        None if nothing simplifies.
+    """
+    if left_value is not None and right_value is not None:
+        return ("const", BINARY_OPERATIONS[opcode.value](left_value, right_value))
+
+    if opcode in [OpCode.MUL, OpCode.AND] and 0 in (left_value, right_value):
+        return ("const", 0)  # x*0, x&0
+    if opcode == OpCode.SUB and left == right:
+        return ("const", 0)  # x-x
+    if opcode in [OpCode.AND, OpCode.OR] and left == right:
+        return ("reg", left)  # x&x, x|x
+
+    identity = {OpCode.ADD: 0, OpCode.OR: 0, OpCode.MUL: 1, OpCode.SUB: 0}.get(opcode)
+    if identity is None:
+        return None
+    if right_value == identity:
+        return ("reg", left)  # x+0, x|0, x*1, x-0
+    if left_value == identity and opcode != OpCode.SUB:
+        return ("reg", right)  # 0+x, 0|x, 1*x
+    return None
+
+
+def fold_constants(head: Instruction) -> Instruction:
+    """
+    Folds arithmetic on known constants into LOADI and applies algebraic identities.
+
+    A forward walk tracks the constant value of registers and of variables a-f (all
+    variables start at 0; READ makes a variable unknown). LOAD of a known variable and
+    arithmetic on known operands become LOADI, as do x*0, x&0 and x-x. Identities whose
+    result is one of the operands (x*1, x+0, x|0, x-0, x&x, x|x) are removed and later
+    uses of their result register are renamed to the operand register; that renaming is
+    only done when every register is assigned once, as in compiler output. Operand
+    LOADIs that are no longer needed are left for eliminate_dead_code.
+
+    Returns:
+        Instruction: the new list head
+    """
+    rename = is_single_assignment(head)
+    reg_values, var_values = {}, {name: 0 for name in "abcdef"}
+    alias = {}  # register -> operand register it was simplified to
+
+    instr = head
+    while instr:
+        next_instr = instr.next
+        opcode = instr.opcode
+
+        if opcode == OpCode.LOAD:
+            value = var_values.get(instr.field2)
+            if value is not None:
+                make_loadi(instr, value)
+                reg_values[instr.field1] = value
+            else:
+                reg_values.pop(instr.field1, None)
+        elif opcode == OpCode.LOADI:
+            reg_values[instr.field1] = instr.field2
+        elif opcode == OpCode.STORE:
+            instr.field2 = alias.get(instr.field2, instr.field2)
+            var_values[instr.field1] = reg_values.get(instr.field2)
+        elif opcode == OpCode.READ:
+            var_values[instr.field1] = None
+        elif opcode in ARITHMETIC_OPCODES:
+            instr.field2 = alias.get(instr.field2, instr.field2)
+            instr.field3 = alias.get(instr.field3, instr.field3)
+            result = simplify(
+                opcode,
+                instr.field2,
+                instr.field3,
+                reg_values.get(instr.field2),
+                reg_values.get(instr.field3),
+            )
+            if result and result[0] == "const":
+                make_loadi(instr, result[1])
+                reg_values[instr.field1] = result[1]
+            elif result and rename:
+                alias[instr.field1] = result[1]
+                if instr is head:
+                    head = next_instr
+                remove_instruction(instr)
+            else:
+                reg_values.pop(instr.field1, None)
+
+        instr = next_instr
+
+    return head
+
+
+# =======================================
+# Value numbering (common subexpressions)
+# =======================================
+
+# Operand order does not matter for these, so a+b and b+a get the same value number
+COMMUTATIVE_OPCODES = [OpCode.ADD, OpCode.MUL, OpCode.AND, OpCode.OR]
+
+
+def eliminate_common_subexpressions(head: Instruction) -> Instruction:
+    """
+    Removes instructions that recompute a value some register already holds.
+
+    Local value numbering over the whole program (tinyL code is a single basic block).
+    Every computed value is keyed by how it was produced: ("var", x, version) for LOAD x,
+    where the version of x changes on every STORE x or READ x, ("const", c) for LOADI c,
+    and (opcode, left value, right value) for arithmetic, with the operands of
+    commutative opcodes ordered. An instruction producing a value that is already in the
+    table is removed and later uses of its register are renamed to the register holding
+    the value. Renaming needs every register to be assigned once, as in compiler output,
+    so other programs are returned unchanged.
+
+    Returns:
+        Instruction: the new list head
+    """
+    if not is_single_assignment(head):
+        return head
+
+    versions = {name: 0 for name in "abcdef"}
+    reg_value = {}  # register -> value number
+    holders = {}  # value key -> (value number, register holding it)
+    alias = {}  # removed register -> register holding the same value
+    new_value = itertools.count().__next__
+
+    def value_of(reg):
+        # A register read before any instruction writes it gets a value of its own
+        if reg not in reg_value:
+            reg_value[reg] = new_value()
+        return reg_value[reg]
+
+    instr = head
+    while instr:
+        next_instr = instr.next
+        opcode = instr.opcode
+        key = None
+
+        if opcode == OpCode.LOAD:
+            key = ("var", instr.field2, versions[instr.field2])
+        elif opcode == OpCode.LOADI:
+            key = ("const", instr.field2)
+        elif opcode in [OpCode.STORE, OpCode.READ]:
+            if opcode == OpCode.STORE:
+                instr.field2 = alias.get(instr.field2, instr.field2)
+            versions[instr.field1] += 1
+        elif opcode in ARITHMETIC_OPCODES:
+            instr.field2 = alias.get(instr.field2, instr.field2)
+            instr.field3 = alias.get(instr.field3, instr.field3)
+            left, right = value_of(instr.field2), value_of(instr.field3)
+            if opcode in COMMUTATIVE_OPCODES and right < left:
+                left, right = right, left
+            key = (opcode, left, right)
+
+        if key is not None:
+            if key in holders:
+                value, reg = holders[key]
+                alias[instr.field1] = reg
+                if instr is head:
+                    head = next_instr
+                remove_instruction(instr)
+            else:
+                value = new_value()
+                holders[key] = (value, instr.field1)
+                reg_value[instr.field1] = value
+
+        instr = next_instr
+
+    return head
+
+
+# ==============================================================
+# Store to load forwarding (promoting variables into registers)
+# ==============================================================
+
+
+def forward_stores(head: Instruction) -> Instruction:
+    """
+    Replaces loads of a variable by the register its value was last stored from.
+
+    Every statement ends with STORE x rN and the next statement using x starts with
+    LOAD rM x. A forward walk remembers which register holds the current value of each
+    variable (set by STORE x, forgotten on READ x); a LOAD of a variable that is held
+    in a register is removed and later uses of its register are renamed to the holding
+    register, so variables stay in registers across statements. Renaming needs every
+    register to be assigned once, as in compiler output, so other programs are
+    returned unchanged.
+
+    Returns:
+        Instruction: the new list head
+    """
+    if not is_single_assignment(head):
+        return head
+
+    holder = {}  # variable -> register holding its current value
+    alias = {}  # removed register -> register holding the same value
+
+    instr = head
+    while instr:
+        next_instr = instr.next
+        opcode = instr.opcode
+
+        if opcode == OpCode.LOAD and instr.field2 in holder:
+            alias[instr.field1] = holder[instr.field2]
+            if instr is head:
+                head = next_instr
+            remove_instruction(instr)
+        elif opcode == OpCode.STORE:
+            instr.field2 = alias.get(instr.field2, instr.field2)
+            holder[instr.field1] = instr.field2
+        elif opcode == OpCode.READ:
+            holder.pop(instr.field1, None)
+        elif opcode in ARITHMETIC_OPCODES:
+            instr.field2 = alias.get(instr.field2, instr.field2)
+            instr.field3 = alias.get(instr.field3, instr.field3)
+
+        instr = next_instr
+
+    return head
+
+
+def eliminate_dead_stores(head: Instruction) -> Instruction:
+    """
+    Removes every STORE whose value is never read from memory: the variable is stored
+    again or READ before the next LOAD or WRITE of it, or the program ends first.
+    The instructions computing a removed store's value are left for
+    eliminate_dead_code.
+
+    Returns:
+        Instruction: the new list head
+    """
+    if not head:
+        return head
+
+    needed = set()  # variables whose memory value is read later
+    instr = last_instruction(head)
+    while instr:
+        prev_instr = instr.prev
+        opcode = instr.opcode
+        if opcode == OpCode.WRITE:
+            needed.add(instr.field1)
+        elif opcode == OpCode.LOAD:
+            needed.add(instr.field2)
+        elif opcode == OpCode.READ:
+            needed.discard(instr.field1)
+        elif opcode == OpCode.STORE:
+            if instr.field1 in needed:
+                needed.discard(instr.field1)
+            else:
+                if instr is head:
+                    head = instr.next
+                remove_instruction(instr)
+        instr = prev_instr
+
+    return head
+
+
+def promote_variables(head: Instruction) -> Instruction:
+    """
+    Keeps variables in registers instead of bouncing them through memory: forwards
+    stored registers to later loads (forward_stores), then removes the stores that no
+    longer feed any LOAD or WRITE (eliminate_dead_stores).
+
+    Returns:
+        Instruction: the new list head
+    """
+    return eliminate_dead_stores(forward_stores(head))
+
+
+# ===================
+# Register allocation
+# ===================
+
+
+def used_registers(instr: Instruction) -> list:
+    """Returns the registers instr reads"""
+    if instr.opcode == OpCode.STORE:
+        return [instr.field2]
+    if instr.opcode in ARITHMETIC_OPCODES:
+        return [instr.field2, instr.field3]
+    return []
+
+
+def live_intervals(head: Instruction) -> dict:
+    """
+    Computes the live interval [start, end] of every register by instruction index.
+
+    start is the index of the first write, or -1 if the register is read before it is
+    written (it then holds the initial 0 from program start). end is the index of the
+    last read, or of the last write if it is never read afterwards.
+    """
+    intervals = {}
+    index = 0
+    instr = head
+    while instr:
+        for reg in used_registers(instr):
+            if reg in intervals:
+                intervals[reg][1] = index
+            else:
+                intervals[reg] = [-1, index]
+        reg = defined_register(instr)
+        if reg is not None:
+            if reg in intervals:
+                intervals[reg][1] = index
+            else:
+                intervals[reg] = [index, index]
+        index += 1
+        instr = instr.next
+    return intervals
+
+
+def allocate_registers(head: Instruction) -> Instruction:
+    """
+    Maps virtual registers onto as few physical registers (r1, r2, ...) as possible.
+
+    Linear scan: live intervals are visited by start, and each takes the lowest numbered
+    physical register whose previous interval has ended. An interval ending at the
+    instruction where another starts can share its register, since an instruction reads
+    its operands before writing its result. tinyL code is straight-line, so this uses as
+    many registers as the most values live at once and never needs to spill.
+
+    Returns:
+        Instruction: the list head (instructions are renumbered in place)
+    """
+    intervals = live_intervals(head)
+    assignment = {}
+    free = []  # heap of released physical registers
+    active = []  # heap of (end, physical register)
+    num_physical = 0
+
+    for reg, (start, end) in sorted(intervals.items(), key=lambda item: item[1][0]):
+        while active and active[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        if free:
+            physical = heapq.heappop(free)
+        else:
+            num_physical += 1
+            physical = num_physical
+        assignment[reg] = physical
+        heapq.heappush(active, (end, physical))
+
+    instr = head
+    while instr:
+        if instr.opcode == OpCode.STORE:
+            instr.field2 = assignment[instr.field2]
+        elif instr.opcode in ARITHMETIC_OPCODES:
+            instr.field1 = assignment[instr.field1]
+            instr.field2 = assignment[instr.field2]
+            instr.field3 = assignment[instr.field3]
+        elif instr.opcode in [OpCode.LOAD, OpCode.LOADI]:
+            instr.field1 = assignment[instr.field1]
+        instr = instr.next
+
+    return head
+
+
+# ========
+# Pipeline
+# ========
+
+# Passes run by optimize, in order. Each takes and returns the head of the list.
+# Register allocation reuses registers, so it has to run after the passes that
+# rename registers and rely on single assignment.
+PASSES = [
+    promote_variables,
+    eliminate_common_subexpressions,
+    fold_constants,
+    eliminate_dead_code,
+    allocate_registers,
+]
+
+
+def optimize(head: Instruction) -> Instruction:
+    for optimization_pass in PASSES:
+        head = optimization_pass(head)
+    return head
+
+
+# =============
+# Main function
+# =============
+def main() -> int:
+    # --stats reports the LOAD and STORE instructions eliminated on standard error
+    if sys.argv[1:] not in [[], ["--stats"]]:
+        sys.stderr.write(
+            "Use of command:\n  Optimizer.py [--stats] < <RISC code file> > <optimized file>\n"
+        )
+        return 1
+
+    head = read_instruction_stream(sys.stdin)
+    before = count_memory_operations(head)
+    head = optimize(head)
+
+    with InstructionWriter(sys.stdout) as writer:
+        writer.write_list(head)
+
+    if "--stats" in sys.argv:
+        after = count_memory_operations(head)
+        for name in before:
+            sys.stderr.write(
+                f"{name}: {before[name]} -> {after[name]} "
+                f"({before[name] - after[name]} eliminated)\n"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
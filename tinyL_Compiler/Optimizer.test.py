@@ -0,0 +1,319 @@
+import glob
+import io
+import unittest
+from unittest import mock
+import Interpreter
+import Optimizer
+from Compiler import compile_source
+from Instruction import OpCode, format_instruction, read_instruction_stream
+
+
+def listing(head):
+    lines = []
+    while head:
+        lines.append(format_instruction(head).strip())
+        head = head.next
+    return lines
+
+
+def run(head, inputs):
+    return Interpreter.collect_outputs(Interpreter.decode_program(head), inputs)
+
+
+class DeadCodeEliminationTests(unittest.TestCase):
+    def test_removes_unused_stores(self):
+        # x = 3; y = 7; z = x * 2; % z  from the project description, with a-c
+        head = compile_source("a=3;b=7;c=*a2;%c!")[0]
+        head = Optimizer.eliminate_dead_code(head)
+        expected = [
+            "LOADI r1 #3",
+            "STORE a r1",
+            "LOAD r3 a",
+            "LOADI r4 #2",
+            "MUL r5 r3 r4",
+            "STORE c r5",
+            "WRITE c",
+        ]
+        self.assertEqual(listing(head), expected)
+        self.assertIsNone(head.prev)
+
+    def test_overwritten_store(self):
+        head = compile_source("a=1;a=2;%a!")[0]
+        head = Optimizer.eliminate_dead_code(head)
+        self.assertEqual(listing(head), ["LOADI r2 #2", "STORE a r2", "WRITE a"])
+
+    def test_keeps_reads(self):
+        head = compile_source("?a;?b;%b!")[0]
+        head = Optimizer.eliminate_dead_code(head)
+        self.assertEqual(listing(head), ["READ a", "READ b", "WRITE b"])
+
+    def test_no_output(self):
+        head = compile_source("a=1;b=+a2!")[0]
+        self.assertIsNone(Optimizer.eliminate_dead_code(head))
+
+    def test_mark_critical(self):
+        head = compile_source("a=1;%a;b=2!")[0]
+        self.assertEqual(Optimizer.mark_critical(head), 3)
+        self.assertEqual(
+            [instr.critical for instr in [head, head.next, head.next.next]],
+            [True, True, True],
+        )
+        self.assertFalse(Optimizer.last_instruction(head).critical)
+
+    def test_preserves_output(self):
+        for path in sorted(glob.glob("./tinyL_tests/**/*.tinyL", recursive=True)):
+            with open(path) as f:
+                source = f.read()
+            inputs = [3, -4, 5, 7, 11, 2]
+            expected = run(compile_source(source)[0], inputs)
+            optimized = Optimizer.optimize(compile_source(source)[0])
+            self.assertEqual(run(optimized, inputs), expected, msg=path)
+
+
+class ConstantFoldingTests(unittest.TestCase):
+    def optimize(self, source):
+        head = Optimizer.fold_constants(compile_source(source)[0])
+        return listing(Optimizer.eliminate_dead_code(head))
+
+    def test_folds_arithmetic(self):
+        # c=&5-16 from optimization/comp20
+        self.assertEqual(self.optimize("c=&5-16;%c!"), ["LOADI r5 #1", "STORE c r5", "WRITE c"])
+
+    def test_propagates_through_variables(self):
+        self.assertEqual(
+            self.optimize("a=7;b=+a2;%b!"), ["LOADI r4 #9", "STORE b r4", "WRITE b"]
+        )
+
+    def test_variables_start_at_zero(self):
+        self.assertEqual(self.optimize("b=+a2;%b!"), ["LOADI r3 #2", "STORE b r3", "WRITE b"])
+
+    def test_read_is_unknown(self):
+        self.assertEqual(
+            self.optimize("?a;b=+a2;%b!"),
+            ["READ a", "LOAD r1 a", "LOADI r2 #2", "ADD r3 r1 r2", "STORE b r3", "WRITE b"],
+        )
+
+    def test_identities(self):
+        for expr, expected in [
+            ("*a0", ["LOADI r3 #0"]),
+            ("&0a", ["LOADI r3 #0"]),
+            ("*a1", ["LOAD r1 a"]),
+            ("*1a", ["LOAD r2 a"]),
+            ("+a0", ["LOAD r1 a"]),
+            ("|0a", ["LOAD r2 a"]),
+            ("-a0", ["LOAD r1 a"]),
+        ]:
+            result = self.optimize(f"?a;b={expr};%b!")
+            self.assertEqual(result[0], "READ a", msg=expr)
+            self.assertEqual(result[-1], "WRITE b", msg=expr)
+            self.assertEqual(result[1:-2], expected, msg=expr)
+            reg = expected[-1].split()[1]
+            self.assertEqual(result[-2], f"STORE b {reg}", msg=expr)
+
+    def test_same_register_identities(self):
+        for opcode, expected in [
+            (OpCode.SUB, ["READ a", "LOADI r2 #0", "STORE b r2", "WRITE b"]),
+            (OpCode.AND, ["READ a", "LOAD r1 a", "STORE b r1", "WRITE b"]),
+        ]:
+            head = read_instruction_stream(
+                ["READ a", "LOAD r1 a", f"{opcode.name} r2 r1 r1", "STORE b r2", "WRITE b"]
+            )
+            head = Optimizer.eliminate_dead_code(Optimizer.fold_constants(head))
+            self.assertEqual(listing(head), expected)
+
+    def test_no_renaming_when_registers_are_reused(self):
+        head = compile_source("?a;b=*a1;%b!")[0]
+        # Reuse r1 so the program is no longer single assignment
+        head.next.next.next.field1 = 1
+        head.next.next.next.next.field2 = 1
+        self.assertFalse(Optimizer.is_single_assignment(head))
+        head = Optimizer.fold_constants(head)
+        self.assertEqual(Optimizer.count_instructions(head), 6)
+
+
+class CommonSubexpressionTests(unittest.TestCase):
+    def test_reuses_loads_and_expressions(self):
+        head = compile_source("?a;?b;c=*+ab+ba;%c!")[0]
+        head = Optimizer.eliminate_common_subexpressions(head)
+        expected = [
+            "READ a",
+            "READ b",
+            "LOAD r1 a",
+            "LOAD r2 b",
+            "ADD r3 r1 r2",
+            "MUL r7 r3 r3",
+            "STORE c r7",
+            "WRITE c",
+        ]
+        self.assertEqual(listing(head), expected)
+
+    def test_store_invalidates_loads(self):
+        head = compile_source("?a;b=a;a=+a1;c=+ab;%c!")[0]
+        head = Optimizer.eliminate_common_subexpressions(head)
+        # The second LOAD of a reuses r1, the one after STORE a must stay
+        expected = [
+            "READ a",
+            "LOAD r1 a",
+            "STORE b r1",
+            "LOADI r3 #1",
+            "ADD r4 r1 r3",
+            "STORE a r4",
+            "LOAD r5 a",
+            "LOAD r6 b",
+            "ADD r7 r5 r6",
+            "STORE c r7",
+            "WRITE c",
+        ]
+        self.assertEqual(listing(head), expected)
+        self.assertEqual(run(head, [5]), [("c", 11)])
+
+    def test_read_invalidates_loads(self):
+        head = compile_source("?a;b=+a1;?a;c=+a1;%b;%c!")[0]
+        head = Optimizer.eliminate_common_subexpressions(head)
+        # Only the second LOADI #1 goes, a is loaded again after the READ
+        self.assertEqual(Optimizer.count_instructions(head), 11)
+        self.assertIn("LOAD r4 a", listing(head))
+        self.assertEqual(run(head, [1, 10]), [("b", 2), ("c", 11)])
+
+    def test_enables_folding(self):
+        head = compile_source("?a;b=-aa;%b!")[0]
+        head = Optimizer.optimize(head)
+        self.assertEqual(listing(head), ["READ a", "LOADI r1 #0", "STORE b r1", "WRITE b"])
+
+
+class StoreForwardingTests(unittest.TestCase):
+    def test_forwards_stored_register(self):
+        head = Optimizer.promote_variables(compile_source("?a;b=+a1;c=*b2;%c!")[0])
+        expected = [
+            "READ a",
+            "LOAD r1 a",
+            "LOADI r2 #1",
+            "ADD r3 r1 r2",
+            "LOADI r5 #2",
+            "MUL r6 r3 r5",
+            "STORE c r6",
+            "WRITE c",
+        ]
+        self.assertEqual(listing(head), expected)
+        self.assertEqual(run(head, [4]), [("c", 10)])
+
+    def test_read_stops_forwarding(self):
+        head = Optimizer.promote_variables(compile_source("a=1;?a;b=+a1;%b!")[0])
+        self.assertIn("LOAD r2 a", listing(head))
+        self.assertNotIn("STORE a r1", listing(head))
+        self.assertEqual(run(head, [5]), [("b", 6)])
+
+    def test_removes_overwritten_stores(self):
+        head = Optimizer.promote_variables(compile_source("?a;b=+a1;b=+a2;%b!")[0])
+        self.assertEqual(
+            [line for line in listing(head) if line.startswith("STORE")], ["STORE b r6"]
+        )
+
+    def test_keeps_stores_that_are_written(self):
+        head = Optimizer.promote_variables(compile_source("?a;%a;a=+a1;%a!")[0])
+        self.assertEqual(
+            listing(head),
+            [
+                "READ a",
+                "WRITE a",
+                "LOAD r1 a",
+                "LOADI r2 #1",
+                "ADD r3 r1 r2",
+                "STORE a r3",
+                "WRITE a",
+            ],
+        )
+
+    def test_counts_memory_operations(self):
+        for path in sorted(glob.glob("./tinyL_tests/*.tinyL")):
+            with open(path) as f:
+                source = f.read()
+            head = compile_source(source)[0]
+            before = Optimizer.count_memory_operations(head)
+            inputs = list(range(2, 12))
+            expected = run(head, inputs)
+            head = Optimizer.promote_variables(head)
+            after = Optimizer.count_memory_operations(head)
+            self.assertLessEqual(after["LOAD"], before["LOAD"], msg=path)
+            self.assertLessEqual(after["STORE"], before["STORE"], msg=path)
+            self.assertEqual(run(head, inputs), expected, msg=path)
+        self.assertEqual(
+            Optimizer.count_memory_operations(compile_source("?a;b=+aa;c=b;%c!")[0]),
+            {"LOAD": 3, "STORE": 2},
+        )
+
+    def test_registers_reused(self):
+        # Not single assignment: loads stay, dead stores still go
+        head = read_instruction_stream(
+            [
+                "LOADI r1 #5",
+                "STORE a r1",
+                "LOADI r1 #6",
+                "STORE a r1",
+                "LOAD r1 a",
+                "STORE b r1",
+                "WRITE b",
+            ]
+        )
+        head = Optimizer.promote_variables(head)
+        self.assertEqual(
+            listing(head),
+            ["LOADI r1 #5", "LOADI r1 #6", "STORE a r1", "LOAD r1 a", "STORE b r1", "WRITE b"],
+        )
+        self.assertEqual(run(head, []), [("b", 6)])
+
+
+class RegisterAllocationTests(unittest.TestCase):
+    def test_reuses_registers(self):
+        head = compile_source("?a;b=+*a2-a3;%b!")[0]
+        head = Optimizer.allocate_registers(head)
+        expected = [
+            "READ a",
+            "LOAD r1 a",
+            "LOADI r2 #2",
+            "MUL r1 r1 r2",
+            "LOAD r2 a",
+            "LOADI r3 #3",
+            "SUB r2 r2 r3",
+            "ADD r1 r1 r2",
+            "STORE b r1",
+            "WRITE b",
+        ]
+        self.assertEqual(listing(head), expected)
+
+    def test_register_count_is_bounded(self):
+        source = ";".join(["?a"] + [f"b=+*a{i % 10}b" for i in range(3000)] + ["%b"]) + "!"
+        head = Optimizer.allocate_registers(compile_source(source)[0])
+        program = Interpreter.decode_program(head)
+        self.assertEqual(program.max_reg, 2)
+        # Would need 12000 registers without allocation
+        self.assertEqual(run(head, [1]), [("b", sum(i % 10 for i in range(3000)))])
+
+    def test_uninitialized_register_keeps_its_zero(self):
+        head = read_instruction_stream(
+            ["LOADI r1 #5", "STORE a r1", "ADD r3 r2 r2", "STORE b r3", "WRITE a", "WRITE b"]
+        )
+        head = Optimizer.allocate_registers(head)
+        self.assertEqual(run(head, []), [("a", 5), ("b", 0)])
+        self.assertNotEqual(head.field1, head.next.next.field2)
+
+    def test_live_intervals(self):
+        head = compile_source("?a;b=+a1;%b!")[0]
+        self.assertEqual(
+            Optimizer.live_intervals(head), {1: [1, 3], 2: [2, 3], 3: [3, 4]}
+        )
+
+
+class CommandLineTests(unittest.TestCase):
+    def test_unknown_instruction_is_not_written_as_code(self):
+        stdin = io.StringIO("LOADI r1 #1\nFOO r1\nSTORE a r1\nWRITE a\n")
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("sys.argv", ["Optimizer.py"]), mock.patch("sys.stdin", stdin):
+            with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+                self.assertEqual(Optimizer.main(), 0)
+        self.assertEqual(stdout.getvalue(), "LOADI r1 #1\nSTORE a r1\nWRITE a\n")
+        self.assertEqual(stderr.getvalue(), "Unknown Instruction: FOO\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
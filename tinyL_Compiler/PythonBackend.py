@@ -0,0 +1,107 @@
+import sys
+from functools import lru_cache
+from Instruction import Instruction, OpCode, read_instruction_list
+from Interpreter import VARIABLE_NAMES, print_write, prompt_read, variable_index
+
+# Python operator for each arithmetic instruction
+BINARY_OPERATORS = {
+    OpCode.ADD: "+",
+    OpCode.SUB: "-",
+    OpCode.MUL: "*",
+    OpCode.AND: "&",
+    OpCode.OR: "|",
+}
+
+FUNCTION_NAME = "tinyL_program"
+
+
+def translate_program(instr: Instruction) -> str:
+    """
+    Translates a linked list of instructions into the source of a Python function.
+
+    The generated function takes read_value and write_value callbacks (see
+    Interpreter.execute) and returns the final Memory as a list [a, b, c, d, e, f].
+    Each instruction becomes one straight-line statement, with register rN as the
+    local variable rN and the tinyL variables a-f as locals of the same name. Registers
+    read before they are written start at 0, like the interpreter's RegisterFile.
+
+    Raises:
+    - ValueError: If an instruction uses a variable outside a-f.
+    """
+    body = []
+    written = set()
+    uninitialized = set()
+
+    def reg(n, write=False):
+        if write:
+            written.add(n)
+        elif n not in written:
+            uninitialized.add(n)
+        return f"r{n}"
+
+    while instr:
+        opcode = instr.opcode
+        if opcode == OpCode.LOAD:
+            var = VARIABLE_NAMES[variable_index(instr.field2)]
+            body.append(f"{reg(instr.field1, True)} = {var}")
+        elif opcode == OpCode.LOADI:
+            body.append(f"{reg(instr.field1, True)} = {instr.field2}")
+        elif opcode == OpCode.STORE:
+            var = VARIABLE_NAMES[variable_index(instr.field1)]
+            body.append(f"{var} = {reg(instr.field2)}")
+        elif opcode == OpCode.READ:
+            var = VARIABLE_NAMES[variable_index(instr.field1)]
+            body.append(f'{var} = read_value("{var}")')
+        elif opcode == OpCode.WRITE:
+            var = VARIABLE_NAMES[variable_index(instr.field1)]
+            body.append(f'write_value("{var}", {var})')
+        else:
+            # Operands are read before the destination is written
+            left, right = reg(instr.field2), reg(instr.field3)
+            dest = reg(instr.field1, True)
+            body.append(f"{dest} = {left} {BINARY_OPERATORS[opcode]} {right}")
+        instr = instr.next
+
+    lines = [f"def {FUNCTION_NAME}(read_value, write_value):"]
+    lines.append("    " + " = ".join(VARIABLE_NAMES) + " = 0")
+    lines.extend(f"    r{n} = 0" for n in sorted(uninitialized))
+    lines.extend("    " + stmt for stmt in body)
+    lines.append(f"    return [{', '.join(VARIABLE_NAMES)}]")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=256)
+def function_from_source(source: str):
+    """Compiles generated function source, cached so each distinct program is compiled once"""
+    namespace = {}
+    exec(compile(source, f"<{FUNCTION_NAME}>", "exec"), namespace)
+    return namespace[FUNCTION_NAME]
+
+
+def compile_program(instr: Instruction):
+    """
+    Returns a Python function equivalent to the instruction list starting at instr.
+
+    Call it as f(read_value, write_value). Translating the same program again returns
+    the cached function, but callers running a program many times should keep the
+    function rather than recompiling it per run.
+    """
+    return function_from_source(translate_program(instr))
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.stderr.write("Use of command:\n  run <RISC code file>\n")
+        sys.exit(1)
+
+    try:
+        head = read_instruction_list(sys.argv[2])
+    except (IOError, ValueError) as e:
+        sys.stderr.write(f'Cannot open input file "{sys.argv[2]}"\n')
+        sys.exit(1)
+
+    compile_program(head)(prompt_read, print_write)
+
+
+if __name__ == "__main__":
+    main()
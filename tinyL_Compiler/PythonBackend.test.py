@@ -0,0 +1,59 @@
+import glob
+import unittest
+import Interpreter
+import PythonBackend
+from Compiler import compile_source
+from Instruction import Instruction, OpCode, read_instruction_list
+
+
+class PythonBackendTests(unittest.TestCase):
+    def run_both(self, head, inputs):
+        machine = Interpreter.Machine()
+        interpreted = machine.run(head, inputs)
+        compiled = []
+        pending = list(inputs)
+        final = PythonBackend.compile_program(head)(
+            lambda name: pending.pop(0),
+            lambda name, value: compiled.append((name, value)),
+        )
+        self.assertEqual(final, machine.Memory)
+        return interpreted, compiled
+
+    def test_translate_program(self):
+        head = compile_source("?a;b=+a2;%b!")[0]
+        source = PythonBackend.translate_program(head)
+        expected = [
+            "def tinyL_program(read_value, write_value):",
+            "    a = b = c = d = e = f = 0",
+            '    a = read_value("a")',
+            "    r1 = a",
+            "    r2 = 2",
+            "    r3 = r1 + r2",
+            "    b = r3",
+            '    write_value("b", b)',
+            "    return [a, b, c, d, e, f]",
+        ]
+        self.assertEqual(source.splitlines(), expected)
+
+    def test_matches_interpreter_on_test_programs(self):
+        for path in sorted(glob.glob("./tinyL_tests/**/*.tinyL", recursive=True)):
+            with open(path) as f:
+                head = compile_source(f.read())[0]
+            interpreted, compiled = self.run_both(head, [3, -4, 5, 7, 11, 2])
+            self.assertEqual(compiled, interpreted, msg=path)
+
+    def test_uninitialized_register(self):
+        head = Instruction(OpCode.ADD, 3, 1, 2)
+        head.next = Instruction(OpCode.STORE, "a", 3)
+        final = PythonBackend.compile_program(head)(None, None)
+        self.assertEqual(final, [0] * 6)
+
+    def test_cached(self):
+        head = read_instruction_list("Interpreter.test.s")
+        first = PythonBackend.compile_program(head)
+        second = PythonBackend.compile_program(read_instruction_list("Interpreter.test.s"))
+        self.assertIs(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+import sys
+from array import array
+from contextlib import ExitStack
+from Compiler import link_instructions, scan, validate
+from Instruction import Instruction, InstructionWriter, OpCode
+from Interpreter import (
+    ADD,
+    AND,
+    LOAD,
+    LOADI,
+    MUL,
+    NUM_VARIABLES,
+    OR,
+    READ,
+    STORE,
+    SUB,
+    VARIABLE_NAMES,
+    WRITE,
+    OutputWriter,
+    input_reader,
+    print_write,
+    prompt_read,
+    read_values,
+)
+
+# Node kind of every token character (the OpCode value of the instruction the node
+# compiles to) and its payload: the digit, or the variable's Memory index
+NODE_KINDS = bytes.maketrans(
+    b"0123456789abcdef+-*&|?%",
+    bytes([LOADI] * 10 + [LOAD] * 6 + [ADD, SUB, MUL, AND, OR, READ, WRITE]),
+)
+NODE_VALUES = bytes.maketrans(b"0123456789abcdef", bytes(range(10)) + bytes(range(6)))
+OPERATOR_KINDS = frozenset([ADD, SUB, MUL, AND, OR])
+
+
+class SyntaxTree:
+    """
+    Abstract syntax tree of a tinyL program, stored in parallel arrays.
+
+    Node i has kind kinds[i], the integer OpCode of the instruction it compiles to
+    (LOADI for a digit, LOAD for a variable, ADD to AND for an operator, STORE for an
+    assignment, READ and WRITE), payload values[i] (the digit, or the Memory index of
+    the variable; 0 for operators) and children left[i] and right[i] (-1 if none; an
+    assignment's expression is its left child).
+
+    Nodes are stored in post-order, children before their parent and statements in
+    program order, so a single pass over the arrays visits the whole tree the way
+    code generation and evaluation need it. roots holds the node of every statement.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.values = array("B")
+        self.left = array("i")
+        self.right = array("i")
+        self.roots = array("i")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(self, kind: int, value: int = 0, left: int = -1, right: int = -1) -> int:
+        """Appends a node, returns its index"""
+        self.kinds.append(kind)
+        self.values.append(value)
+        self.left.append(left)
+        self.right.append(right)
+        return len(self.kinds) - 1
+
+    def statement_nodes(self, n: int) -> range:
+        """Indices of the nodes of statement n (its expression, then the statement node)"""
+        return range(self.roots[n - 1] + 1 if n else 0, self.roots[n] + 1)
+
+
+def parse_tree(content: str) -> SyntaxTree:
+    """
+    Parses a whole tinyL program into a SyntaxTree.
+
+    The program is validated first (see Compiler.validate), so the parser walks the
+    pre-classified tokens without any further checks.
+
+    Raises:
+    - Exception: If the program is not valid.
+    """
+    tokens, classes = scan(content)
+    validate(tokens, classes)
+    data = tokens.encode("ascii")
+    kinds, values = data.translate(NODE_KINDS), data.translate(NODE_VALUES)
+
+    tree = SyntaxTree()
+    add = tree.add
+    i = 0
+    while i < len(data):
+        kind = kinds[i]
+        if kind == READ or kind == WRITE:
+            tree.roots.append(add(kind, values[i + 1]))
+            i += 3  # ?a; or %a!
+            continue
+
+        # <assign>, the expression is parsed with an explicit stack like Compiler.expr
+        target = values[i]
+        i += 2
+        stack = []
+        while True:
+            kind = kinds[i]
+            i += 1
+            if kind in OPERATOR_KINDS:
+                stack.append([kind, -1])
+                continue
+            node = add(kind, values[i - 1])
+            while stack:
+                pending = stack[-1]
+                if pending[1] < 0:
+                    pending[1] = node
+                    break
+                stack.pop()
+                node = add(pending[0], 0, pending[1], node)
+            if not stack:
+                break
+        tree.roots.append(add(STORE, target, node))
+        i += 1  # skip ; or !
+    return tree
+
+
+# ===============
+# Code generation
+# ===============
+
+
+def generate_code(tree: SyntaxTree, emit) -> int:
+    """
+    Generates the RISC code of tree, calling emit(instr) for every instruction.
+
+    The code is exactly what the compiler emits for the same program: every
+    expression node gets the next register, in post-order. Returns the instruction
+    count.
+    """
+    registers = [0] * len(tree)
+    reg = 0
+    for i, kind in enumerate(tree.kinds):
+        value = tree.values[i]
+        if kind == STORE:
+            emit(Instruction(OpCode.STORE, VARIABLE_NAMES[value], registers[tree.left[i]]))
+            continue
+        if kind == READ or kind == WRITE:
+            emit(Instruction(kind, VARIABLE_NAMES[value]))
+            continue
+
+        reg += 1
+        registers[i] = reg
+        if kind == LOAD:
+            emit(Instruction(OpCode.LOAD, reg, VARIABLE_NAMES[value]))
+        elif kind == LOADI:
+            emit(Instruction(OpCode.LOADI, reg, value))
+        else:
+            left, right = registers[tree.left[i]], registers[tree.right[i]]
+            emit(Instruction(kind, reg, left, right))
+    return len(tree)
+
+
+def tree_instructions(tree: SyntaxTree) -> list:
+    """Returns the instructions generate_code emits, linked like Compiler.compile_source's"""
+    instrs = []
+    generate_code(tree, instrs.append)
+    link_instructions(instrs)
+    return instrs
+
+
+def compile_tree_file(infile_path: str, outfile_path: str) -> int:
+    """Like Compiler.compile_file, but through a SyntaxTree. Returns the instruction count"""
+    with open(infile_path, "r") as infile:
+        tree = parse_tree(infile.read())
+    with InstructionWriter(outfile_path) as writer:
+        return generate_code(tree, writer.write)
+
+
+# ==========
+# Evaluation
+# ==========
+
+
+def evaluate(
+    tree: SyntaxTree,
+    Memory: list = None,
+    read_value=prompt_read,
+    write_value=print_write,
+) -> int:
+    """
+    Runs a program directly from its SyntaxTree, without generating RISC code.
+
+    Walking the post-ordered nodes, operand values are kept on a stack instead of in
+    registers. Memory, read_value and write_value work as in Interpreter.execute.
+    Returns the number of evaluated nodes.
+    """
+    if Memory is None:
+        Memory = [0] * NUM_VARIABLES
+    stack = []
+    push, pop = stack.append, stack.pop
+
+    for kind, value in zip(tree.kinds, tree.values):
+        if kind == LOAD:
+            push(Memory[value])
+        elif kind == LOADI:
+            push(value)
+        elif kind == ADD:
+            right = pop()
+            push(pop() + right)
+        elif kind == STORE:
+            Memory[value] = pop()
+        elif kind == MUL:
+            right = pop()
+            push(pop() * right)
+        elif kind == SUB:
+            right = pop()
+            push(pop() - right)
+        elif kind == AND:
+            right = pop()
+            push(pop() & right)
+        elif kind == OR:
+            right = pop()
+            push(pop() | right)
+        elif kind == READ:
+            Memory[value] = read_value(VARIABLE_NAMES[value])
+        else:
+            write_value(VARIABLE_NAMES[value], Memory[value])
+
+    return len(tree)
+
+
+# =============
+# Main function
+# =============
+def main():
+    if len(sys.argv) not in [3, 4] or sys.argv[1] not in ["compile", "run"]:
+        sys.stderr.write(
+            "Use of command:\n  compile <tinyL file>\n"
+            "  run <tinyL file> [input file or - for stdin]\n"
+        )
+        sys.exit(1)
+
+    try:
+        with open(sys.argv[2], "r") as infile:
+            tree = parse_tree(infile.read())
+    except IOError:
+        sys.stderr.write(f'Cannot open input file "{sys.argv[2]}"\n')
+        sys.exit(1)
+
+    if sys.argv[1] == "compile":
+        outfile_path = "tinyL.out"
+        with InstructionWriter(outfile_path) as writer:
+            generate_code(tree, writer.write)
+        print(f'Code written to file "{outfile_path}".')
+        return
+
+    if len(sys.argv) == 3:
+        evaluate(tree)
+        return
+    # Headless, like "Interpreter.py run <file> <inputs>"
+    try:
+        with ExitStack() as stack:
+            infile = sys.stdin
+            if sys.argv[3] != "-":
+                infile = stack.enter_context(open(sys.argv[3], "r"))
+            with OutputWriter(sys.stdout) as writer:
+                evaluate(tree, read_value=input_reader(read_values(infile)), write_value=writer)
+    except (IOError, ValueError) as e:
+        sys.stderr.write(f"Cannot run program: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
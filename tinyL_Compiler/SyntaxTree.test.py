@@ -0,0 +1,92 @@
+import glob
+import os
+import tempfile
+import unittest
+import Interpreter
+import SyntaxTree
+from Compiler import compile_file, compile_source
+from Instruction import format_instruction
+
+
+def code_text(instrs) -> str:
+    return "".join(format_instruction(instr) for instr in instrs)
+
+
+class SyntaxTreeTests(unittest.TestCase):
+    def setUp(self):
+        self.sources = {}
+        for path in sorted(glob.glob("./tinyL_tests/**/*.tinyL", recursive=True)):
+            with open(path) as f:
+                self.sources[path] = f.read()
+
+    def test_layout(self):
+        tree = SyntaxTree.parse_tree("?a;b=+a2;%b!")
+        self.assertEqual(
+            list(tree.kinds),
+            [
+                Interpreter.READ,
+                Interpreter.LOAD,
+                Interpreter.LOADI,
+                Interpreter.ADD,
+                Interpreter.STORE,
+                Interpreter.WRITE,
+            ],
+        )
+        self.assertEqual(list(tree.values), [0, 0, 2, 0, 1, 1])
+        self.assertEqual(list(tree.left), [-1, -1, -1, 1, 3, -1])
+        self.assertEqual(list(tree.right), [-1, -1, -1, 2, -1, -1])
+        self.assertEqual(list(tree.roots), [0, 4, 5])
+        self.assertEqual(list(tree.statement_nodes(1)), [1, 2, 3, 4])
+        self.assertEqual(list(tree.statement_nodes(2)), [5])
+
+    def test_generate_code_matches_compiler(self):
+        for path, source in self.sources.items():
+            tree = SyntaxTree.parse_tree(source)
+            self.assertEqual(
+                code_text(SyntaxTree.tree_instructions(tree)),
+                code_text(compile_source(source)),
+                msg=path,
+            )
+
+    def test_compile_tree_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            expected_path = os.path.join(tmp, "expected.out")
+            actual_path = os.path.join(tmp, "actual.out")
+            compile_file("./tinyL_tests/comp01.tinyL", expected_path)
+            count = SyntaxTree.compile_tree_file("./tinyL_tests/comp01.tinyL", actual_path)
+            with open(expected_path) as expected, open(actual_path) as actual:
+                self.assertEqual(actual.read(), expected.read())
+            self.assertEqual(count, 19)
+
+    def test_evaluate_matches_interpreter(self):
+        inputs = [5, -3, 7, 2, 11, 4, 9, 1]
+        for path, source in self.sources.items():
+            expected = Interpreter.collect_outputs(
+                Interpreter.decode_program(compile_source(source)[0]), inputs
+            )
+            outputs = []
+            Memory = [0] * Interpreter.NUM_VARIABLES
+            count = SyntaxTree.evaluate(
+                SyntaxTree.parse_tree(source),
+                Memory,
+                read_value=Interpreter.input_reader(inputs),
+                write_value=lambda name, value: outputs.append((name, value)),
+            )
+            self.assertEqual(outputs, expected, msg=path)
+            self.assertEqual(count, len(compile_source(source)))
+
+    def test_deeply_nested_expr(self):
+        depth = 20000
+        tree = SyntaxTree.parse_tree("a=" + "-" * depth + "1" * (depth + 1) + ";%a!")
+        self.assertEqual(len(tree), 2 * depth + 3)
+        outputs = []
+        SyntaxTree.evaluate(tree, write_value=lambda name, value: outputs.append(value))
+        self.assertEqual(outputs, [1 - depth])
+
+    def test_invalid_program(self):
+        with self.assertRaises(Exception):
+            SyntaxTree.parse_tree("a=+1;%a!")
+
+
+if __name__ == "__main__":
+    unittest.main()
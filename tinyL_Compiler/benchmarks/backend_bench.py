@@ -0,0 +1,63 @@
+"""
+Benchmarks repeated runs of one program with different inputs.
+
+Compares Interpreter.execute over a decoded program with the function
+generated by PythonBackend.compile_program. Translation and decoding are
+one-off costs and timed separately.
+
+Usage: python3 backend_bench.py [num_statements] [runs]
+"""
+
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+import PythonBackend
+from Compiler import compile_source
+
+
+def main() -> int:
+    num_statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    head = compile_source(workloads.generate_program(num_statements, operators="+-&|"))[0]
+
+    start = time.perf_counter()
+    program = Interpreter.decode_program(head)
+    decode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    function = PythonBackend.compile_program(head)
+    translate_time = time.perf_counter() - start
+
+    def inputs(run):
+        values = iter(range(run, run + 6))
+        return lambda name: next(values)
+
+    def ignore(name, value):
+        pass
+
+    registers = [0] * (program.max_reg + 1)
+    start = time.perf_counter()
+    for run in range(runs):
+        Memory = [0] * 6
+        Interpreter.execute(program, Memory, registers, inputs(run), ignore)
+    interpreted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for run in range(runs):
+        assert function(inputs(run), ignore) is not None
+    compiled = time.perf_counter() - start
+
+    executed = len(program) * runs
+    print(f"{len(program)} instructions x {runs} runs")
+    print(f"{'mode':>12} {'setup s':>8} {'run s':>8} {'instr/s':>12}")
+    print(f"{'interpreted':>12} {decode_time:>8.3f} {interpreted:>8.3f} {executed / interpreted:>12,.0f}")
+    print(f"{'compiled':>12} {translate_time:>8.3f} {compiled:>8.3f} {executed / compiled:>12,.0f}")
+    print(f"speedup {interpreted / compiled:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Benchmarks batch compilation of a directory of tinyL programs.
+
+Compares launching one `python3 Compiler.py compile` process per file against
+compile_directory, which spreads the files over a process pool.
+
+Usage: python3 batch_bench.py [num_files] [statements_per_file]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Compiler
+
+COMPILER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Compiler.py")
+
+
+def main() -> int:
+    num_files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    num_statements = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = os.path.join(tmp, "src")
+        os.makedirs(src_dir)
+        for i in range(num_files):
+            workloads.write_program(
+                os.path.join(src_dir, f"prog{i:05}.tinyL"), num_statements, seed=i
+            )
+
+        start = time.perf_counter()
+        for name in sorted(os.listdir(src_dir)):
+            subprocess.run(
+                [sys.executable, COMPILER_PATH, "compile", os.path.join(src_dir, name)],
+                cwd=tmp,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+        per_process = time.perf_counter() - start
+
+        print(f"{num_files} files x {num_statements} statements")
+        print(f"{'mode':>24} {'seconds':>8} {'files/s':>8}")
+        print(f"{'process per file':>24} {per_process:>8.2f} {num_files / per_process:>8.1f}")
+        for workers in [1, os.cpu_count()]:
+            start = time.perf_counter()
+            Compiler.compile_directory(src_dir, os.path.join(tmp, "out"), workers)
+            elapsed = time.perf_counter() - start
+            label = f"compile_directory x{workers}"
+            print(f"{label:>24} {elapsed:>8.2f} {num_files / elapsed:>8.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
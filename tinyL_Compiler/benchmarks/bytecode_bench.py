@@ -0,0 +1,73 @@
+"""
+Benchmarks loading a compiled program from disk.
+
+Compares reading RISC text (read_instruction_list + decode_program) against
+memory-mapping the bytecode format (Bytecode.load_bytecode), both ending in a
+DecodedProgram ready for Interpreter.execute. Also reports the file sizes and
+the time of one execution pass over each loaded program.
+
+Usage: python3 bytecode_bench.py [num_statements ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Bytecode
+import Interpreter
+from Compiler import compile_file
+from Instruction import read_instruction_list
+
+
+def run(program):
+    start = time.perf_counter()
+    Memory = [0] * 6
+    Interpreter.execute(
+        program, Memory, read_value=lambda name: 3, write_value=lambda name, value: None
+    )
+    return time.perf_counter() - start, Memory
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(
+        f"{'instructions':>12} {'text KiB':>9} {'bc KiB':>8} {'text load s':>11} "
+        f"{'bc load s':>10} {'speedup':>8} {'text exec s':>11} {'bc exec s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "bench.tinyL")
+        text_path = os.path.join(tmp, "tinyL.out")
+        bc_path = os.path.join(tmp, "tinyL.bc")
+        for n in sizes:
+            workloads.write_program(src_path, n)
+            count = compile_file(src_path, text_path)
+            Bytecode.write_bytecode(bc_path, read_instruction_list(text_path))
+
+            start = time.perf_counter()
+            text_program = Interpreter.decode_program(read_instruction_list(text_path))
+            text_load = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bc_program = Bytecode.load_bytecode(bc_path)
+            bc_load = time.perf_counter() - start
+
+            text_exec, expected = run(text_program)
+            bc_exec, Memory = run(bc_program)
+            assert Memory == expected, "bytecode program computed different results"
+
+            print(
+                f"{count:>12} {os.path.getsize(text_path) / 1024:>9.0f} "
+                f"{os.path.getsize(bc_path) / 1024:>8.0f} {text_load:>11.3f} "
+                f"{bc_load:>10.5f} {text_load / bc_load:>7.0f}x "
+                f"{text_exec:>11.3f} {bc_exec:>10.3f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
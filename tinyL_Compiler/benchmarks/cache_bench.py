@@ -0,0 +1,57 @@
+"""
+Benchmarks the compiled program cache.
+
+Compiles the same set of generated programs repeatedly through a CompileCache in
+a temporary directory: the first pass misses and compiles everything, the later
+passes are served from the cache. Compares both against compile_source.
+
+Usage: python3 cache_bench.py [num_statements ...]
+"""
+
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+from CompileCache import CompileCache
+from Compiler import compile_source
+
+NUM_PROGRAMS = 20
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 1000, 10000]
+
+    print(f"{'statements':>10} {'compile s':>10} {'miss s':>8} {'hit s':>8} {'speedup':>8}")
+    for n in sizes:
+        sources = [workloads.generate_program(n, seed=seed) for seed in range(NUM_PROGRAMS)]
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CompileCache(tmp)
+
+            start = time.perf_counter()
+            for source in sources:
+                compile_source(source)
+            compile_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for source in sources:
+                cache.get(source)
+            miss_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for source in sources:
+                cache.get(source)
+            hit_time = time.perf_counter() - start
+            assert cache.hits == cache.misses == NUM_PROGRAMS
+
+        print(
+            f"{n:>10} {compile_time:>10.4f} {miss_time:>8.4f} {hit_time:>8.4f} "
+            f"{compile_time / hit_time:>7.0f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Benchmarks RISC code emission.
+
+Compares the old emission strategy, one print_instruction(path, instr) call per
+instruction (reopening the output file every time), against a single buffered
+InstructionWriter, and times an end-to-end compile of large generated programs.
+
+Usage: python3 emit_bench.py [num_statements ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Compiler
+from Instruction import InstructionWriter, OpCode, Instruction, print_instruction
+
+
+def sample_instructions(n: int):
+    kinds = [
+        Instruction(OpCode.LOADI, 1, 7),
+        Instruction(OpCode.LOAD, 2, "a"),
+        Instruction(OpCode.ADD, 3, 1, 2),
+        Instruction(OpCode.STORE, "b", 3),
+    ]
+    return [kinds[i % len(kinds)] for i in range(n)]
+
+
+def bench_per_instruction_open(path: str, instrs) -> float:
+    open(path, "w").close()
+    start = time.perf_counter()
+    for instr in instrs:
+        print_instruction(path, instr)
+    return time.perf_counter() - start
+
+
+def bench_writer(path: str, instrs) -> float:
+    start = time.perf_counter()
+    with InstructionWriter(path) as writer:
+        for instr in instrs:
+            writer.write(instr)
+    return time.perf_counter() - start
+
+
+def bench_compile(src_path: str, out_path: str) -> (int, float):
+    start = time.perf_counter()
+    count = Compiler.compile_file(src_path, out_path)
+    return count, time.perf_counter() - start
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 200000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "tinyL.out")
+
+        print("emission only (instructions/second)")
+        print(f"{'instructions':>12} {'open per instr':>16} {'buffered writer':>16} {'speedup':>8}")
+        for n in sizes:
+            instrs = sample_instructions(n)
+            before = bench_per_instruction_open(out_path, instrs)
+            after = bench_writer(out_path, instrs)
+            print(f"{n:>12} {n / before:>16,.0f} {n / after:>16,.0f} {before / after:>7.1f}x")
+
+        print("\nend-to-end compile with buffered writer")
+        print(f"{'statements':>12} {'instructions':>12} {'seconds':>8} {'instr/s':>12}")
+        for n in sizes:
+            src_path = workloads.write_program(os.path.join(tmp, "bench.tinyL"), n)
+            count, elapsed = bench_compile(src_path, out_path)
+            print(f"{n:>12} {count:>12} {elapsed:>8.3f} {count / elapsed:>12,.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
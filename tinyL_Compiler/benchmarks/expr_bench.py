@@ -0,0 +1,83 @@
+"""
+Stress benchmark for deeply nested prefix expressions.
+
+Compiles `a=<op>^n <leaf>^(n+1)` for growing nesting depths n with the
+iterative Compiler.expr and with the previous recursive descent version (kept
+below as a reference), checks that both emit byte-identical code, and reports
+compile throughput. The recursive version fails once the nesting exceeds the
+Python recursion limit.
+
+Usage: python3 expr_bench.py [max_depth]
+"""
+
+import io
+import random
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Compiler
+from Instruction import InstructionWriter, OpCode
+
+
+class RecursiveCompiler(Compiler.Compiler):
+    """Compiler using the original recursive <expr> descent"""
+
+    def expr(self):
+        token = self.token
+        opcode = Compiler.OPERATORS.get(token)
+        if opcode is not None:
+            self.next_token()
+            left_reg = self.expr()
+            right_reg = self.expr()
+            reg = self.next_register()
+            self.code_gen(opcode, reg, left_reg, right_reg)
+            return reg
+        elif Compiler.is_digit(token):
+            return self.digit()
+        elif Compiler.is_identifier(token):
+            return self.variable()
+        else:
+            Compiler.error(f"Symbol {token} unknown")
+
+
+def nested_program(depth: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    ops = "".join(rng.choice(workloads.OPERATORS) for _ in range(depth))
+    leaves = "".join(rng.choice(workloads.VARIABLES + workloads.DIGITS) for _ in range(depth + 1))
+    return f"a={ops}{leaves};%a!"
+
+
+def run(compiler_class, source: str):
+    stream = io.StringIO()
+    start = time.perf_counter()
+    with InstructionWriter(stream) as writer:
+        compiler = compiler_class(writer)
+        compiler.set_input(source)
+        compiler.program()
+    return stream.getvalue(), writer.count, time.perf_counter() - start
+
+
+def main() -> int:
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    depths = [d for d in [10, 100, 900, 10**3, 10**4, 10**5, 10**6] if d <= max_depth]
+
+    print(f"{'depth':>8} {'instructions':>12} {'iterative s':>12} {'instr/s':>10} {'recursive s':>12}  output")
+    for depth in depths:
+        source = nested_program(depth)
+        output, count, elapsed = run(Compiler.Compiler, source)
+        try:
+            ref_output, _, ref_elapsed = run(RecursiveCompiler, source)
+            recursive = f"{ref_elapsed:>12.3f}"
+            same = "identical" if ref_output == output else "DIFFERENT"
+        except RecursionError:
+            recursive = f"{'RecursionError':>12}"
+            same = "-"
+        print(f"{depth:>8} {count:>12} {elapsed:>12.3f} {count / elapsed:>10,.0f} {recursive}  {same}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Benchmarks recompiling a large program after a one statement edit.
+
+Compiles a generated program once with an IncrementalCompiler, then edits the
+statement in the middle, first keeping its register count (only that block
+changes) and then growing it (every later block is relocated). Each edit is
+timed against a full compile (compile_source + formatting, i.e. tinyL.out).
+
+Usage: python3 incremental_bench.py [num_statements ...]
+"""
+
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+from Compiler import compile_source
+from IncrementalCompiler import IncrementalCompiler
+from Instruction import format_instruction
+
+
+def full_compile(source: str) -> str:
+    return "".join(map(format_instruction, compile_source(source)))
+
+
+def edit(source: str, statement: str) -> str:
+    """Replaces the statement in the middle of source"""
+    statements = source.split(";")
+    statements[len(statements) // 2] = statement
+    return ";".join(statements)
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(
+        f"{'statements':>10} {'full s':>8} {'first s':>8} {'same shape s':>12} "
+        f"{'relocate s':>11} {'speedup':>8}"
+    )
+    for n in sizes:
+        source = workloads.generate_program(n)
+        compiler = IncrementalCompiler()
+
+        start = time.perf_counter()
+        compiler.compile(source)
+        first = time.perf_counter() - start
+
+        compiler.compile(edit(source, "a=+b1"))
+        times = []
+        # Same register count as a=+b1, then two registers more
+        for statement in ["a=-c2", "a=+b*c2"]:
+            edited = edit(source, statement)
+            start = time.perf_counter()
+            code = compiler.compile(edited)
+            times.append(time.perf_counter() - start)
+            assert compiler.parsed <= 1
+
+        start = time.perf_counter()
+        expected = full_compile(edited)
+        full = time.perf_counter() - start
+        assert code == expected, "incremental output differs from a full compile"
+
+        print(
+            f"{n:>10} {full:>8.3f} {first:>8.3f} {times[0]:>12.4f} "
+            f"{times[1]:>11.4f} {full / times[0]:>7.0f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmarks the interpreter's execution loop.
+
+Compares the previous interpreter loop, which walked the linked list of
+Instruction objects and compared Enum opcodes (kept below as a reference),
+against decode_program + execute over parallel arrays. Reports executed
+instructions per second; decoding is timed separately since it happens once.
+
+Usage: python3 interp_bench.py [num_statements ...]
+"""
+
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_source
+from Instruction import OpCode
+
+
+def linked_list_loop(head, Memory, RegisterFile, inputs):
+    """The interpreter loop as it was before decode_program, minus the prompts"""
+    instrCounter = 0
+    instr = head
+    while instr:
+        if instr.opcode == OpCode.LOAD:
+            RegisterFile[instr.field1] = Memory[ord(instr.field2) - ord("a")]
+        elif instr.opcode == OpCode.LOADI:
+            RegisterFile[instr.field1] = instr.field2
+        elif instr.opcode == OpCode.STORE:
+            Memory[ord(instr.field1) - ord("a")] = RegisterFile[instr.field2]
+        elif instr.opcode in [
+            OpCode.ADD,
+            OpCode.SUB,
+            OpCode.MUL,
+            OpCode.AND,
+            OpCode.OR,
+        ]:
+            operation = {
+                OpCode.ADD: lambda x, y: x + y,
+                OpCode.SUB: lambda x, y: x - y,
+                OpCode.MUL: lambda x, y: x * y,
+                OpCode.AND: lambda x, y: x & y,
+                OpCode.OR: lambda x, y: x | y,
+            }[instr.opcode]
+            RegisterFile[instr.field1] = operation(
+                RegisterFile[instr.field2], RegisterFile[instr.field3]
+            )
+        elif instr.opcode == OpCode.READ:
+            Memory[ord(instr.field1) - ord("a")] = next(inputs)
+        elif instr.opcode == OpCode.WRITE:
+            Memory[ord(instr.field1) - ord("a")]
+        instrCounter += 1
+        instr = instr.next
+    return instrCounter, Memory
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'instructions':>12} {'linked list/s':>14} {'decode s':>9} {'decoded/s':>12} {'speedup':>8}")
+    for n in sizes:
+        source = workloads.generate_program(n, operators="+-&|")
+        head = compile_source(source)[0]
+
+        start = time.perf_counter()
+        program = Interpreter.decode_program(head)
+        decode_time = time.perf_counter() - start
+        num_regs = program.max_reg + 1
+
+        start = time.perf_counter()
+        count, expected = linked_list_loop(head, [0] * 6, [0] * num_regs, iter(range(1, 7)))
+        before = time.perf_counter() - start
+
+        inputs = iter(range(1, 7))
+        Memory = [0] * 6
+        start = time.perf_counter()
+        Interpreter.execute(
+            program,
+            Memory,
+            [0] * num_regs,
+            read_value=lambda name: next(inputs),
+            write_value=lambda name, value: None,
+        )
+        after = time.perf_counter() - start
+        assert Memory == expected, "decoded program computed different results"
+
+        print(
+            f"{count:>12} {count / before:>14,.0f} {decode_time:>9.3f} "
+            f"{count / after:>12,.0f} {before / after:>7.1f}x"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
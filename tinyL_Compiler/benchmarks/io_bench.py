@@ -0,0 +1,58 @@
+"""
+Benchmarks the interpreter as a filter over large input streams.
+
+Runs a program of num_pairs READ/WRITE pairs through "Interpreter.py run"
+twice with the same values piped to stdin: once prompting for every READ and
+printing every WRITE, and once headless ("run <file> -"), which reads the values
+in bulk and writes buffered "variable value" lines.
+
+Usage: python3 io_bench.py [num_pairs ...]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+from Compiler import compile_file
+
+INTERPRETER = os.path.join(os.path.dirname(workloads.__file__), "..", "Interpreter.py")
+
+
+def run(args, stdin: bytes) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, INTERPRETER, *args],
+        input=stdin,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+
+    print(f"{'pairs':>10} {'prompt s':>9} {'headless s':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "io.tinyL")
+        out_path = os.path.join(tmp, "io.out")
+        for n in sizes:
+            with open(src_path, "w") as f:
+                variables = (workloads.VARIABLES * n)[:n]
+                f.write(";".join(f"?{v};%{v}" for v in variables) + "!")
+            compile_file(src_path, out_path)
+            stdin = "".join(f"{i}\n" for i in range(n)).encode()
+
+            prompt = run(["run", out_path], stdin)
+            headless = run(["run", out_path, "-"], stdin)
+            print(f"{n:>10} {prompt:>9.3f} {headless:>11.3f} {prompt / headless:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
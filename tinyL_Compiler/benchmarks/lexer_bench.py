@@ -0,0 +1,87 @@
+"""
+Benchmarks memory use and speed of reading tinyL sources.
+
+Compiles a large generated program to os.devnull three ways: reading the
+whole file into memory first and validating it up front (Compiler.read_input),
+streaming it a chunk at a time from the file object (compile_file) and from an
+mmap. Also times the up-front validation on its own (Compiler.scan and
+Compiler.validate). Reports wall time and, in a second run, the peak Python heap
+measured with tracemalloc.
+
+Usage: python3 lexer_bench.py [num_statements ...]
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Compiler
+from Instruction import InstructionWriter
+
+
+def whole_file(path: str):
+    with InstructionWriter(os.devnull) as writer:
+        compiler = Compiler.Compiler(writer)
+        compiler.read_input(path)
+        compiler.program()
+
+
+def streamed(path: str):
+    Compiler.compile_file(path, os.devnull)
+
+
+def memory_mapped(path: str):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with InstructionWriter(os.devnull) as writer:
+            compiler = Compiler.Compiler(writer)
+            compiler.set_stream(mapped)
+            compiler.program()
+
+
+def validate_only(path: str):
+    with open(path, "r") as f:
+        Compiler.validate(*Compiler.scan(f.read()))
+
+
+def measure(function, path: str):
+    start = time.perf_counter()
+    function(path)
+    elapsed = time.perf_counter() - start
+    # tracemalloc slows the compiler down a lot, so trace a separate run
+    tracemalloc.start()
+    function(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'statements':>10} {'source MiB':>10} {'mode':>12} {'seconds':>8} {'peak MiB':>9}")
+        for num_statements in sizes:
+            path = workloads.write_program(os.path.join(tmp, "big.tinyL"), num_statements)
+            size = os.path.getsize(path)
+            for name, function in [
+                ("whole file", whole_file),
+                ("streamed", streamed),
+                ("mmap", memory_mapped),
+                ("validate", validate_only),
+            ]:
+                elapsed, peak = measure(function, path)
+                print(
+                    f"{num_statements:>10} {size / 2**20:>10.1f} {name:>12} "
+                    f"{elapsed:>8.2f} {peak / 2**20:>9.2f}"
+                )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Benchmarks evaluating many small programs in one process.
+
+Compares running each program the way "Interpreter.py run" does, in a fresh
+interpreter process reading a RISC file, against compiling it in-process and
+running it on a reused Interpreter.Machine.
+
+Usage: python3 machine_bench.py [num_programs]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_source
+from Instruction import print_instruction_list
+
+INTERPRETER = os.path.join(os.path.dirname(workloads.__file__), "..", "Interpreter.py")
+PROCESS_SAMPLE = 20  # programs timed through subprocesses, extrapolated
+
+
+def main() -> int:
+    num_programs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(0)
+    sources = [
+        workloads.generate_program(rng.randint(1, 10), seed=seed)
+        for seed in range(num_programs)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tinyL.out")
+        start = time.perf_counter()
+        for source in sources[:PROCESS_SAMPLE]:
+            open(path, "w").close()
+            print_instruction_list(path, compile_source(source)[0])
+            subprocess.run(
+                [sys.executable, INTERPRETER, "run", path, "-"],
+                input=b"1 2 3 4 5 6",
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+        per_process = (time.perf_counter() - start) / PROCESS_SAMPLE
+
+    machine = Interpreter.Machine()
+    start = time.perf_counter()
+    for source in sources:
+        machine.run(compile_source(source)[0], [1, 2, 3, 4, 5, 6])
+    in_process = (time.perf_counter() - start) / num_programs
+
+    print(f"{'mode':<22} {'programs/s':>11}")
+    print(f"{'process per program':<22} {1 / per_process:>11,.0f}")
+    print(f"{'Machine, compile + run':<22} {1 / in_process:>11,.0f}")
+    print(f"speedup: {per_process / in_process:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
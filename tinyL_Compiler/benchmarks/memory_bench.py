@@ -0,0 +1,81 @@
+"""
+Measures how many bytes each representation of a compiled program costs per
+instruction.
+
+Compares Instruction objects with a per-instance __dict__ (the previous class,
+reproduced below as a reference) against the slotted Instruction, both as a
+linked list and wrapped in an InstructionList, and against the DecodedProgram
+columns and the bytecode file format. Sizes are traced with tracemalloc.
+
+Usage: python3 memory_bench.py [num_statements]
+"""
+
+import sys
+import tracemalloc
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Bytecode
+import Interpreter
+from Compiler import compile_source, link_instructions
+from Instruction import Instruction, InstructionList, OpCode
+
+
+class DictInstruction:
+    """Instruction as it was before __slots__, attributes stored in a __dict__"""
+
+    def __init__(self, opcode, field1, field2=None, field3=None):
+        self.opcode = OpCode(opcode)
+        self.field1 = field1
+        self.field2 = field2
+        self.field3 = field3
+        self.prev = None
+        self.next = None
+        self.critical = False
+
+
+def traced(build):
+    """Returns (result of build(), bytes allocated by it that are still alive)"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main() -> int:
+    num_statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = workloads.generate_program(num_statements)
+    instrs = compile_source(source)
+    count = len(instrs)
+    fields = [(i.opcode, i.field1, i.field2, i.field3) for i in instrs]
+    del instrs
+
+    def dict_list():
+        return link_instructions([DictInstruction(*f) for f in fields])
+
+    def slotted_list():
+        return link_instructions([Instruction(*f) for f in fields])
+
+    def instruction_list():
+        return InstructionList(Instruction(*f) for f in fields)
+
+    head, _ = traced(slotted_list)
+    rows = [
+        ("Instruction with __dict__", traced(dict_list)[1]),
+        ("slotted Instruction", traced(slotted_list)[1]),
+        ("InstructionList", traced(instruction_list)[1]),
+        ("DecodedProgram", traced(lambda: Interpreter.decode_program(head))[1]),
+        ("bytecode file", len(Bytecode.encode_program(Interpreter.decode_program(head)))),
+    ]
+
+    print(f"{count} instructions")
+    print(f"{'representation':<26} {'bytes/instr':>11}")
+    for name, size in rows:
+        print(f"{name:<26} {size / count:>11.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
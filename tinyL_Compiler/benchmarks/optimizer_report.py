@@ -0,0 +1,106 @@
+"""
+Reports how much the optimizer shrinks programs.
+
+For each program the instruction count is shown after the compiler and after
+each pass in Optimizer.PASSES (cumulative), followed by the total reduction,
+the interpreter's run time, the number of registers used and the number of LOAD
+and STORE instructions, before and after optimizing.
+
+Usage: python3 optimizer_report.py [tinyL file or directory ...]
+(default: ../tinyL_tests/optimization plus a generated 10k statement program)
+"""
+
+import glob
+import os
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+import Optimizer
+from Compiler import compile_source
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tinyL_tests")
+
+
+def run_time(head, repeat: int) -> float:
+    program = Interpreter.decode_program(head)
+    registers = [0] * (program.max_reg + 1)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Interpreter.execute(
+            program, [0] * 6, registers, lambda name: 7, lambda name, value: None
+        )
+    return (time.perf_counter() - start) / repeat
+
+
+def max_register(head) -> int:
+    return Interpreter.decode_program(head).max_reg if head else 0
+
+
+def report(name: str, source: str):
+    head = compile_source(source)[0]
+    original = Optimizer.count_instructions(head)
+    registers_before = max_register(head)
+    memory_before = Optimizer.count_memory_operations(head)
+    repeat = max(1, 200000 // original)
+    before = run_time(head, repeat)
+
+    counts = []
+    for optimization_pass in Optimizer.PASSES:
+        head = optimization_pass(head)
+        counts.append(Optimizer.count_instructions(head))
+    after = run_time(head, repeat) if head else 0.0
+
+    memory_after = Optimizer.count_memory_operations(head)
+    reduction = 100 * (original - counts[-1]) / original
+    print(
+        f"{name:<24} {original:>8} "
+        + " ".join(f"{count:>8}" for count in counts)
+        + f" {reduction:>6.1f}% {before * 1e6:>10.1f} {after * 1e6:>10.1f}"
+        + f" {registers_before:>8} {max_register(head):>6}"
+        + "".join(
+            f" {memory_before[op]:>6} {memory_after[op]:>6}" for op in ["LOAD", "STORE"]
+        )
+    )
+    return original, counts[-1], memory_before, memory_after
+
+
+def main() -> int:
+    targets = sys.argv[1:] or [os.path.join(TESTS_DIR, "optimization")]
+    files = []
+    for target in targets:
+        if os.path.isdir(target):
+            files.extend(sorted(glob.glob(os.path.join(target, "*.tinyL"))))
+        else:
+            files.append(target)
+
+    # Columns are labelled with the initials of each pass, e.g. edc for eliminate_dead_code
+    pass_names = ["".join(word[0] for word in p.__name__.split("_")) for p in Optimizer.PASSES]
+    print("passes: " + ", ".join(p.__name__ for p in Optimizer.PASSES) + "\n")
+    print(
+        f"{'program':<24} {'compiled':>8} "
+        + " ".join(f"{name:>8}" for name in pass_names)
+        + f" {'saved':>7} {'before us':>10} {'after us':>10} {'regs':>8} {'after':>6}"
+        + f" {'LOADs':>6} {'after':>6} {'STOREs':>6} {'after':>6}"
+    )
+    results = [report(os.path.basename(path), open(path).read()) for path in files]
+    if not sys.argv[1:]:
+        results.append(report("generated 10k stmts", workloads.generate_program(10000)))
+
+    total_before = sum(result[0] for result in results)
+    total_after = sum(result[1] for result in results)
+    print(
+        f"\ntotal {total_before} -> {total_after} instructions "
+        f"({100 * (total_before - total_after) / total_before:.1f}% fewer)"
+    )
+    for op in ["LOAD", "STORE"]:
+        before = sum(result[2][op] for result in results)
+        after = sum(result[3][op] for result in results)
+        print(f"{op}: {before} -> {after} ({before - after} eliminated)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
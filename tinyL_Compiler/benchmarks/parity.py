@@ -0,0 +1,252 @@
+"""
+Parity and performance comparison against the C reference tools in tostudents/.
+
+The C compiler and interpreter are built with gcc in a temporary directory, then
+both implementations are run over the same corpus: the test programs in
+tostudents/tests and tinyL_tests/optimization, plus seeded generated programs of
+the given sizes (approximate number of RISC instructions). For every program
+
+  compile  the tinyL.out written by the C compiler must be byte-identical to the
+           one written by Compiler.compile_file
+  run      the WRITE output of the C interpreter on tinyL.out must be identical
+           to Interpreter.execute's, on the same seeded input values
+
+and both phases are timed, giving the Python/C time ratio of each phase (how many
+times slower Python is). The C tools are timed as processes (their startup is
+included, about a millisecond), the Python side in-process, so the totals only
+add up the generated programs. Any mismatch is reported and makes the exit
+status 1.
+
+The reference interpreter keeps its registers in a fixed array of MAX_REG_NUM
+(1000) ints on the stack, which the generated programs outgrow, so the build
+makes it a static array sized for the largest program in the corpus. C ints are
+32 bits, so Python's values are compared modulo 2^32 (generated programs leave
+out "*" to keep them small anyway).
+
+Usage: python3 parity.py [--sizes 1000,10000,100000] [--seed 0] [--repeat 3]
+                         [--cflags "-O2"]
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_file
+from suite import best_time, statements_for
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_DIR = os.path.join(BENCHMARKS_DIR, "..", "..", "tostudents")
+TEST_DIRS = [
+    os.path.join(REFERENCE_DIR, "tests"),
+    os.path.join(BENCHMARKS_DIR, "..", "tinyL_tests", "optimization"),
+]
+DEFAULT_SIZES = [1000, 10000, 100000]
+PHASES = ["compile", "run"]
+# Lines printed by the C interpreter for WRITE instructions (READ prompts end in ": ")
+C_WRITE_LINE = re.compile(r"tinyL>> ([a-f]) = (-?\d+)\n")
+REGISTER_ARRAY = "int RegisterFile[MAX_REG_NUM];"
+REGISTER_LIMIT = "#define MAX_REG_NUM 1000"
+
+
+def build_reference(build_dir: str, num_registers: int, cflags: list) -> tuple:
+    """
+    Copies the C sources into build_dir and builds them like the Makefile does.
+
+    The interpreter's register file is made a static array of num_registers ints
+    (at least the original 1000).
+
+    Raises:
+    - RuntimeError: If the sources are not the expected ones or gcc fails.
+
+    Returns:
+        (path of the compiler, path of the interpreter)
+    """
+    for path in glob.glob(os.path.join(REFERENCE_DIR, "*.[ch]")):
+        shutil.copy(path, build_dir)
+
+    interpreter_path = os.path.join(build_dir, "Interpreter.c")
+    with open(interpreter_path) as f:
+        source = f.read()
+    if REGISTER_LIMIT not in source or REGISTER_ARRAY not in source:
+        raise RuntimeError("Unexpected register file in tostudents/Interpreter.c")
+    source = source.replace(
+        REGISTER_LIMIT, f"#define MAX_REG_NUM {max(num_registers, 1000)}"
+    ).replace(REGISTER_ARRAY, "static " + REGISTER_ARRAY)
+    with open(interpreter_path, "w") as f:
+        f.write(source)
+
+    tools = []
+    for main_file, tool in [("Compiler.c", "compile"), ("Interpreter.c", "run")]:
+        command = ["gcc", *cflags, main_file, "InstrUtils.c", "Utils.c", "-o", tool]
+        result = subprocess.run(command, cwd=build_dir, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr}")
+        tools.append(os.path.join(build_dir, tool))
+    return tuple(tools)
+
+
+def to_int32(value: int) -> int:
+    return (value + (1 << 31)) % (1 << 32) - (1 << 31)
+
+
+def check_program(name: str, src_path: str, tools: tuple, tmp: str, repeat: int, seed: int):
+    """
+    Compiles and runs src_path with both implementations.
+
+    Returns:
+        (instruction count, {phase: (Python seconds, C seconds)}, list of mismatches)
+    """
+    c_compile, c_run = tools
+    c_out = os.path.join(tmp, "tinyL.out")  # the C compiler writes to its cwd
+    py_out = os.path.join(tmp, "python.out")
+    mismatches = []
+    times = {}
+
+    def run_c_compiler():
+        if os.path.exists(c_out):
+            os.remove(c_out)
+        subprocess.run(
+            [c_compile, src_path],
+            cwd=tmp,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,  # it reports the final "!" as end of input
+        )
+
+    times["compile"] = (
+        best_time(lambda: compile_file(src_path, py_out), repeat),
+        best_time(run_c_compiler, repeat),
+    )
+    if not os.path.exists(c_out):
+        return 0, times, [f"{name}: the C compiler wrote no tinyL.out"]
+    with open(py_out, "rb") as f:
+        py_code = f.read()
+    with open(c_out, "rb") as f:
+        c_code = f.read()
+    if py_code != c_code:
+        py_lines, c_lines = py_code.splitlines(), c_code.splitlines()
+        line = next(
+            (i for i, pair in enumerate(zip(py_lines, c_lines)) if pair[0] != pair[1]),
+            min(len(py_lines), len(c_lines)),
+        )
+        mismatches.append(f"{name}: tinyL.out differs from line {line + 1}")
+
+    program = Interpreter.load_program(py_out)
+    rng = random.Random(seed)
+    inputs = [rng.randint(-9, 9) for _ in range(program.opcodes.count(Interpreter.READ))]
+    stdin = "".join(f"{value}\n" for value in inputs).encode()
+    py_outputs = []
+    c_result = None
+
+    def run_python():
+        program = Interpreter.load_program(py_out)
+        py_outputs.clear()
+        Interpreter.execute(
+            program,
+            read_value=Interpreter.input_reader(inputs),
+            write_value=lambda name, value: py_outputs.append((name, value)),
+        )
+
+    def run_c():
+        nonlocal c_result
+        c_result = subprocess.run([c_run, c_out], input=stdin, capture_output=True)
+
+    times["run"] = (best_time(run_python, repeat), best_time(run_c, repeat))
+    c_outputs = [
+        (name, int(value))
+        for name, value in C_WRITE_LINE.findall(c_result.stdout.decode())
+    ]
+    if c_result.returncode != 0:
+        mismatches.append(f"{name}: the C interpreter exited with {c_result.returncode}")
+    elif [(n, to_int32(v)) for n, v in py_outputs] != c_outputs:
+        mismatches.append(
+            f"{name}: WRITE output differs ({len(py_outputs)} Python, "
+            f"{len(c_outputs)} C writes)"
+        )
+    return len(program), times, mismatches
+
+
+def build_corpus(tmp: str, sizes: list, seed: int) -> list:
+    """Returns (name, tinyL path) of the test programs and of one generated program per size"""
+    corpus = []
+    for test_dir in TEST_DIRS:
+        for path in sorted(glob.glob(os.path.join(test_dir, "*.tinyL"))):
+            corpus.append((os.path.basename(path), path))
+    for size in sizes:
+        path = os.path.join(tmp, f"generated{size}.tinyL")
+        workloads.write_program(
+            path, statements_for(size, seed), seed=seed, operators="+-&|"
+        )
+        corpus.append((f"generated {size}", path))
+    return corpus
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma separated instruction counts of the generated programs",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cflags", default="-O2", help="extra gcc flags")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    if shutil.which("gcc") is None:
+        sys.stderr.write("gcc is needed to build the C reference tools\n")
+        return 1
+
+    mismatches = []
+    totals = {phase: [0.0, 0.0] for phase in PHASES}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(tmp, sizes, args.seed)
+        # Every token of a program uses at most one register
+        num_registers = max(os.path.getsize(path) for _, path in corpus) + 1
+        tools = build_reference(tmp, num_registers, args.cflags.split())
+
+        print(
+            f"{'program':<18} {'instrs':>8} "
+            + " ".join(f"{phase + ' py':>11} {phase + ' C':>11} {'ratio':>6}" for phase in PHASES)
+        )
+        for name, path in corpus:
+            repeat = 1 if os.path.getsize(path) > 100000 else args.repeat
+            num_instrs, times, failures = check_program(
+                name, path, tools, tmp, repeat, args.seed
+            )
+            mismatches.extend(failures)
+            row = f"{name:<18} {num_instrs:>8} "
+            for phase in PHASES:
+                py_seconds, c_seconds = times[phase]
+                if path.startswith(tmp):
+                    totals[phase][0] += py_seconds
+                    totals[phase][1] += c_seconds
+                row += f"{py_seconds:>11.4f} {c_seconds:>11.4f} {py_seconds / c_seconds:>6.1f} "
+            print(row + ("MISMATCH" if failures else "ok"))
+
+    print()
+    for phase in PHASES:
+        py_seconds, c_seconds = totals[phase]
+        if c_seconds:
+            print(
+                f"{phase:<8} Python {py_seconds:.3f}s, C {c_seconds:.3f}s on the "
+                f"generated programs: Python takes {py_seconds / c_seconds:.1f}x as long"
+            )
+    for mismatch in mismatches:
+        print("MISMATCH " + mismatch)
+    if not mismatches:
+        print(f"All {len(corpus)} programs compile and run identically.")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Benchmarks reading RISC text into a DecodedProgram.
+
+Compares the Instruction based reader (read_instruction_list + decode_program)
+against the bulk parser (Interpreter.load_program / parse_instruction_text) on
+compiled programs of roughly the given numbers of lines.
+
+Usage: python3 parse_bench.py [num_lines ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_file
+from Instruction import read_instruction_list
+
+INSTRUCTIONS_PER_STATEMENT = 10  # roughly, for the default workload
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    print(f"{'lines':>9} {'reader s':>9} {'bulk s':>8} {'speedup':>8} {'bulk lines/s':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "bench.tinyL")
+        text_path = os.path.join(tmp, "tinyL.out")
+        for n in sizes:
+            workloads.write_program(src_path, max(1, n // INSTRUCTIONS_PER_STATEMENT))
+            lines = compile_file(src_path, text_path)
+
+            start = time.perf_counter()
+            expected = Interpreter.decode_program(read_instruction_list(text_path))
+            before = time.perf_counter() - start
+
+            start = time.perf_counter()
+            program = Interpreter.load_program(text_path)
+            after = time.perf_counter() - start
+
+            for column in ["opcodes", "field1", "field2", "field3"]:
+                assert list(getattr(program, column)) == list(
+                    getattr(expected, column)
+                ), f"bulk parser decoded a different {column} column"
+
+            print(
+                f"{lines:>9} {before:>9.3f} {after:>8.3f} {before / after:>7.1f}x "
+                f"{lines / after:>13,.0f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
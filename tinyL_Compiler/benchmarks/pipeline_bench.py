@@ -0,0 +1,94 @@
+"""
+Benchmarks compiling and running a tinyL program end to end.
+
+Compares the file based flow (compile_file to tinyL.out, read_instruction_list,
+decode_program, execute) against the streaming pipeline (iter_statements into
+execute_statements), which runs each statement as soon as it is compiled. Reports
+total time, latency until the first instruction executes, and peak traced memory
+(measured in a separate tracemalloc run, which slows everything down).
+
+Usage: python3 pipeline_bench.py [num_statements ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_file, iter_statements
+from Instruction import read_instruction_list
+
+
+def file_pipeline(src_path, out_path, read_value, write_value):
+    compile_file(src_path, out_path)
+    program = Interpreter.decode_program(read_instruction_list(out_path))
+    Interpreter.execute(program, read_value=read_value, write_value=write_value)
+
+
+def streaming_pipeline(src_path, out_path, read_value, write_value):
+    with open(src_path) as infile:
+        Interpreter.execute_statements(
+            iter_statements(infile), read_value=read_value, write_value=write_value
+        )
+
+
+def measure(run, src_path, out_path):
+    """Returns (total seconds, seconds until the first READ, final outputs)"""
+    first = []
+    outputs = []
+
+    def read_value(name):
+        if not first:
+            first.append(time.perf_counter())
+        return 3
+
+    start = time.perf_counter()
+    run(src_path, out_path, read_value, lambda name, value: outputs.append(value))
+    total = time.perf_counter() - start
+    return total, first[0] - start, outputs
+
+
+def peak_memory(run, src_path, out_path):
+    tracemalloc.start()
+    run(src_path, out_path, lambda name: 3, lambda name, value: None)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(
+        f"{'statements':>10} {'file s':>8} {'stream s':>9} {'file 1st':>9} "
+        f"{'stream 1st':>10} {'file MiB':>9} {'stream MiB':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, "bench.tinyL")
+        out_path = os.path.join(tmp, "tinyL.out")
+        for n in sizes:
+            workloads.write_program(src_path, n)
+
+            file_time, file_first, expected = measure(file_pipeline, src_path, out_path)
+            stream_time, stream_first, outputs = measure(
+                streaming_pipeline, src_path, out_path
+            )
+            assert outputs == expected, "streaming pipeline computed different results"
+
+            file_peak = peak_memory(file_pipeline, src_path, out_path) / 2**20
+            stream_peak = peak_memory(streaming_pipeline, src_path, out_path) / 2**20
+
+            print(
+                f"{n:>10} {file_time:>8.3f} {stream_time:>9.3f} {file_first:>9.4f} "
+                f"{stream_first:>10.4f} {file_peak:>9.1f} {stream_peak:>10.1f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
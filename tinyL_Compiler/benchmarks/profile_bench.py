@@ -0,0 +1,58 @@
+"""
+Measures the cost of execution profiling and what it reports for the optimizer.
+
+Runs a generated program with Interpreter.execute and with execute_profiled,
+reporting both throughputs (execute has no profiling hooks at all, so an
+unprofiled run costs what it did before), then prints the profiles of the same
+program before and after Optimizer.optimize.
+
+Usage: python3 profile_bench.py [num_statements] [JSON output file]
+"""
+
+import json
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+import Optimizer
+from Compiler import compile_source
+
+
+def quiet_run(run, program):
+    return run(program, read_value=lambda name: 7, write_value=lambda name, value: None)
+
+
+def main() -> int:
+    num_statements = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    source = workloads.generate_program(num_statements)
+    program = Interpreter.decode_program(compile_source(source)[0])
+
+    start = time.perf_counter()
+    quiet_run(Interpreter.execute, program)
+    plain = time.perf_counter() - start
+    profile = quiet_run(Interpreter.execute_profiled, program)
+    print(
+        f"execute:          {len(program) / plain:>12,.0f} instructions/s\n"
+        f"execute_profiled: {profile.throughput:>12,.0f} instructions/s "
+        f"({profile.wall_time / plain:.1f}x slower)\n"
+    )
+
+    optimized = Interpreter.decode_program(Optimizer.optimize(compile_source(source)[0]))
+    optimized_profile = quiet_run(Interpreter.execute_profiled, optimized)
+    print("before optimizing:\n" + profile.report())
+    print("after optimizing:\n" + optimized_profile.report())
+
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w") as f:
+            json.dump(
+                {"before": profile.as_dict(), "after": optimized_profile.as_dict()},
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
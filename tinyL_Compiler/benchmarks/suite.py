@@ -0,0 +1,205 @@
+"""
+End to end benchmark suite with a result history and regression check.
+
+For each size (approximate number of RISC instructions) a seeded program is
+generated and every stage of the tool chain is timed on it:
+
+  lex      Compiler.tokenize over the source file
+  compile  Compiler.compile_file (lexing, parsing and writing tinyL.out)
+  read     Instruction.read_instruction_list of tinyL.out
+  print    Instruction.print_instruction_list of the read program
+  decode   Interpreter.decode_program
+  execute  Interpreter.execute
+
+Each stage is run --repeat times on small programs (once from 10^5 instructions
+up) and the fastest time is kept. The run is appended to a JSON history file and,
+if a baseline exists, every stage that got more than --threshold slower than the
+baseline is flagged as a regression (exit status 1). --save-baseline makes this
+run the new baseline.
+
+Usage: python3 suite.py [--sizes 10,1000,100000] [--repeat 3] [--threshold 0.25]
+                        [--history FILE] [--baseline FILE] [--save-baseline]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+from Compiler import compile_file, compile_source, tokenize
+from Instruction import print_instruction_list, read_instruction_list
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+STAGES = ["lex", "compile", "read", "print", "decode", "execute"]
+# Stages faster than this are too noisy to flag
+MIN_COMPARED_SECONDS = 0.001
+
+
+def statements_for(num_instructions: int, seed: int) -> int:
+    """
+    Number of generated statements giving roughly num_instructions instructions.
+
+    Small programs are dominated by their reads and writes, which generate_program
+    scales down with the program, so for them the smallest statement count reaching
+    num_instructions is found by compiling the candidates. The smallest program
+    (one assignment and its I/O) has around 20 instructions.
+    """
+    sample = 1000
+    source = workloads.generate_program(sample, seed=seed, operators="+-&|")
+    per_statement = len(compile_source(source)) / sample
+    estimate = max(1, round(num_instructions / per_statement))
+    if estimate > 100:
+        return estimate
+    for num_statements in range(1, sample + 1):
+        source = workloads.generate_program(num_statements, seed=seed, operators="+-&|")
+        if len(compile_source(source)) >= num_instructions:
+            return num_statements
+    return estimate
+
+
+def best_time(stage, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_size(num_instructions: int, seed: int, repeat: int, tmp: str) -> dict:
+    src_path = os.path.join(tmp, "suite.tinyL")
+    out_path = os.path.join(tmp, "tinyL.out")
+    copy_path = os.path.join(tmp, "copy.out")
+    num_statements = statements_for(num_instructions, seed)
+    # Multiplication makes values huge, keep execution about the interpreter
+    workloads.write_program(src_path, num_statements, seed=seed, operators="+-&|")
+    if num_instructions >= 100000:
+        repeat = 1
+
+    def lex():
+        with open(src_path) as f:
+            for _ in tokenize(f):
+                pass
+
+    def print_list():
+        open(copy_path, "w").close()  # print_instruction_list appends
+        print_instruction_list(copy_path, head)
+
+    times = {}
+    times["lex"] = best_time(lex, repeat)
+    times["compile"] = best_time(lambda: compile_file(src_path, out_path), repeat)
+    times["read"] = best_time(lambda: read_instruction_list(out_path), repeat)
+    head = read_instruction_list(out_path)
+    times["print"] = best_time(print_list, repeat)
+    times["decode"] = best_time(lambda: Interpreter.decode_program(head), repeat)
+    program = Interpreter.decode_program(head)
+    times["execute"] = best_time(
+        lambda: Interpreter.execute(
+            program, read_value=lambda name: 7, write_value=lambda name, value: None
+        ),
+        repeat,
+    )
+    return {"statements": num_statements, "instructions": len(program), "seconds": times}
+
+
+def find_regressions(run: dict, baseline: dict, threshold: float) -> list:
+    """Returns (size, stage, baseline seconds, seconds) for every stage that got slower"""
+    regressions = []
+    for size, result in run["results"].items():
+        previous = baseline["results"].get(size)
+        if previous is None or previous["instructions"] != result["instructions"]:
+            continue  # not the same program
+        for stage, seconds in result["seconds"].items():
+            before = previous["seconds"].get(stage)
+            if before is None or max(before, seconds) < MIN_COMPARED_SECONDS:
+                continue
+            if seconds > before * (1 + threshold):
+                regressions.append((size, stage, before, seconds))
+    return regressions
+
+
+def load_json(path: str, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def save_json(path: str, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma separated instruction counts (up to 10000000)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--history", default=os.path.join(RESULTS_DIR, "history.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    run = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": {},
+    }
+
+    print(f"{'size':>9} {'instrs':>9} " + " ".join(f"{stage:>9}" for stage in STAGES))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            result = run_size(size, args.seed, args.repeat, tmp)
+            run["results"][str(size)] = result
+            print(
+                f"{size:>9} {result['instructions']:>9} "
+                + " ".join(f"{result['seconds'][stage]:>9.4f}" for stage in STAGES)
+            )
+
+    history = load_json(args.history, [])
+    history.append(run)
+    save_json(args.history, history)
+    print(f'\nAppended results to "{args.history}" ({len(history)} runs).')
+
+    status = 0
+    baseline = load_json(args.baseline, None)
+    if baseline is not None:
+        regressions = find_regressions(run, baseline, args.threshold)
+        for size, stage, before, seconds in regressions:
+            print(
+                f"REGRESSION size {size} {stage}: {before:.4f}s -> {seconds:.4f}s "
+                f"({seconds / before - 1:+.0%})"
+            )
+        if regressions:
+            status = 1
+        else:
+            print(f"No stage is more than {args.threshold:.0%} slower than the baseline.")
+
+    if args.save_baseline:
+        save_json(args.baseline, run)
+        print(f'Saved this run as the baseline "{args.baseline}".')
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmarks running tinyL programs straight from a SyntaxTree.
+
+Compares the RISC pipeline (Compiler.compile_source, Interpreter.decode_program,
+Interpreter.execute) against parsing into a SyntaxTree and evaluating it
+(SyntaxTree.parse_tree, SyntaxTree.evaluate), on many small programs and on one
+large one. Also times generating the RISC code from the tree.
+
+Usage: python3 tree_bench.py [num_small_programs] [large_program_statements]
+"""
+
+import random
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import Interpreter
+import SyntaxTree
+from Compiler import compile_source
+
+
+def read_seven(name):
+    return 7
+
+
+def ignore(name, value):
+    pass
+
+
+def risc_pipeline(source):
+    program = Interpreter.decode_program(compile_source(source)[0])
+    Interpreter.execute(program, read_value=read_seven, write_value=ignore)
+
+
+def tree_pipeline(source):
+    SyntaxTree.evaluate(SyntaxTree.parse_tree(source), read_value=read_seven, write_value=ignore)
+
+
+def timed(function, sources) -> float:
+    start = time.perf_counter()
+    for source in sources:
+        function(source)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    num_small = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    rng = random.Random(0)
+    small = [
+        workloads.generate_program(rng.randint(1, 20), seed=seed, operators="+-&|")
+        for seed in range(num_small)
+    ]
+    big = [workloads.generate_program(large, operators="+-&|")]
+
+    print(f"{'workload':<24} {'RISC s':>8} {'tree s':>8} {'speedup':>8}")
+    for name, sources in [(f"{num_small} small programs", small), (f"{large} statements", big)]:
+        risc = timed(risc_pipeline, sources)
+        tree = timed(tree_pipeline, sources)
+        print(f"{name:<24} {risc:>8.3f} {tree:>8.3f} {risc / tree:>7.1f}x")
+
+    start = time.perf_counter()
+    compile_source(big[0])
+    direct = time.perf_counter() - start
+    start = time.perf_counter()
+    SyntaxTree.tree_instructions(SyntaxTree.parse_tree(big[0]))
+    through_tree = time.perf_counter() - start
+    print(
+        f"\ncode generation, {large} statements: "
+        f"parser {direct:.3f}s, through the tree {through_tree:.3f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Benchmarks running one program over many input vectors.
+
+Compares calling Interpreter.execute once per input row against a single
+BatchInterpreter.execute_batch pass over all rows, with plain lists and, when it
+is installed, with NumPy.
+
+Usage: python3 vector_bench.py [num_rows ...]
+"""
+
+import random
+import sys
+import time
+
+import workloads  # also puts the compiler modules on sys.path
+
+import BatchInterpreter
+import Interpreter
+from Compiler import compile_source
+
+
+def main() -> int:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    source = workloads.generate_program(50, operators="+-&|")
+    program = Interpreter.decode_program(compile_source(source)[0])
+    num_reads = BatchInterpreter.count_reads(program)
+    print(f"{len(program)} instructions, {num_reads} inputs per row")
+
+    modes = [False] + ([True] if BatchInterpreter.numpy else [])
+    print(
+        f"{'rows':>8} {'per row s':>10} "
+        + " ".join(f"{'numpy s' if mode else 'lists s':>9} {'speedup':>8}" for mode in modes)
+    )
+    rng = random.Random(0)
+    for n in sizes:
+        rows = [[rng.randint(-1000, 1000) for _ in range(num_reads)] for _ in range(n)]
+
+        start = time.perf_counter()
+        expected = []
+        for row in rows:
+            inputs = iter(row)
+            outputs = []
+            Interpreter.execute(
+                program,
+                read_value=lambda name: next(inputs),
+                write_value=lambda name, value: outputs.append(value),
+            )
+            expected.append(outputs)
+        per_row = time.perf_counter() - start
+
+        line = f"{n:>8} {per_row:>10.3f}"
+        for mode in modes:
+            start = time.perf_counter()
+            outputs = BatchInterpreter.execute_batch(program, rows, use_numpy=mode)
+            batch = time.perf_counter() - start
+            assert [int(column[-1]) for _, column in outputs] == expected[-1]
+            line += f" {batch:>9.3f} {per_row / batch:>7.1f}x"
+        print(line)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Generated tinyL workloads for the benchmarks in this directory.
+
+The test programs in tinyL_tests/ finish in microseconds, so the benchmarks
+build large programs instead. Generation is seeded, so a given size always
+produces the same program.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# Benchmarks are run from this directory, make the compiler modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+OPERATORS = "+-*&|"
+VARIABLES = "abcdef"
+DIGITS = "0123456789"
+
+
+def generate_expr(rng: random.Random, depth: int, operators: str = OPERATORS) -> str:
+    """Generates a random prefix expression nested at most depth operators deep"""
+    if depth <= 0 or rng.random() < 0.3:
+        return rng.choice(VARIABLES + DIGITS)
+    return (
+        rng.choice(operators)
+        + generate_expr(rng, depth - 1, operators)
+        + generate_expr(rng, depth - 1, operators)
+    )
+
+
+def generate_program(
+    num_statements: int,
+    max_depth: int = 4,
+    seed: int = 0,
+    operators: str = OPERATORS,
+    io_density: float = 0.0,
+) -> str:
+    """
+    Generates a tinyL program with about num_statements statements.
+
+    Each statement of the body is a READ or WRITE of a random variable with
+    probability io_density (half each), and otherwise an assignment of a random
+    expression at most max_depth operators deep. Operators are drawn uniformly from
+    operators, so repeating one (e.g. "++-") weights the mix; leaving "*" out keeps
+    the values small when the program is executed.
+
+    The variables the expressions use are read up front and the variables the body
+    assigns or reads are written at the end, so the body is grown until the whole
+    program has num_statements statements (at least one body statement, and its
+    reads and writes). Larger programs use every variable, so they read and write
+    all six; small ones only pay for the I/O they need.
+    """
+    rng = random.Random(seed)
+    body, used, assigned = [], set(), set()
+    while not body or len(body) + len(used) + len(assigned) < num_statements:
+        if io_density and rng.random() < io_density:
+            stmt = rng.choice("?%") + rng.choice(VARIABLES)
+            if stmt[0] == "?":
+                assigned.add(stmt[1])
+        else:
+            var = rng.choice(VARIABLES)
+            expr = generate_expr(rng, max_depth, operators)
+            stmt = f"{var}={expr}"
+            used.update(c for c in expr if c in VARIABLES)
+            assigned.add(var)
+        body.append(stmt)
+    stmts = [f"?{v}" for v in VARIABLES if v in used]
+    stmts.extend(body)
+    stmts.extend(f"%{v}" for v in VARIABLES if v in assigned)
+    return ";".join(stmts) + "!\n"
+
+
+def write_program(
+    path: str,
+    num_statements: int,
+    max_depth: int = 4,
+    seed: int = 0,
+    operators: str = OPERATORS,
+    io_density: float = 0.0,
+):
+    with open(path, "w") as f:
+        f.write(generate_program(num_statements, max_depth, seed, operators, io_density))
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Writes a generated tinyL program.")
+    parser.add_argument("path", help="tinyL file to write")
+    parser.add_argument("num_statements", type=int)
+    parser.add_argument("--depth", type=int, default=4, help="maximum expression depth")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operators", default=OPERATORS, help="operator mix, e.g. ++-*")
+    parser.add_argument(
+        "--io-density", type=float, default=0.0, help="fraction of READ/WRITE statements"
+    )
+    args = parser.parse_args()
+    write_program(
+        args.path, args.num_statements, args.depth, args.seed, args.operators, args.io_density
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())